@@ -0,0 +1,58 @@
+import os
+from typing import Callable, List, Optional, Tuple
+from adapters.png_adapter import IImageAdapter, PNGAdapter
+from adapters.jpg_adapter import JPGAdapter
+from adapters.svg_adapter import SVGAdapter
+
+
+class ImageAdapterRegistry:
+    def __init__(self):
+        self._entries: List[Tuple[Callable[[bytes], bool], Tuple[str, ...], IImageAdapter]] = []
+    
+    def register(self, adapter: IImageAdapter, matches_signature: Callable[[bytes], bool],
+                 extensions: Tuple[str, ...] = ()):
+        self._entries.append((matches_signature, tuple(e.lower() for e in extensions), adapter))
+    
+    def get_adapter(self, file_path: str) -> Optional[IImageAdapter]:
+        # The file signature wins over the extension; exports are often misnamed
+        try:
+            with open(file_path, "rb") as f:
+                head = f.read(1024)
+        except OSError:
+            head = b""
+        if head:
+            for matches_signature, _, adapter in self._entries:
+                if matches_signature(head):
+                    return adapter
+        ext = os.path.splitext(file_path)[1].lower()
+        for _, extensions, adapter in self._entries:
+            if ext in extensions:
+                return adapter
+        return None
+    
+    def load(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
+        adapter = self.get_adapter(file_path)
+        if adapter is None:
+            return None, False
+        return adapter.load(file_path, size)
+
+
+def _is_png(head: bytes) -> bool:
+    return head.startswith(b"\x89PNG\r\n\x1a\n")
+
+
+def _is_jpg(head: bytes) -> bool:
+    return head.startswith(b"\xff\xd8\xff")
+
+
+def _is_svg(head: bytes) -> bool:
+    text = head.lstrip(b"\xef\xbb\xbf").lstrip().lower()
+    return (text.startswith(b"<?xml") or text.startswith(b"<svg") or text.startswith(b"<!--")) and b"<svg" in text
+
+
+def create_default_registry() -> ImageAdapterRegistry:
+    registry = ImageAdapterRegistry()
+    registry.register(PNGAdapter(), _is_png, (".png",))
+    registry.register(JPGAdapter(), _is_jpg, (".jpg", ".jpeg"))
+    registry.register(SVGAdapter(), _is_svg, (".svg",))
+    return registry
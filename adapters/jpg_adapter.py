@@ -1,18 +1,10 @@
-from adapters.png_adapter import IImageAdapter
+from adapters.png_adapter import IImageAdapter, read_raster
 from typing import Tuple, Optional
 
 
 class JPGAdapter(IImageAdapter):
-    def load(self, file_path: str) -> Tuple[Optional[object], bool]:
-        try:
-            from PyQt6.QtGui import QImage
-            image = QImage(file_path)
-            if image.isNull():
-                return None, False
-            return image, True
-        except Exception:
-            return None, False
+    def load(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
+        return read_raster(file_path, size)
     
     def get_format(self) -> str:
         return "JPG"
-
@@ -4,7 +4,7 @@ from typing import Tuple, Optional
 
 class IImageAdapter(ABC):
     @abstractmethod
-    def load(self, file_path: str) -> Tuple[Optional[object], bool]:
+    def load(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
         pass
     
     @abstractmethod
@@ -12,17 +12,28 @@ class IImageAdapter(ABC):
         pass
 
 
-class PNGAdapter(IImageAdapter):
-    def load(self, file_path: str) -> Tuple[Optional[object], bool]:
-        try:
-            from PyQt6.QtGui import QImage
-            image = QImage(file_path)
-            if image.isNull():
-                return None, False
-            return image, True
-        except Exception:
+def read_raster(file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
+    try:
+        from PyQt6.QtCore import QSize, Qt
+        from PyQt6.QtGui import QImageReader
+        reader = QImageReader(file_path)
+        reader.setAutoTransform(True)
+        if size:
+            # Let the decoder downscale (JPEG decodes at reduced size natively)
+            source = reader.size()
+            if source.isValid() and (source.width() > size[0] or source.height() > size[1]):
+                reader.setScaledSize(source.scaled(QSize(*size), Qt.AspectRatioMode.KeepAspectRatio))
+        image = reader.read()
+        if image.isNull():
             return None, False
+        return image, True
+    except Exception:
+        return None, False
+
+
+class PNGAdapter(IImageAdapter):
+    def load(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
+        return read_raster(file_path, size)
     
     def get_format(self) -> str:
         return "PNG"
-
@@ -0,0 +1,73 @@
+import hashlib
+import os
+from typing import Dict, Optional, Tuple
+from adapters.adapter_registry import ImageAdapterRegistry, create_default_registry
+
+
+# Longest side in pixels per preview level; None keeps the native resolution
+PREVIEW_SIZES: Dict[str, Optional[int]] = {
+    "thumbnail": 128,
+    "screen": 1024,
+    "full": None,
+}
+
+
+class PreviewCache:
+    def __init__(self, cache_dir: str = ".preview_cache", registry: Optional[ImageAdapterRegistry] = None):
+        self.cache_dir = cache_dir
+        self.registry = registry or create_default_registry()
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+    
+    def get_preview(self, file_path: str, level: str = "thumbnail") -> Tuple[Optional[object], bool]:
+        if level not in PREVIEW_SIZES:
+            raise ValueError(f"Unknown preview level: {level}")
+        content_hash = self.content_hash(file_path)
+        if content_hash is None:
+            return None, False
+        
+        max_side = PREVIEW_SIZES[level]
+        cache_path = self._cache_path(content_hash, level, max_side)
+        if os.path.exists(cache_path):
+            from PyQt6.QtGui import QImage
+            image = QImage(cache_path)
+            if not image.isNull():
+                return image, True
+        
+        size = (max_side, max_side) if max_side else None
+        image, ok = self.registry.load(file_path, size)
+        if not ok:
+            return None, False
+        
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # Write then rename so readers on other threads never see a partial file
+            tmp_path = cache_path + ".tmp"
+            if image.save(tmp_path, "PNG"):
+                os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Error caching preview: {e}")
+        return image, True
+    
+    def content_hash(self, file_path: str) -> Optional[str]:
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return None
+        # Hash the bytes once per (path, size, mtime); the cache itself is content-addressed
+        key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+        cached = self._hashes.get(key)
+        if cached is not None:
+            return cached
+        digest = hashlib.sha1()
+        try:
+            with open(file_path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        except OSError:
+            return None
+        content_hash = f"{digest.hexdigest()}_{st.st_size}"
+        self._hashes[key] = content_hash
+        return content_hash
+    
+    def _cache_path(self, content_hash: str, level: str, max_side: Optional[int]) -> str:
+        return os.path.join(self.cache_dir, content_hash[:2], f"{content_hash}_{level}_{max_side or 0}.png")
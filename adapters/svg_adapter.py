@@ -3,14 +3,20 @@ from typing import Tuple, Optional
 
 
 class SVGAdapter(IImageAdapter):
-    def load(self, file_path: str) -> Tuple[Optional[object], bool]:
+    def load(self, file_path: str, size: Optional[Tuple[int, int]] = None) -> Tuple[Optional[object], bool]:
         try:
             from PyQt6.QtSvg import QSvgRenderer
+            from PyQt6.QtCore import QSize, Qt
             from PyQt6.QtGui import QImage, QPainter
             renderer = QSvgRenderer(file_path)
             if not renderer.isValid():
                 return None, False
-            image = QImage(800, 600, QImage.Format.Format_ARGB32)
+            target = renderer.defaultSize()
+            if target.isEmpty():
+                target = QSize(800, 600)
+            if size:
+                target = target.scaled(QSize(*size), Qt.AspectRatioMode.KeepAspectRatio)
+            image = QImage(target, QImage.Format.Format_ARGB32)
             image.fill(0)
             painter = QPainter(image)
             renderer.render(painter)
@@ -21,4 +27,3 @@ class SVGAdapter(IImageAdapter):
     
     def get_format(self) -> str:
         return "SVG"
-
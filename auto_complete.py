@@ -4,7 +4,10 @@ Smart auto-completion engine for drawing assistance.
 from PyQt6.QtCore import QPointF, QRectF
 from typing import List, Optional, Union, Dict, Any
 import math
-from core.state_encoder import encode_state
+from core.lazy_import import lazy_import
+
+# Imports torch; only loaded once the pattern learner's DQN exists
+state_encoder = lazy_import("core.state_encoder")
 
 
 class AutoCompleteEngine:
@@ -17,6 +20,7 @@ class AutoCompleteEngine:
         self.geo_w = 0.4
         self.pat_w = 0.3
         self.nn_w = 0.3
+        self._state_encoder = None  # created with the DQN's device on first prediction
     
     def suggest_rectangle(self, points: List[QPointF]) -> Optional[QRectF]:
         """Suggest a rectangle from 2 points."""
@@ -93,28 +97,36 @@ class AutoCompleteEngine:
 
         # Pattern prediction
         if pattern_learner and len(previous_rooms) >= 2:
-            verts = [r.get_vertices() for r in previous_rooms[-2:]]
-            pat_suggestions = pattern_learner.suggest_positions(verts, num_suggestions=1)
+            # Prefer suggestions already computed off the GUI thread over predicting per mouse move
+            if "pattern_suggestions" in context:
+                pat_suggestions = context["pattern_suggestions"] or []
+            else:
+                verts = [r.get_vertices() for r in previous_rooms[-2:]]
+                pat_suggestions = pattern_learner.suggest_positions(verts, num_suggestions=1)
             if pat_suggestions:
                 first = pat_suggestions[0]
                 x, y = first[0], first[1]
                 pat_center = QPointF(x, y)
 
-            # NN prediction using DQN
+            # NN prediction using DQN (None in demo mode or while torch loads)
             try:
+                if pattern_learner.dqn is None:
+                    raise RuntimeError("DQN not available")
                 last = previous_rooms[-1].get_vertices()
                 prev = previous_rooms[-2].get_vertices()
                 last_cx, last_cy = self._center_from_vertices(last)
                 prev_cx, prev_cy = self._center_from_vertices(prev)
                 avg_angle = pattern_learner.performance_metrics.get("direction_r2", 0) * 360
-                state = encode_state(
+                if self._state_encoder is None:
+                    self._state_encoder = state_encoder.StateEncoder(device=pattern_learner.dqn.device)
+                # Reuses one buffer per call; act() does not keep the state
+                state = self._state_encoder.encode(
                     (last_cx, last_cy),
                     (prev_cx, prev_cy),
                     avg_angle=avg_angle,
                     pattern_count=len(pattern_learner.patterns),
                     grid_w=scene_width,
                     grid_h=scene_height,
-                    device=pattern_learner.dqn.device,
                 )
                 nn_vec = pattern_learner.dqn.act(state)
                 nx = last_cx + float(nn_vec[0].item()) * scene_width * 0.05
@@ -1,16 +1,22 @@
-from fastapi import FastAPI
-from pydantic import BaseModel
-from typing import List, Literal, Optional
+import os
+from fastapi import FastAPI, WebSocket
+from pydantic import BaseModel, conlist
+from typing import Literal, Optional
 from model.network import Predictor
-from model.dataset import ActionStore
+from model.dataset import MAX_POINTS, ActionStore
 from model.trainer import OnlineTrainer
 from model.reinforce import Reinforce
+from model.batching import MicroBatcher
+from model.worker import TrainingWorker
+from model.sessions import DEFAULT_SESSION, SessionRegistry
+from model.streaming import PredictionStream
 from fastapi.middleware.cors import CORSMiddleware
 
 
 class Event(BaseModel):
     action: Literal["place_room", "pathway_segment"]
-    coords: List[List[float]]
+    # One [x, y] pair per point; the action log stores at most MAX_POINTS
+    coords: conlist(conlist(float, min_length=2, max_length=2), max_length=MAX_POINTS)
     timestamp: float
 
 
@@ -27,34 +33,114 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-store = ActionStore(max_len=5000)
-model = Predictor()
-trainer = OnlineTrainer(model, store)
+MAX_SESSIONS = int(os.environ.get("MAX_SESSIONS", "1000"))
+
+# Durable log of every session's events; predictions read each session's own history
+store = ActionStore(max_len=5000, save_every=0)
+# Weights are loaded from and saved back to this path (plus a TorchScript export) when set
+model = Predictor(weights_path=os.environ.get("PREDICTOR_WEIGHTS"))
+trainer = OnlineTrainer(model, store, max_sessions=MAX_SESSIONS)
 reinforce = Reinforce(model)
+# Training runs on its own thread; predictions are served from the snapshot it last published
+worker = TrainingWorker(
+    model, trainer, reinforce, store,
+    train_interval_ms=float(os.environ.get("TRAIN_INTERVAL_MS", "200")),
+    max_batch_size=int(os.environ.get("TRAIN_MAX_BATCH", "64")),
+)
+# An evicted or expired session's training features are dropped along with it
+sessions = SessionRegistry(
+    max_sessions=MAX_SESSIONS,
+    ttl_seconds=float(os.environ.get("SESSION_TTL_SECONDS", "3600")),
+    on_evict=worker.submit_session_end,
+)
+# Concurrent /api/predict calls share one forward pass
+batcher = MicroBatcher(
+    model.predict_batch,
+    max_batch_size=int(os.environ.get("PREDICT_MAX_BATCH", "32")),
+    max_latency_ms=float(os.environ.get("PREDICT_MAX_LATENCY_MS", "2.0")),
+)
+
+
+def add_event(evt: Event, session_id: str):
+    action = evt.model_dump()
+    store.add(action)
+    sessions.get(session_id).actions.add(action)
+    worker.submit_event(action, session_id)
+
+
+async def predict_for(session_id: str):
+    session = sessions.get(session_id)
+    actions = session.actions.get_last(model.seq_len)
+    pred = await batcher.submit(actions)
+    session.predictions.add(pred["prediction_id"], actions)
+    return pred
+
+
+def apply_feedback(body: Feedback, session_id: str) -> bool:
+    actions = sessions.get(session_id).predictions.pop(body.prediction_id)
+    if actions is None:
+        # Unknown, already rated, or pushed out of the session's registry
+        return False
+    worker.submit_feedback(body.reward, actions)
+    return True
 
 
 @app.post("/api/event")
-async def receive_event(evt: Event):
-    store.add(evt.dict())
-    trainer.train_step()
+async def receive_event(evt: Event, session_id: str = DEFAULT_SESSION):
+    add_event(evt, session_id)
     return {"ok": True, "count": len(store)}
 
 
 @app.get("/api/predict")
-async def predict():
-    actions = store.get_last(20)
-    pred = model.predict(actions)
-    return pred
+async def predict(session_id: str = DEFAULT_SESSION):
+    return await predict_for(session_id)
 
 
 @app.post("/api/feedback")
-async def feedback(body: Feedback):
-    actions = store.get_last(20)
-    reinforce.apply(body.reward, actions, body.prediction_id)
-    return {"ok": True}
+async def feedback(body: Feedback, session_id: str = DEFAULT_SESSION):
+    return {"ok": apply_feedback(body, session_id)}
+
+
+@app.websocket("/api/stream")
+async def stream(websocket: WebSocket, session_id: str = DEFAULT_SESSION):
+    """
+    Events, feedback and prediction requests over one connection, with predictions pushed
+    back as soon as they are ready: {"type": "event", ...Event fields}, {"type": "feedback",
+    ...Feedback fields} and {"type": "predict"}, one per frame or several as a list.
+    """
+    def handle(message):
+        kind = message.get("type")
+        if kind == "event":
+            add_event(Event(**message), session_id)
+            return None
+        if kind == "feedback":
+            body = Feedback(**message)
+            return {"type": "feedback", "prediction_id": body.prediction_id, "ok": apply_feedback(body, session_id)}
+        raise ValueError(f"unknown message type {kind!r}")
+
+    await PredictionStream(websocket, handle, lambda: predict_for(session_id)).run()
 
 
 @app.get("/api/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "inference": batcher.stats(), "training": worker.stats(), "sessions": sessions.stats(),
+            "optimized_model": model.optimized is not None}
+
+
+@app.on_event("startup")
+async def startup():
+    worker.start()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await batcher.close()
+    worker.close()
+    store.close()
+    if model.weights_path:
+        try:
+            actions = store.get_last(256)
+            model.save(histories=[actions[:i + 1] for i in range(len(actions))])
+        except Exception as e:
+            print(f"Error saving predictor: {e}")
 
@@ -0,0 +1,69 @@
+"""
+Compare prediction throughput of the micro-batched path against one forward pass per request.
+Run from the backend directory: python benchmark_inference.py
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import torch
+
+from model.batching import MicroBatcher
+from model.network import Predictor
+
+
+def make_history(rng, length=20):
+    actions = []
+    for i in range(length):
+        x, y = rng.uniform(0, 800), rng.uniform(0, 600)
+        actions.append({
+            "action": "place_room" if rng.random() < 0.7 else "pathway_segment",
+            "coords": [[x, y], [x + 40, y], [x + 40, y + 40], [x, y + 40]],
+            "timestamp": float(i),
+        })
+    return actions
+
+
+async def run_clients(predict, histories, concurrency):
+    """`concurrency` clients issue requests back to back until all histories are served."""
+    queue = list(histories)
+
+    async def client():
+        while queue:
+            await predict(queue.pop())
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return len(histories) / (time.perf_counter() - start)
+
+
+async def main(requests, max_batch_size, max_latency_ms):
+    torch.set_num_threads(1)
+    rng = random.Random(0)
+    histories = [make_history(rng) for _ in range(requests)]
+    model = Predictor()
+
+    async def unbatched(actions):
+        # What the endpoint did before: one forward pass per request
+        await asyncio.sleep(0)
+        return model.predict(actions)
+
+    print(f"max_batch_size={max_batch_size} max_latency_ms={max_latency_ms}")
+    print(f"{'concurrency':>11} {'unbatched req/s':>16} {'batched req/s':>14} {'speedup':>8} {'mean batch':>11}")
+    for concurrency in (1, 4, 16, 64, 256):
+        batcher = MicroBatcher(model.predict_batch, max_batch_size, max_latency_ms)
+        plain = await run_clients(unbatched, histories, concurrency)
+        batched = await run_clients(batcher.submit, histories, concurrency)
+        print(f"{concurrency:>11} {plain:>16.0f} {batched:>14.0f} {batched / plain:>7.1f}x "
+              f"{batcher.stats()['mean_batch_size']:>11}")
+        await batcher.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Micro-batched vs unbatched prediction throughput")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-latency-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.max_batch_size, args.max_latency_ms))
@@ -0,0 +1,67 @@
+"""
+Export the prediction network as TorchScript for CPU-only machines, check it against the
+eager float32 network and compare latency. tests/test_model_export.py runs the same check.
+Run from the backend directory: python export_model.py --weights data/net.pt
+"""
+import argparse
+import os
+import random
+import sys
+
+import torch
+
+from benchmark_inference import make_history
+from model.export import load_optimized, max_output_error, time_forward
+from model.network import Predictor, encode_action_batch, optimized_path
+
+
+def export_and_check(predictor, histories=2000, seed=0, tolerance=0.05):
+    """
+    Save the predictor with its export (int8 only if within tolerance of the eager net on
+    one set of random histories) and compare the reloaded export with the eager net on
+    another. Returns (export, precision, max error on the check histories, max error on the
+    held-out ones, share of held-out histories with the same predicted action, held-out inputs).
+    """
+    rng = random.Random(seed)
+    samples = [make_history(rng, rng.randint(1, 25)) for _ in range(2 * histories)]
+    precision, check_error = predictor.save(histories=samples[:histories], tolerance=tolerance)
+    exported = load_optimized(optimized_path(predictor.weights_path))
+    net = predictor.net.eval()
+    x = encode_action_batch(samples[histories:], predictor.seq_len)
+    error = max_output_error(net, exported, x)
+    with torch.inference_mode():
+        agreement = (net(x)[1].argmax(1) == exported(x)[1].argmax(1)).float().mean().item()
+    return exported, precision, check_error, error, agreement, x
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TorchScript export of the prediction network")
+    parser.add_argument("--weights", default="net.pt", help="Net state dict (the PREDICTOR_WEIGHTS file)")
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--histories", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=1000)
+    args = parser.parse_args()
+    torch.set_num_threads(1)
+
+    if not os.path.exists(args.weights):
+        print(f"{args.weights} not found, exporting a freshly initialised network")
+    predictor = Predictor(weights_path=args.weights)
+    exported, precision, check_error, error, agreement, x = export_and_check(
+        predictor, args.histories, tolerance=args.tolerance)
+    print(f"Wrote {precision} export to {optimized_path(args.weights)} (max error {check_error:.5f})")
+    print(f"held-out max |export - eager float32|: {error:.5f} (tolerance {args.tolerance}), "
+          f"action agreement {agreement:.1%}")
+    if error > args.tolerance:
+        print("Equivalence check failed")
+        sys.exit(1)
+
+    net = predictor.net
+    print(f"{'batch':>6} {'eager float32 us':>17} {precision + ' TorchScript us':>21} {'speedup':>8}")
+    for batch in (1, 32):
+        eager = time_forward(net, x[:batch], args.repeats)
+        optimized = time_forward(exported, x[:batch], args.repeats)
+        print(f"{batch:>6} {eager * 1e6:>17.1f} {optimized * 1e6:>21.1f} {eager / optimized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
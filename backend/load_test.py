@@ -0,0 +1,242 @@
+"""
+Load-test the backend with concurrent simulated annotators.
+Each annotator has its own session and replays an action stream (recorded, in ActionStore
+JSON lines or binary log format, or synthetic): POST /api/event, GET /api/predict and,
+for some predictions, POST /api/feedback. Reports throughput and latency percentiles per
+endpoint and can save them as JSON to compare against a later run.
+Run from the backend directory: python load_test.py --concurrency 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from benchmark_inference import make_history
+from model.dataset import ENCODE_ERRORS, encode_record, read_log
+
+ENDPOINTS = ("event", "predict", "feedback")
+
+
+def load_actions(path):
+    """
+    Recorded actions, and how many were skipped. JSON lines files from the old store may
+    hold actions /api/event now rejects (points that are not [x, y], or more than
+    MAX_POINTS); they are dropped with the same check ActionStore applies on import, so
+    they do not show up as endpoint errors.
+    """
+    if not path.endswith(".jsonl"):
+        return read_log(path), 0
+    actions = []
+    skipped = 0
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            action = json.loads(line)
+            try:
+                encode_record(action)
+            except ENCODE_ERRORS:
+                skipped += 1
+                continue
+            actions.append(action)
+    return actions, skipped
+
+
+def annotator_streams(actions, concurrency, length, seed):
+    """One stream of `length` actions per annotator, cut from `actions` or synthetic when None."""
+    rng = random.Random(seed)
+    if not actions:
+        return [make_history(rng, length) for _ in range(concurrency)]
+    streams = []
+    for _ in range(concurrency):
+        # Consecutive actions from a random starting point, wrapping around the recording
+        start = rng.randrange(len(actions))
+        streams.append([actions[(start + i) % len(actions)] for i in range(length)])
+    return streams
+
+
+async def annotator(client, session_id, stream, feedback_rate, think, latencies, errors, rng):
+    params = {"session_id": session_id}
+
+    async def call(endpoint, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPError:
+            errors[endpoint] += 1
+            return None
+        latencies[endpoint].append(time.perf_counter() - start)
+        return response.json()
+
+    for action in stream:
+        event = dict(action, timestamp=time.time())
+        await call("event", "POST", "/api/event", json=event)
+        prediction = await call("predict", "GET", "/api/predict")
+        if prediction and rng.random() < feedback_rate:
+            reward = 1 if rng.random() < 0.7 else -1
+            await call("feedback", "POST", "/api/feedback",
+                       json={"prediction_id": prediction["prediction_id"], "reward": reward})
+        if think:
+            await asyncio.sleep(rng.expovariate(1.0 / think))
+
+
+def summarize(latencies, errors, elapsed):
+    results = {}
+    for endpoint in ENDPOINTS:
+        values = np.array(latencies[endpoint]) * 1000
+        entry = {"requests": len(values), "errors": errors[endpoint],
+                 "throughput_rps": round(len(values) / elapsed, 1)}
+        if len(values):
+            entry.update({
+                "mean_ms": round(float(values.mean()), 3),
+                "p50_ms": round(float(np.percentile(values, 50)), 3),
+                "p90_ms": round(float(np.percentile(values, 90)), 3),
+                "p99_ms": round(float(np.percentile(values, 99)), 3),
+                "max_ms": round(float(values.max()), 3),
+            })
+        results[endpoint] = entry
+    return results
+
+
+async def run(url, streams, feedback_rate, think):
+    latencies = {endpoint: [] for endpoint in ENDPOINTS}
+    errors = {endpoint: 0 for endpoint in ENDPOINTS}
+    limits = httpx.Limits(max_connections=len(streams), max_keepalive_connections=len(streams))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30.0) as client:
+        # One request first so connection setup and lazy initialisation are not measured
+        await client.get("/api/health")
+        start = time.perf_counter()
+        cpu_start = time.process_time()
+        await asyncio.gather(*(
+            annotator(client, f"load-{i}", stream, feedback_rate, think, latencies, errors, random.Random(i))
+            for i, stream in enumerate(streams)
+        ))
+        elapsed = time.perf_counter() - start
+        client_cpu = time.process_time() - cpu_start
+        health = (await client.get("/api/health")).json()
+    return elapsed, client_cpu, summarize(latencies, errors, elapsed), health
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(directory):
+    """uvicorn serving app.py on a free port, with its data files written under `directory`."""
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app:app", "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+         "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=directory,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {server.returncode}")
+        try:
+            httpx.get(url + "/api/health", timeout=1.0)
+            return server, url
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("uvicorn did not start within 60 s")
+
+
+def print_report(report, baseline=None):
+    config = report["config"]
+    print(f"concurrency={config['concurrency']} actions/annotator={config['actions']} "
+          f"source={config['source']} elapsed={report['elapsed_s']} s "
+          f"(load generator CPU {report.get('client_cpu_s', '-')} s)")
+    header = f"{'endpoint':>9} {'requests':>9} {'errors':>7} {'req/s':>8} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header)
+    for endpoint, entry in report["results"].items():
+        print(f"{endpoint:>9} {entry['requests']:>9} {entry['errors']:>7} {entry['throughput_rps']:>8}"
+              + "".join(f" {entry.get(key, '-'):>8}" for key in ("p50_ms", "p90_ms", "p99_ms", "max_ms")))
+        if baseline and endpoint in baseline["results"]:
+            before = baseline["results"][endpoint]
+            changes = []
+            for key in ("throughput_rps", "p50_ms", "p90_ms", "p99_ms"):
+                if before.get(key) and key in entry:
+                    changes.append(f"{key} {100.0 * (entry[key] - before[key]) / before[key]:+.1f}%")
+            print(f"{'':>9} vs baseline: {', '.join(changes)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="backend to test; by default a local uvicorn is started")
+    parser.add_argument("--actions-file", help="recorded actions (.jsonl, or the binary .bin log); synthetic if omitted")
+    parser.add_argument("--concurrency", type=int, default=8, help="simulated annotators")
+    parser.add_argument("--actions", type=int, default=50, help="actions per annotator")
+    parser.add_argument("--feedback-rate", type=float, default=0.3, help="share of predictions that get feedback")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between actions (0: back to back)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--report", help="write the report as JSON to this path")
+    parser.add_argument("--compare", help="earlier JSON report to compare against")
+    args = parser.parse_args()
+
+    actions, skipped = None, 0
+    if args.actions_file:
+        actions, skipped = load_actions(args.actions_file)
+        if skipped:
+            print(f"Skipped {skipped} recorded actions that /api/event would reject")
+        if not actions:
+            sys.exit(f"No replayable actions in {args.actions_file}")
+    streams = annotator_streams(actions, args.concurrency, args.actions, args.seed)
+    server = None
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.url
+        if url is None:
+            server, url = start_server(directory)
+        try:
+            elapsed, client_cpu, results, health = asyncio.run(run(url, streams, args.feedback_rate, args.think_ms / 1000.0))
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait(timeout=30)
+
+    report = {
+        "config": {
+            "url": args.url or "local uvicorn",
+            "source": args.actions_file or "synthetic",
+            "skipped_actions": skipped,
+            "concurrency": args.concurrency,
+            "actions": args.actions,
+            "feedback_rate": args.feedback_rate,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+        },
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count()},
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "elapsed_s": round(elapsed, 3),
+        # Close to elapsed_s means the load generator, not the server, was the bottleneck
+        "client_cpu_s": round(client_cpu, 3),
+        "results": results,
+        "server": {key: health.get(key) for key in ("inference", "training", "sessions")},
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
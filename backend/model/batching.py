@@ -0,0 +1,91 @@
+import asyncio
+import time
+
+
+class MicroBatcher:
+    """
+    Serves concurrent requests with one batched call. Requests are collected until
+    max_batch_size are waiting, max_latency_ms has passed since the first one arrived, or
+    the event loop has gone idle_yields turns without a new one. Then batch_fn(list of
+    inputs) -> list of results runs once and each caller gets its own result.
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_latency_ms=2.0, idle_yields=2):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency_ms / 1000.0
+        # Event-loop turns without a new request after which a partial batch is sent early
+        self.idle_yields = idle_yields
+        self._queue = None
+        self._worker = None
+        self.batches = 0
+        self.requests = 0
+        self.largest_batch = 0
+        self.busy_seconds = 0.0
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_latency
+            idle = 0
+            while len(batch) < self.max_batch_size and loop.time() < deadline:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    idle = 0
+                    continue
+                if idle >= self.idle_yields:
+                    # Nothing else is about to submit; waiting longer would only add latency
+                    break
+                # Let other ready tasks (e.g. requests being parsed) reach submit()
+                await asyncio.sleep(0)
+                idle += 1
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        # Runs on the event loop. Training runs on the TrainingWorker thread, and batch_fn reads
+        # the snapshot it publishes (Predictor.serving), so the model being trained is never used here
+        start = time.perf_counter()
+        try:
+            results = self.batch_fn([item for item, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            self.busy_seconds += time.perf_counter() - start
+        for (_, future), result in zip(batch, results):
+            # A caller that gave up (e.g. a closed connection) leaves a cancelled future
+            if not future.done():
+                future.set_result(result)
+        self.batches += 1
+        self.requests += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "busy_seconds": round(self.busy_seconds, 3),
+        }
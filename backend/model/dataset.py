@@ -1,27 +1,244 @@
 import json
+import mmap
 import os
+import struct
+import threading
 from collections import deque
 
+ACTION_TYPES = ("place_room", "pathway_segment")
+_MAGIC = 0xA5
+# magic, action type, point count, timestamp; then 2 float64 per point and the uint32 record size
+_HEADER = struct.Struct("<BBHd")
+_TRAILER = struct.Struct("<I")
+# The header stores the point count as a uint16
+MAX_POINTS = 0xFFFF
+# What encode_record raises for an action no record can hold (e.g. 3-d points)
+ENCODE_ERRORS = (KeyError, TypeError, ValueError, struct.error)
+
+
+def _record_size(points):
+    return _HEADER.size + 16 * points + _TRAILER.size
+
+
+def encode_record(action):
+    coords = action.get("coords") or []
+    if len(coords) > MAX_POINTS:
+        raise ValueError(f"{len(coords)} points, at most {MAX_POINTS} fit in a record")
+    if any(len(point) != 2 for point in coords):
+        raise ValueError("every point needs exactly two coordinates")
+    return b"".join((
+        _HEADER.pack(_MAGIC, ACTION_TYPES.index(action["action"]), len(coords), float(action["timestamp"])),
+        struct.pack(f"<{2 * len(coords)}d", *(v for point in coords for v in point)),
+        _TRAILER.pack(_record_size(len(coords))),
+    ))
+
+
+def decode_record(buf, offset):
+    _, kind, points, timestamp = _HEADER.unpack_from(buf, offset)
+    values = iter(struct.unpack_from(f"<{2 * points}d", buf, offset + _HEADER.size))
+    return {
+        "action": ACTION_TYPES[kind],
+        "coords": [list(point) for point in zip(values, values)],
+        "timestamp": timestamp,
+    }
+
+
+def _record_at(buf, offset, end):
+    """Size of the complete record starting at offset, or 0 if there is none."""
+    if offset < 0 or offset + _HEADER.size > end:
+        return 0
+    magic, kind, points, _ = _HEADER.unpack_from(buf, offset)
+    size = _record_size(points)
+    if magic != _MAGIC or kind >= len(ACTION_TYPES) or offset + size > end:
+        return 0
+    if _TRAILER.unpack_from(buf, offset + size - _TRAILER.size)[0] != size:
+        return 0
+    return size
+
+
+def _record_before(buf, end):
+    """Start of the complete record ending at end, or -1 if there is none."""
+    if end < _TRAILER.size:
+        return -1
+    start = end - _TRAILER.unpack_from(buf, end - _TRAILER.size)[0]
+    return start if _record_at(buf, start, end) == end - start else -1
+
+
+def read_log(path):
+    """Every complete action in a binary log, oldest first, without modifying the file."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            actions = []
+            offset = 0
+            while True:
+                size = _record_at(buf, offset, len(buf))
+                if not size:
+                    return actions
+                actions.append(decode_record(buf, offset))
+                offset += size
+
 
 class ActionStore:
-    def __init__(self, max_len=5000, save_path="data/actions.jsonl"):
-        self.data = deque(maxlen=max_len)
+    """
+    The most recent max_len actions in a ring buffer, persisted to an append-only binary
+    log. add() only queues an action for the log; save() encodes and writes the queued
+    ones, so a background thread can take that cost off the request path. Records end with
+    their size, so on startup the log is memory-mapped and walked backwards from the end,
+    decoding only the records kept. Once the log holds more than twice max_len records,
+    save() rewrites it with just the ring's. Actions are dicts with action, coords and
+    timestamp, as posted to /api/event. With save_path=None nothing is persisted.
+    """
+
+    def __init__(self, max_len=5000, save_path="data/actions.bin", save_every=50):
+        self.max_len = max_len
         self.save_path = save_path
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        # Adds between flushes of the write buffer; 0 leaves flushing to the caller, e.g. a background worker
+        self.save_every = save_every
+        self._ring = [None] * max_len
+        self._head = 0  # slot of the next add
+        self._count = 0
+        self._unwritten = deque()  # added but not yet in the log; deque appends/pops are thread-safe
+        # Held while adding and while compaction snapshots the ring, so no action is logged twice
+        self._lock = threading.Lock()
+        self._logged = 0  # records in the log, counting only those known from replay
+        self._file = None
+        if save_path is None:
+            return
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        if os.path.exists(save_path):
+            self._replay()
+        else:
+            self._import_legacy(os.path.splitext(save_path)[0] + ".jsonl")
+        self._file = open(save_path, "ab", buffering=64 * 1024)
+
+    def _push(self, action):
+        self._ring[self._head] = action
+        self._head = (self._head + 1) % self.max_len
+        self._count = min(self._count + 1, self.max_len)
+
+    def _replay(self):
+        with open(self.save_path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                end = self._valid_end(buf, size)
+                # The last record was fully checked by _valid_end; before it, following the
+                # size trailers and checking each start's magic byte is enough
+                starts = []
+                offset = end
+                trailer = _TRAILER.unpack_from
+                while offset > 0 and len(starts) < self.max_len:
+                    start = offset - trailer(buf, offset - _TRAILER.size)[0]
+                    if start < 0 or buf[start] != _MAGIC:
+                        break
+                    starts.append(start)
+                    offset = start
+                for start in reversed(starts):
+                    self._push(decode_record(buf, start))
+                kept_from = starts[-1] if starts else end
+        self._logged = len(starts)
+        if end < size:
+            # A write was cut short; drop the partial record so later appends line up
+            print(f"Dropping {size - end} bytes of incomplete records from {self.save_path}")
+            os.truncate(self.save_path, end)
+        if kept_from > end - kept_from:
+            # More than half the log is older than the ring holds
+            self._rewrite()
+
+    @staticmethod
+    def _valid_end(buf, size):
+        """End of the last complete record: the file end, unless a write was torn."""
+        if _record_before(buf, size) >= 0:
+            return size
+        offset = 0
+        while True:
+            record = _record_at(buf, offset, size)
+            if not record:
+                return offset
+            offset += record
+
+    def _import_legacy(self, path):
+        """Carry over the JSON lines file written by earlier versions of the store."""
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                action = json.loads(line)
+                try:
+                    encode_record(action)
+                except ENCODE_ERRORS as e:
+                    # The old API accepted points of any length
+                    print(f"Skipping unloggable action: {e}")
+                    continue
+                self._push(action)
+        self._rewrite()
+
+    def _rewrite(self, actions=None):
+        if actions is None:
+            actions = self.get_last(self._count)
+        tmp_path = self.save_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"".join(encode_record(action) for action in actions))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.save_path)
+        self._logged = len(actions)
+
+    def _compact(self):
+        with self._lock:
+            actions = self.get_last(self._count)
+            # Whatever is still queued is in this snapshot, or older than the ring keeps
+            self._unwritten.clear()
+        self._file.close()
+        self._rewrite(actions)
+        self._file = open(self.save_path, "ab", buffering=64 * 1024)
 
     def add(self, action):
-        self.data.append(action)
-        if len(self.data) % 50 == 0:
+        if self._file is None:
+            self._push(action)
+            return
+        with self._lock:
+            self._push(action)
+            self._unwritten.append(action)
+        if self.save_every and len(self._unwritten) >= self.save_every:
             self.save()
 
     def get_last(self, n):
-        return list(self.data)[-n:]
+        n = max(0, min(n, self._count))
+        start = self._head - n
+        if start >= 0:
+            return self._ring[start:self._head]
+        return self._ring[start:] + self._ring[:self._head]
 
     def __len__(self):
-        return len(self.data)
+        return self._count
 
     def save(self):
-        with open(self.save_path, "w") as f:
-            for a in self.data:
-                f.write(json.dumps(a) + "\n")
+        """Write the actions added since the last save and hand them to the OS."""
+        if self._file is None or self._file.closed:
+            return
+        records = []
+        while self._unwritten:
+            action = self._unwritten.popleft()
+            try:
+                records.append(encode_record(action))
+            except ENCODE_ERRORS as e:
+                # One malformed action must not cost the others their place in the log
+                print(f"Skipping unloggable action: {e}")
+        if records:
+            self._file.write(b"".join(records))
+            self._file.flush()
+            self._logged += len(records)
+        if self._logged > 2 * self.max_len:
+            self._compact()
 
+    def close(self):
+        if self._file is not None and not self._file.closed:
+            self.save()
+            os.fsync(self._file.fileno())
+            self._file.close()
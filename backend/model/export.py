@@ -0,0 +1,28 @@
+import os
+import sys
+import torch
+
+# The tracing, quantization check and timing code is shared with the desktop app's DQN
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    # Appended so the backend's own modules (e.g. model) still take precedence
+    sys.path.append(_REPO_ROOT)
+
+from core.model_export import (  # noqa: E402
+    export_optimized,
+    load_optimized,
+    max_output_error,
+    optimized_path,
+    time_forward,
+)
+
+
+def save_optimized(net, path, seq_len=20, check_inputs=None, tolerance=0.05):
+    """
+    Trace and freeze a copy of a Net into path for CPU inference. Its Linear layers are
+    quantized to int8 only if the outputs on `check_inputs` stay within `tolerance` of the
+    float32 net; raw pixel coordinates often make int8 too coarse, and float32 is kept then.
+    Returns ("int8" or "float32", max output error on check_inputs).
+    """
+    _, precision, error = export_optimized(net, torch.zeros(1, seq_len * 3), path, check_inputs, tolerance)
+    return precision, error
@@ -0,0 +1,60 @@
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .network import action_row
+
+
+class RollingFeatures:
+    """
+    Feature rows [cx, cy, type] of the most recent actions, each encoded once when it is
+    appended. seq_len zero rows precede the first action, so the seq_len rows before any
+    action form its zero-padded input window, as encode_actions would build it. Not
+    thread-safe: append and read from one thread.
+    """
+
+    def __init__(self, seq_len=20, capacity=5000):
+        self.seq_len = seq_len
+        self.capacity = capacity
+        # Room for two capacities of rows so that compacting (an O(capacity) copy) happens
+        # once per `capacity` appends
+        self._rows = np.zeros((seq_len + 2 * capacity, 3), dtype=np.float32)
+        self._start = seq_len  # first retained action
+        self._end = seq_len  # one past the newest action
+
+    def __len__(self):
+        return self._end - self._start
+
+    def append(self, action):
+        if self._end == len(self._rows):
+            self._compact()
+        self._rows[self._end] = action_row(action)
+        self._end += 1
+        if self._end - self._start > self.capacity:
+            self._start += 1
+
+    def _compact(self):
+        # Keep the retained actions plus the seq_len rows that precede them, as their window padding
+        keep = self._end - self._start + self.seq_len
+        self._rows[:keep] = self._rows[self._end - keep:self._end]
+        self._start, self._end = self.seq_len, keep
+
+    def windows(self):
+        """
+        Zero-copy view of shape (rows - seq_len + 1, seq_len, 3) where window i holds rows
+        i .. i + seq_len - 1, so the input window of the action in row p is window p - seq_len.
+        """
+        return sliding_window_view(self._rows[:self._end], self.seq_len, axis=0).transpose(0, 2, 1)
+
+    def batch(self, size):
+        """
+        (inputs, coords, action types) for the newest `size` actions as targets, each with the
+        seq_len actions before it as input; inputs are flattened to (n, seq_len * 3).
+        None until there are at least two actions.
+        """
+        n = min(size, len(self) - 1)
+        if n < 1:
+            return None
+        targets = np.arange(self._end - n, self._end)
+        x = self.windows()[targets - self.seq_len].reshape(n, self.seq_len * 3)
+        rows = self._rows[targets]
+        return x, rows[:, :2], rows[:, 2].astype(np.int64)
@@ -1,26 +1,41 @@
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
+import copy
+import os
 import uuid
+from .export import load_optimized, optimized_path, save_optimized
 
 
-def encode_actions(actions, max_len=20):
-    seq = actions[-max_len:]
-    out = []
-    for a in seq:
-        t = 0 if a["action"] == "place_room" else 1
-        coords = a.get("coords", [])
-        if coords:
-            xs = [p[0] for p in coords]
-            ys = [p[1] for p in coords]
-            cx = sum(xs) / len(xs)
-            cy = sum(ys) / len(ys)
-        else:
-            cx = cy = 0.0
-        out.append([cx, cy, t])
+def action_row(a):
+    """[centroid x, centroid y, type] feature row of one action; type is 0 for place_room."""
+    t = 0 if a["action"] == "place_room" else 1
+    coords = a.get("coords", [])
+    if coords:
+        xs = [p[0] for p in coords]
+        ys = [p[1] for p in coords]
+        cx = sum(xs) / len(xs)
+        cy = sum(ys) / len(ys)
+    else:
+        cx = cy = 0.0
+    return [cx, cy, t]
+
+
+def _action_rows(actions, max_len):
+    out = [action_row(a) for a in actions[-max_len:]]
     while len(out) < max_len:
         out.insert(0, [0.0, 0.0, 0.0])
-    return torch.tensor(out, dtype=torch.float32)
+    return out
+
+
+def encode_actions(actions, max_len=20):
+    return torch.tensor(_action_rows(actions, max_len), dtype=torch.float32)
+
+
+def encode_action_batch(action_lists, max_len=20):
+    """Encode several action histories into one (n, max_len * 3) input batch."""
+    rows = [_action_rows(actions, max_len) for actions in action_lists]
+    return torch.tensor(rows, dtype=torch.float32).reshape(len(rows), max_len * 3)
 
 
 class Net(nn.Module):
@@ -41,26 +56,73 @@ class Net(nn.Module):
 
 
 class Predictor:
-    def __init__(self, seq_len=20, device="cpu"):
+    def __init__(self, seq_len=20, device="cpu", weights_path=None):
         self.seq_len = seq_len
         self.device = device
         self.net = Net(seq_len).to(device)
-        self.prediction_id = None
+        self.weights_path = weights_path
+        # TorchScript export of the loaded weights (int8 when accurate enough), served until the first publish()
+        self.optimized = None
+        self.version = 0
+        if weights_path:
+            self.load(weights_path)
+        # The model predict_batch runs: a frozen snapshot of net, never modified once published,
+        # so predictions need no lock while net is being trained on another thread
+        self.serving = self.optimized
+        if self.serving is None:
+            self.publish()
+
+    def load(self, weights_path):
+        if not os.path.exists(weights_path):
+            return
+        self.net.load_state_dict(torch.load(weights_path, map_location=self.device))
+        if str(self.device) != "cpu":
+            return
+        # An export older than the weights was made from different parameters and is skipped
+        self.optimized = load_optimized(optimized_path(weights_path), newer_than=weights_path)
+
+    def save(self, weights_path=None, histories=None, tolerance=0.05):
+        """
+        Save the float weights and their TorchScript export next to them; the export is int8
+        only if it matches the float net within `tolerance` on `histories` (action lists,
+        e.g. recent sessions).
+        """
+        weights_path = weights_path or self.weights_path
+        torch.save(self.net.state_dict(), weights_path)
+        check_inputs = encode_action_batch(histories, self.seq_len) if histories else None
+        return save_optimized(self.net, optimized_path(weights_path), self.seq_len, check_inputs, tolerance)
+
+    def publish(self):
+        """Serve a copy of net's current weights from now on."""
+        snapshot = copy.deepcopy(self.net).eval()
+        for param in snapshot.parameters():
+            param.requires_grad_(False)
+        self.serving = snapshot
+        self.optimized = None
+        self.version += 1
 
     def predict(self, actions):
-        x = encode_actions(actions, self.seq_len).flatten().unsqueeze(0).to(self.device)
-        with torch.no_grad():
-            coords, action = self.net(x)
-        coords = coords.squeeze(0).cpu().tolist()
-        action_probs = action.squeeze(0).cpu().tolist()
-        action_type = "place_room" if action_probs[0] >= action_probs[1] else "pathway_segment"
-        self.prediction_id = str(uuid.uuid4())
-        return {
-            "prediction_id": self.prediction_id,
-            "predicted_action": action_type,
-            "predicted_coords": coords,
-            "confidence": max(action_probs),
-        }
+        return self.predict_batch([actions])[0]
+
+    def predict_batch(self, action_lists):
+        """One forward pass for several action histories; returns one prediction dict per history."""
+        x = encode_action_batch(action_lists, self.seq_len).to(self.device)
+        serving = self.serving
+        with torch.inference_mode():
+            coords, action = serving(x)
+        coords = coords.cpu().tolist()
+        action_probs = action.cpu().tolist()
+        predictions = []
+        for point, probs in zip(coords, action_probs):
+            action_type = "place_room" if probs[0] >= probs[1] else "pathway_segment"
+            prediction_id = str(uuid.uuid4())
+            predictions.append({
+                "prediction_id": prediction_id,
+                "predicted_action": action_type,
+                "predicted_coords": point,
+                "confidence": max(probs),
+            })
+        return predictions
 
     def parameters(self):
         return self.net.parameters()
@@ -6,15 +6,14 @@ class Reinforce:
         self.predictor = predictor
         self.opt = torch.optim.Adam(self.predictor.parameters(), lr=lr)
 
-    def apply(self, reward, actions, prediction_id):
-        if self.predictor.prediction_id != prediction_id:
-            return
+    def apply(self, reward, actions):
+        """Nudge the network by reward for the prediction made from `actions`."""
         if len(actions) < 2:
             return
         feat = actions[-2:]
         from .network import encode_actions
 
-        x = encode_actions(feat, max_len=2).flatten().unsqueeze(0)
+        x = encode_actions(feat, max_len=self.predictor.seq_len).flatten().unsqueeze(0)
         coords_pred, action_pred = self.predictor.net(x)
         # Simple reward nudging
         loss = -reward * (coords_pred.mean() + action_pred.mean())
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+
+from .dataset import ActionStore
+
+DEFAULT_SESSION = "default"
+
+
+class PredictionRegistry:
+    """The inputs of a session's most recent predictions by id, so feedback can be matched to them."""
+
+    def __init__(self, max_predictions=64):
+        self.max_predictions = max_predictions
+        self._entries = OrderedDict()
+
+    def add(self, prediction_id, actions):
+        self._entries[prediction_id] = actions
+        if len(self._entries) > self.max_predictions:
+            self._entries.popitem(last=False)
+
+    def pop(self, prediction_id):
+        """Actions the prediction was made from, or None if unknown or already rated."""
+        return self._entries.pop(prediction_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class Session:
+    def __init__(self, history_len, max_predictions):
+        # Recent actions only; the global ActionStore keeps the durable log
+        self.actions = ActionStore(max_len=history_len, save_path=None)
+        self.predictions = PredictionRegistry(max_predictions)
+        self.last_seen = 0.0
+
+
+class SessionRegistry:
+    """
+    Per-session action history and prediction registry, for at most max_sessions sessions.
+    Sessions are kept in least-recently-used order; the least recently used is evicted when
+    there are too many, and any not used for ttl_seconds are evicted on the next access.
+    on_evict(session_id) is called for each evicted session, so per-session state kept
+    elsewhere can be dropped with it. Used from the event loop only.
+    """
+
+    def __init__(self, max_sessions=1000, ttl_seconds=3600.0, history_len=64, max_predictions=64,
+                 clock=time.monotonic, on_evict=None):
+        self.max_sessions = max_sessions
+        self.ttl = ttl_seconds
+        self.history_len = history_len
+        self.max_predictions = max_predictions
+        self.clock = clock
+        self.on_evict = on_evict
+        self._sessions = OrderedDict()
+        self.evicted = 0
+
+    def get(self, session_id):
+        """The session's state, created if new or evicted; marks it as just used."""
+        now = self.clock()
+        self._evict_expired(now)
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = Session(self.history_len, self.max_predictions)
+            if len(self._sessions) > self.max_sessions:
+                self._evict_oldest()
+        else:
+            self._sessions.move_to_end(session_id)
+        session.last_seen = now
+        return session
+
+    def _evict_expired(self, now):
+        # LRU order is also last_seen order, so expired sessions are all at the front
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))
+            if now - oldest.last_seen < self.ttl:
+                break
+            self._evict_oldest()
+
+    def _evict_oldest(self):
+        session_id, _ = self._sessions.popitem(last=False)
+        self.evicted += 1
+        if self.on_evict is not None:
+            self.on_evict(session_id)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def stats(self):
+        return {"sessions": len(self._sessions), "evicted": self.evicted}
@@ -0,0 +1,121 @@
+import asyncio
+import json
+
+from fastapi import WebSocket
+
+
+class PredictionStream:
+    """
+    Serves one WebSocket connection. Each frame holds a JSON message or a list of messages;
+    {"type": "predict"} asks for a prediction and any other message goes to handle(message),
+    whose non-None return value is sent back. Replies queued while a send is in progress go
+    out together in one frame, as a list.
+
+    Backpressure: prediction requests made while one is being computed collapse into a
+    single follow-up, and an unsent prediction is replaced when a newer one is ready, so a
+    slow reader gets the latest prediction instead of a growing backlog.
+    """
+
+    def __init__(self, websocket: WebSocket, handle, predict, max_frame_messages=256, max_outbox=64):
+        self.websocket = websocket
+        self.handle = handle
+        self.predict = predict
+        self.max_frame_messages = max_frame_messages
+        self.max_outbox = max_outbox
+        self._wanted = asyncio.Event()  # a prediction was requested since the last one started
+        self._ready = asyncio.Event()  # something is waiting to be sent
+        self._outbox = []
+        self._prediction = None  # newest prediction not sent yet
+        self.frames_received = 0
+        self.frames_sent = 0
+        self.predictions_replaced = 0
+
+    async def run(self):
+        await self.websocket.accept()
+        tasks = [asyncio.create_task(self._predict_loop()), asyncio.create_task(self._send_loop())]
+        try:
+            while True:
+                frame = await self.websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
+                if frame.get("text") is None:
+                    self._reply({"type": "error", "detail": "binary frames are not supported"})
+                    continue
+                try:
+                    self._receive(frame["text"])
+                except Exception as e:
+                    # A bad frame is reported to the client; only a disconnect ends the stream
+                    print(f"Error handling stream frame: {e}")
+                    self._reply({"type": "error", "detail": "frame could not be handled"})
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _receive(self, text):
+        self.frames_received += 1
+        try:
+            messages = json.loads(text)
+        except ValueError:
+            self._reply({"type": "error", "detail": "frame is not valid JSON"})
+            return
+        if isinstance(messages, dict):
+            messages = [messages]
+        if not isinstance(messages, list) or len(messages) > self.max_frame_messages:
+            self._reply({"type": "error", "detail": f"expected a message or a list of at most "
+                                                    f"{self.max_frame_messages} messages"})
+            return
+        for message in messages:
+            if not isinstance(message, dict):
+                self._reply({"type": "error", "detail": "messages must be objects"})
+            elif message.get("type") == "predict":
+                self._wanted.set()
+            else:
+                try:
+                    reply = self.handle(message)
+                except ValueError as e:
+                    # Includes pydantic validation errors
+                    self._reply({"type": "error", "detail": str(e)})
+                    continue
+                except Exception as e:
+                    print(f"Error handling stream message: {e}")
+                    self._reply({"type": "error", "detail": "message could not be handled"})
+                    continue
+                if reply is not None:
+                    self._reply(reply)
+
+    def _reply(self, message):
+        if len(self._outbox) >= self.max_outbox:
+            # The client is not reading; keep the newest replies
+            del self._outbox[0]
+        self._outbox.append(message)
+        self._ready.set()
+
+    async def _predict_loop(self):
+        while True:
+            await self._wanted.wait()
+            self._wanted.clear()
+            try:
+                prediction = await self.predict()
+            except Exception as e:
+                print(f"Error predicting for stream: {e}")
+                self._reply({"type": "error", "detail": "prediction failed"})
+                continue
+            if self._prediction is not None:
+                self.predictions_replaced += 1
+            self._prediction = {"type": "prediction", **prediction}
+            self._ready.set()
+
+    async def _send_loop(self):
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            messages, self._outbox = self._outbox, []
+            if self._prediction is not None:
+                messages.append(self._prediction)
+                self._prediction = None
+            if not messages:
+                continue
+            # Waits while the client is not reading; predictions made meanwhile replace each other
+            await self.websocket.send_text(json.dumps(messages[0] if len(messages) == 1 else messages))
+            self.frames_sent += 1
@@ -1,44 +1,58 @@
+from collections import OrderedDict
+import numpy as np
 import torch
 import torch.nn as nn
 import torch.optim as optim
-from .network import encode_actions
+from .features import RollingFeatures
+from .sessions import DEFAULT_SESSION
 
 
 class OnlineTrainer:
-    def __init__(self, predictor, store, lr=1e-3, seq_len=20):
+    def __init__(self, predictor, store, lr=1e-3, seq_len=20, capacity=512, max_sessions=1000):
         self.predictor = predictor
         self.store = store
         self.seq_len = seq_len
+        self.capacity = capacity
+        self.max_sessions = max_sessions
         self.opt = optim.Adam(self.predictor.parameters(), lr=lr)
         self.loss_coord = nn.MSELoss()
         self.loss_action = nn.CrossEntropyLoss()
+        # Each session's actions, encoded once by observe(), so that training windows never
+        # mix sessions; least recently updated sessions are dropped beyond max_sessions
+        self.features = OrderedDict()
+        for action in store.get_last(capacity):
+            self.observe(action)
 
-    def sample(self, batch_size=8):
-        data = self.store.get_last(batch_size + 1)
-        if len(data) < 2:
+    def observe(self, action, session_id=DEFAULT_SESSION):
+        """Encode a new action for training; call it for every action added to the store."""
+        features = self.features.get(session_id)
+        if features is None:
+            features = self.features[session_id] = RollingFeatures(self.seq_len, self.capacity)
+            if len(self.features) > self.max_sessions:
+                self.features.popitem(last=False)
+        else:
+            self.features.move_to_end(session_id)
+        features.append(action)
+
+    def forget(self, session_id):
+        """Drop a session's encoded actions, e.g. once the session registry has evicted it."""
+        self.features.pop(session_id, None)
+
+    def sample(self, batch_size=8, sessions=None):
+        """
+        Targets are the newest actions of each session in `sessions`, a dict of session id ->
+        number of actions to take from it (default: batch_size from the default session).
+        """
+        sizes = sessions or {DEFAULT_SESSION: batch_size}
+        parts = [self.features[s].batch(n) for s, n in sizes.items() if s in self.features]
+        parts = [part for part in parts if part is not None]
+        if not parts:
             return None
-        x = []
-        y_coords = []
-        y_action = []
-        for i in range(len(data) - 1):
-            hist = data[: i + 1]
-            target = data[i + 1]
-            feat = encode_actions(hist, self.seq_len).flatten()
-            x.append(feat)
-            coords = target.get("coords", [])
-            if coords:
-                xs = [p[0] for p in coords]
-                ys = [p[1] for p in coords]
-                cx = sum(xs) / len(xs)
-                cy = sum(ys) / len(ys)
-            else:
-                cx = cy = 0.0
-            y_coords.append([cx, cy])
-            y_action.append(0 if target["action"] == "place_room" else 1)
-        return torch.stack(x), torch.tensor(y_coords, dtype=torch.float32), torch.tensor(y_action)
+        x, y_coords, y_action = (np.concatenate(arrays) for arrays in zip(*parts))
+        return torch.from_numpy(x), torch.from_numpy(y_coords), torch.from_numpy(y_action)
 
-    def train_step(self):
-        batch = self.sample()
+    def train_step(self, batch_size=8, sessions=None):
+        batch = self.sample(batch_size, sessions)
         if batch is None:
             return
         x, y_coords, y_action = batch
@@ -49,4 +63,5 @@ class OnlineTrainer:
         self.opt.zero_grad()
         loss.backward()
         self.opt.step()
+        return loss.item()
 
@@ -0,0 +1,167 @@
+import os
+import queue
+import sys
+import threading
+import time
+
+from .sessions import DEFAULT_SESSION
+
+_STOP = object()
+
+
+class TrainingWorker:
+    """
+    Trains the predictor on a dedicated thread so request handlers never run a backward
+    pass. Handlers enqueue events and feedback; at most every train_interval_ms the worker
+    trains one mini-batch over the events that arrived since its last round, then publishes
+    a snapshot of the weights for Predictor.predict_batch to serve.
+    """
+
+    def __init__(self, predictor, trainer, reinforce, store, train_interval_ms=200.0, max_batch_size=64,
+                 save_every=50, nice=10):
+        self.predictor = predictor
+        self.trainer = trainer
+        self.reinforce = reinforce
+        self.store = store
+        self.train_interval = train_interval_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        # Events between flushes of the action store's write buffer, also done on the worker thread
+        self.save_every = save_every
+        # Scheduling priority of the worker thread relative to the request handlers (Linux only)
+        self.nice = nice
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+        self.events_received = 0
+        self.events_trained = 0
+        self.feedback_processed = 0
+        self.rounds = 0
+        self.last_round_ms = None
+        self.last_loss = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="predictor-training", daemon=True)
+            self._thread.start()
+
+    def submit_event(self, action, session_id=DEFAULT_SESSION):
+        """Queue an action already added to the store; it is encoded and trained on by the worker."""
+        self.events_received += 1
+        self._queue.put(("event", (action, session_id)))
+
+    def submit_feedback(self, reward, actions):
+        """Queue a reward for the prediction that was made from `actions`."""
+        self._queue.put(("feedback", (reward, actions)))
+
+    def submit_session_end(self, session_id):
+        """Queue dropping an evicted session's training features, after its queued events."""
+        self._queue.put(("session_end", session_id))
+
+    def _lower_priority(self):
+        # On Linux a thread id passed as PRIO_PROCESS renices just that thread, so on few
+        # cores request handling preempts a training round instead of queueing behind it
+        if not self.nice or not sys.platform.startswith("linux"):
+            return
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), self.nice)
+        except OSError as e:
+            print(f"Could not lower the training thread's priority: {e}")
+
+    def _run(self):
+        self._lower_priority()
+        pending = {}  # session id -> events not trained on yet
+        unsaved = 0
+        last_round = 0.0
+        while True:
+            timeout = None if not pending else max(0.0, last_round + self.train_interval - time.monotonic())
+            try:
+                items = [self._queue.get(timeout=timeout)]
+            except queue.Empty:
+                items = []
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = any(item is _STOP for item in items)
+
+            reinforced = False
+            for item in items:
+                if item is _STOP:
+                    continue
+                kind, payload = item
+                if kind == "event":
+                    action, session_id = payload
+                    self.trainer.observe(action, session_id)
+                    pending[session_id] = pending.get(session_id, 0) + 1
+                    unsaved += 1
+                elif kind == "session_end":
+                    self.trainer.forget(payload)
+                    pending.pop(payload, None)
+                else:
+                    reinforced = self._apply_feedback(*payload) or reinforced
+            if unsaved >= self.save_every or (stopping and unsaved):
+                self._save_store()
+                unsaved = 0
+
+            if pending and (stopping or time.monotonic() - last_round >= self.train_interval):
+                self._train(pending)
+                pending = {}
+                last_round = time.monotonic()
+            elif reinforced:
+                self.predictor.publish()
+            if stopping:
+                return
+
+    def _apply_feedback(self, reward, actions):
+        try:
+            self.reinforce.apply(reward, actions)
+            self.feedback_processed += 1
+            return True
+        except Exception as e:
+            print(f"Error applying feedback: {e}")
+            return False
+
+    def _train(self, new_events):
+        start = time.perf_counter()
+        # One mini-batch covering the events each session sent since the last round, scaled
+        # down to max_batch_size rows but with at least each session's newest event
+        total = sum(new_events.values())
+        sizes = {session_id: max(count, 8) for session_id, count in new_events.items()}
+        scale = min(1.0, self.max_batch_size / sum(sizes.values()))
+        sessions = {session_id: max(1, int(size * scale)) for session_id, size in sizes.items()}
+        try:
+            loss = self.trainer.train_step(sessions=sessions)
+            self.predictor.publish()
+        except Exception as e:
+            print(f"Error training predictor: {e}")
+            return
+        self.rounds += 1
+        self.events_trained += total
+        self.last_loss = loss
+        self.last_round_ms = round((time.perf_counter() - start) * 1000, 3)
+
+    def _save_store(self):
+        try:
+            self.store.save()
+        except Exception as e:
+            print(f"Error saving actions: {e}")
+
+    def close(self, timeout=10.0):
+        """Train on anything still queued, save the store and stop the thread."""
+        if self._thread is None:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def stats(self):
+        return {
+            "events_received": self.events_received,
+            "events_trained": self.events_trained,
+            "feedback_processed": self.feedback_processed,
+            "train_rounds": self.rounds,
+            "last_round_ms": self.last_round_ms,
+            "last_loss": self.last_loss,
+            "queued": self._queue.qsize(),
+            "snapshot_version": self.predictor.version,
+        }
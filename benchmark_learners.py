@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark the PatternLearner backends over a long annotation session.
+Compares the forest refit against the online learner's per-pattern update as the
+number of recorded patterns grows, plus suggestion latency for both.
+"""
+
+import argparse
+import math
+import os
+import random
+import tempfile
+import time
+
+from pattern_learner import PatternLearner
+
+
+def square(cx, cy, side):
+    half = side / 2
+    return [[cx - half, cy - half], [cx + half, cy - half], [cx + half, cy + half], [cx - half, cy + half]]
+
+
+def room_stream(count, seed=0):
+    """Rooms laid out along corridors: mostly straight runs with occasional turns."""
+    rng = random.Random(seed)
+    x, y, heading = 0.0, 0.0, 0.0
+    for _ in range(count):
+        side = rng.choice([40, 60, 80]) + rng.gauss(0, 3)
+        if rng.random() < 0.15:
+            heading = (heading + rng.choice([90, -90])) % 360
+        step = side * 1.2 + rng.gauss(0, 4)
+        x += step * math.cos(math.radians(heading))
+        y += step * math.sin(math.radians(heading))
+        yield square(x, y, side)
+
+
+def make_learner(directory, backend):
+    learner = PatternLearner(os.path.join(directory, f"{backend}.json"), demo_mode=True,
+                             max_patterns=None, learner_backend=backend)
+    # Demo mode skips the DQN; switch it off afterwards so suggestions use the real models
+    learner.demo_mode = False
+    # Forest refits are timed explicitly at each checkpoint instead of in the background
+    learner.request_training = lambda: None
+    return learner
+
+
+def time_suggestions(learner, rooms, repeats=20):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        learner.suggest_positions(rooms[-2:])
+    return (time.perf_counter() - start) / repeats
+
+
+def run(num_patterns, step):
+    rooms = list(room_stream(num_patterns + 2))
+    with tempfile.TemporaryDirectory() as directory:
+        forest = make_learner(directory, "forest")
+        online = make_learner(directory, "online")
+
+        print(f"{'patterns':>8} {'forest refit ms':>16} {'forest suggest ms':>18} "
+              f"{'online update ms':>17} {'online suggest ms':>18}")
+        for checkpoint in range(step, num_patterns + 1, step):
+            start_index = len(forest.patterns)
+            for i in range(start_index, checkpoint):
+                forest.record_pattern(rooms[i:i + 3])
+
+            start = time.perf_counter()
+            for i in range(start_index, checkpoint):
+                online.record_pattern(rooms[i:i + 3])
+            online_update = (time.perf_counter() - start) / (checkpoint - start_index)
+
+            start = time.perf_counter()
+            forest.train_model()
+            forest_refit = time.perf_counter() - start
+
+            recent = rooms[checkpoint - 2:checkpoint]
+            print(f"{checkpoint:>8} {forest_refit * 1000:>16.1f} {time_suggestions(forest, recent) * 1000:>18.2f} "
+                  f"{online_update * 1000:>17.3f} {time_suggestions(online, recent) * 1000:>18.2f}")
+
+        for name, learner in (("forest", forest), ("online", online)):
+            status = learner.get_status()
+            print(f"{name}: distance RMSE {status.get('distance_rmse')}, direction RMSE {status.get('direction_rmse')}")
+            learner.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--patterns", type=int, default=10000)
+    parser.add_argument("--step", type=int, default=1000)
+    args = parser.parse_args()
+    run(args.patterns, args.step)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Measure application import time with `python -X importtime`.
+Reports the total and the slowest top-level imports, and fails when the total exceeds
+--max-ms or when a deferred ML backend (torch, sklearn) is imported at startup.
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFERRED_MODULES = ("torch", "sklearn", "joblib")
+
+
+def import_times(module):
+    """Run a fresh interpreter and parse its importtime report into (name, self_us, cumulative_us, depth)."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # One leading space at top level, two more per nesting level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=15, help="number of slowest imports to list")
+    parser.add_argument("--runs", type=int, default=3, help="take the fastest of this many runs")
+    parser.add_argument("--max-ms", type=float, default=None, help="fail if the total exceeds this")
+    args = parser.parse_args()
+
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = [sum(c for name, _, c, depth in r if depth == 0 and name == args.module) for r in runs]
+    best = min(range(len(runs)), key=totals.__getitem__)
+    rows, total_ms = runs[best], totals[best] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (best of {args.runs})")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    # Direct imports of the measured module
+    children = [row for row in rows if row[3] == 1]
+    for name, self_us, cumulative_us, _ in sorted(children, key=lambda r: r[2], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+
+    failed = False
+    eager = sorted({name for name, *_ in rows if name.split(".")[0] in DEFERRED_MODULES})
+    if eager:
+        roots = sorted({name.split(".")[0] for name in eager})
+        print(f"FAIL: imported at startup: {', '.join(roots)}")
+        failed = True
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"FAIL: {total_ms:.0f} ms exceeds --max-ms {args.max_ms:.0f}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
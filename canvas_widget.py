@@ -22,11 +22,25 @@ from PyQt6.QtGui import (
     QPainter,
     QImageReader,
     QPainterPath,
+    QFont,
 )
 from auto_complete import AutoCompleteEngine
 from pattern_learner import PatternLearner
-from typing import List, Optional, Tuple
+from suggestion_worker import SuggestionWorker
+from tiled_image import TilePyramid, TiledImageItem
+from adapters.adapter_registry import create_default_registry
+from level_of_detail import (
+    FrameTimer,
+    lod_bucket,
+    tolerance_for_bucket,
+    ring_significance,
+    simplify_polygon,
+    simplify_polyline,
+)
+from typing import Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
 import json
+import time
 
 
 class RoomItem(QGraphicsPolygonItem):
@@ -35,6 +49,11 @@ class RoomItem(QGraphicsPolygonItem):
     def __init__(self, vertices, room_id=None, name="Room", room_type="Room"):
         polygon = QPolygonF([QPointF(v[0], v[1]) for v in vertices])
         super().__init__(polygon)
+        self._full_polygon = polygon
+        self._shown_polygon = polygon
+        self._simplified: Dict[int, QPolygonF] = {}  # zoom bucket -> outline
+        self._significance: Optional[List[float]] = None
+        self._detail_bucket = 0
         self.room_id = room_id
         self.name = name
         self.room_type = room_type
@@ -49,8 +68,35 @@ class RoomItem(QGraphicsPolygonItem):
 
     def get_vertices(self):
         """Get vertices as list of [x, y] tuples."""
-        polygon = self.polygon()
-        return [[point.x(), point.y()] for point in polygon]
+        return [[point.x(), point.y()] for point in self._full_polygon]
+
+    def setPolygon(self, polygon: QPolygonF):
+        self._full_polygon = polygon
+        self._simplified.clear()
+        self._significance = None
+        bucket = self._detail_bucket
+        self._detail_bucket = -1
+        self.set_detail_level(bucket)
+
+    def set_detail_level(self, bucket: int):
+        """Show the outline simplified for a zoom bucket (0 is full detail)."""
+        if bucket == self._detail_bucket:
+            return
+        self._detail_bucket = bucket
+        if bucket == 0:
+            polygon = self._full_polygon
+        else:
+            polygon = self._simplified.get(bucket)
+            if polygon is None:
+                points = list(self._full_polygon)
+                if self._significance is None:
+                    self._significance = ring_significance(points)
+                points = simplify_polygon(points, tolerance_for_bucket(bucket), self._significance)
+                polygon = self._full_polygon if len(points) == len(self._full_polygon) else QPolygonF(points)
+                self._simplified[bucket] = polygon
+        if polygon is not self._shown_polygon:
+            self._shown_polygon = polygon
+            super().setPolygon(polygon)
 
     def update_appearance(self, selected=False, is_navigation_start=False, is_navigation_end=False):
         """Update room appearance based on selection and navigation state."""
@@ -184,6 +230,126 @@ class PathwayItem(QGraphicsPathItem):
         self.setPen(pen)
 
 
+class PathwayLayerItem(QGraphicsPathItem):
+    """All pathways of the shown floor merged into one path, drawn instead of the items when zoomed out."""
+
+    # Below this zoom individual PathwayItems are hidden in favour of the merged layer
+    MERGE_BELOW_LOD = 0.5
+
+    def __init__(self):
+        super().__init__()
+        self.setPen(QPen(QColor(160, 60, 200), 3))
+        self.setZValue(499)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self.setVisible(False)
+
+    def rebuild(self, pathway_items: List["PathwayItem"]):
+        tolerance = tolerance_for_bucket(lod_bucket(self.MERGE_BELOW_LOD))
+        path = QPainterPath()
+        for item in pathway_items:
+            points = simplify_polyline(item.points, tolerance)
+            if not points:
+                continue
+            path.moveTo(points[0])
+            for p in points[1:]:
+                path.lineTo(p)
+        self.setPath(path)
+
+
+class NavigationPathItem(QGraphicsPathItem):
+    """The route on the shown floor: polyline, direction arrows and floor-transition markers in one item."""
+
+    ARROW_SIZE = 12.0
+    TRANSITION_RADIUS = 9.0
+
+    def __init__(self):
+        super().__init__()
+        self.setPen(QPen(QColor(255, 0, 0), 3))
+        self.setZValue(999)
+        self.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
+        self._arrows = QPainterPath()
+        self._transitions = QPainterPath()
+        self._bounds = QRectF()
+        self.setVisible(False)
+
+    def set_route(self, points: List[Tuple[float, float]], enters_floor: bool = False, leaves_floor: bool = False):
+        """Rebuild the cached paths in place; enters/leaves mark where the route changes floor."""
+        if len(points) < 2:
+            self.clear_route()
+            return
+        qpoints = [QPointF(float(x), float(y)) for x, y in points]
+        line = QPainterPath()
+        line.moveTo(qpoints[0])
+        arrows = QPainterPath()
+        for start, end in zip(qpoints, qpoints[1:]):
+            line.lineTo(end)
+            self._add_arrow(arrows, start, end)
+
+        transitions = QPainterPath()
+        if enters_floor:
+            self._add_transition(transitions, qpoints[0])
+        if leaves_floor:
+            self._add_transition(transitions, qpoints[-1])
+
+        self.prepareGeometryChange()
+        self._arrows = arrows
+        self._transitions = transitions
+        self.setPath(line)
+        margin = self.pen().widthF()
+        self._bounds = (line.boundingRect().united(arrows.boundingRect()).united(transitions.boundingRect())
+                        .adjusted(-margin, -margin, margin, margin))
+        self.setVisible(True)
+
+    def clear_route(self):
+        self.prepareGeometryChange()
+        self._arrows = QPainterPath()
+        self._transitions = QPainterPath()
+        self._bounds = QRectF()
+        self.setPath(QPainterPath())
+        self.setVisible(False)
+
+    def _add_arrow(self, arrows: QPainterPath, start: QPointF, end: QPointF):
+        dx = end.x() - start.x()
+        dy = end.y() - start.y()
+        length = (dx * dx + dy * dy) ** 0.5
+        # Short segments would be covered by their own arrow
+        if length < self.ARROW_SIZE * 2:
+            return
+        ux, uy = dx / length, dy / length
+        size = self.ARROW_SIZE
+        tip = QPointF((start.x() + end.x()) / 2 + ux * size / 2, (start.y() + end.y()) / 2 + uy * size / 2)
+        base_x, base_y = tip.x() - ux * size, tip.y() - uy * size
+        arrows.addPolygon(QPolygonF([
+            tip,
+            QPointF(base_x - uy * size / 2, base_y + ux * size / 2),
+            QPointF(base_x + uy * size / 2, base_y - ux * size / 2),
+        ]))
+        arrows.closeSubpath()
+
+    def _add_transition(self, transitions: QPainterPath, point: QPointF):
+        r = self.TRANSITION_RADIUS
+        transitions.addPolygon(QPolygonF([
+            QPointF(point.x(), point.y() - r),
+            QPointF(point.x() + r, point.y()),
+            QPointF(point.x(), point.y() + r),
+            QPointF(point.x() - r, point.y()),
+        ]))
+        transitions.closeSubpath()
+
+    def boundingRect(self) -> QRectF:
+        return self._bounds
+
+    def paint(self, painter, option, widget=None):
+        painter.setPen(self.pen())
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.drawPath(self.path())
+        painter.fillPath(self._arrows, QColor(255, 0, 0))
+        if not self._transitions.isEmpty():
+            painter.setPen(QPen(QColor(30, 30, 30), 2))
+            painter.setBrush(QBrush(QColor(240, 220, 80)))
+            painter.drawPath(self._transitions)
+
+
 class StairItem(QGraphicsEllipseItem):
     def __init__(self, x: float, y: float, stair_id: Optional[int] = None, to_floor_id: Optional[int] = None):
         size = 18.0
@@ -202,10 +368,14 @@ class StairItem(QGraphicsEllipseItem):
 class FloorPlanCanvas(QGraphicsView):
     """Main canvas for displaying and editing floor plans."""
 
+    # Images with a side longer than this are shown through a tiled pyramid
+    TILED_IMAGE_THRESHOLD = 4096
+
     # Signals
     room_selected = pyqtSignal(object)  # Emits RoomItem
     room_created = pyqtSignal(object)  # Emits RoomItem
     learning_status_changed = pyqtSignal(dict)  # Emits learning status dict
+    _training_finished = pyqtSignal()  # emitted from the training thread, delivered on the GUI thread
     stair_placement_requested = pyqtSignal(float, float)  # Emits x, y
     pathway_created = pyqtSignal(object)  # Emits PathwayItem
     pathway_deleted = pyqtSignal(int)  # Emits pathway_id
@@ -218,6 +388,7 @@ class FloorPlanCanvas(QGraphicsView):
         # Image background
         self.background_item = None
         self.current_image_path = None
+        self.image_adapters = create_default_registry()
 
         # Drawing state
         self.current_tool = "select"  # select, draw_room, draw_pathway, draw_stair
@@ -229,6 +400,11 @@ class FloorPlanCanvas(QGraphicsView):
         # Pattern learning
         self.pattern_learner = PatternLearner(demo_mode=False)
         self.pattern_suggestion_markers = []  # List of PatternSuggestionMarker items
+        self.pattern_suggestions = None  # latest worker result, reused by the drawing preview
+        self.suggestion_worker = SuggestionWorker(self.pattern_learner, parent=self)
+        self.suggestion_worker.suggestions_ready.connect(self.show_pattern_suggestions)
+        self._training_finished.connect(self._on_training_finished)
+        self.pattern_learner.trainer.callbacks.append(self._training_finished.emit)
 
         # Room items
         self.room_items = []
@@ -238,7 +414,8 @@ class FloorPlanCanvas(QGraphicsView):
         self.navigation_mode = False
         self.navigation_start_room = None
         self.navigation_end_room = None
-        self.navigation_path_items = []  # Path visualization items
+        self.navigation_path_item = NavigationPathItem()
+        self.scene.addItem(self.navigation_path_item)
         self.last_navigation_path_by_floor = {}
 
         # Pathway and stair items
@@ -249,6 +426,18 @@ class FloorPlanCanvas(QGraphicsView):
         # Demo mode enhancements
         self.show_demo_help = True
 
+        # Nesting depth of bulk_update() blocks
+        self._bulk_depth = 0
+
+        # Level of detail
+        self.pathway_layer = PathwayLayerItem()
+        self.scene.addItem(self.pathway_layer)
+        self._pathway_layer_dirty = True
+        self._pathways_merged = False
+        self._room_detail_bucket = 0  # lod_bucket of the current zoom
+        self.frame_timer: Optional[FrameTimer] = None  # set while the frame-time overlay is shown
+        self._viewport_update_mode = None
+
         # View settings
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
@@ -261,9 +450,20 @@ class FloorPlanCanvas(QGraphicsView):
 
     def load_image(self, image_path: str):
         """Load and display floor plan image."""
+        adapter = self.image_adapters.get_adapter(image_path)
+        if adapter is not None and adapter.get_format() == "SVG":
+            # Vector plans are rasterized at their own resolution, never through the tile pyramid
+            image, ok = adapter.load(image_path)
+            if not ok:
+                return False
+            return self.set_background_pixmap(image_path, QPixmap.fromImage(image))
+
         try:
             reader = QImageReader(image_path)
             reader.setAutoTransform(True)
+            size = reader.size()
+            if size.isValid() and max(size.width(), size.height()) > self.TILED_IMAGE_THRESHOLD:
+                return self.load_tiled_image(image_path)
             image = reader.read()
         except Exception:
             return False
@@ -271,36 +471,65 @@ class FloorPlanCanvas(QGraphicsView):
         if image.isNull():
             return False
 
-        # Downscale extremely large images to avoid GPU/OS crashes
-        max_dimension = 8000
-        if image.width() > max_dimension or image.height() > max_dimension:
-            image = image.scaled(
-                max_dimension,
-                max_dimension,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
+        return self.set_background_pixmap(image_path, QPixmap.fromImage(image))
+
+    def set_background_pixmap(self, image_path: str, pixmap: QPixmap):
+        """Display an already decoded floor plan image."""
+        self.current_image_path = image_path
+        self._set_background_item(self.scene.addPixmap(pixmap))
 
-        pixmap = QPixmap.fromImage(image)
+        return True
+
+    def load_tiled_image(self, image_path: str):
+        """Display a large image as a lazily loaded tile pyramid (built once and cached on disk)."""
+        pyramid = TilePyramid(image_path)
+        if not pyramid.is_valid():
+            return False
 
         self.current_image_path = image_path
+        item = TiledImageItem(pyramid, fallback_dimension=self.TILED_IMAGE_THRESHOLD)
+        self.scene.addItem(item)
+        self._set_background_item(item)
+        item.pyramid_ready.connect(lambda ok, item=item: self._on_pyramid_ready(item, ok))
 
+        return True
+
+    def _on_pyramid_ready(self, item: TiledImageItem, ok: bool):
+        if item is not self.background_item:
+            return
+        if ok:
+            # Header size ignores EXIF rotation; re-fit once the real size is known
+            self.scene.setSceneRect(item.boundingRect())
+            self.fitInView(item, Qt.AspectRatioMode.KeepAspectRatio)
+            return
+        # The pyramid could not be built (unwritable cache, or the full-size decode failed);
+        # show the copy the build task reduced to TILED_IMAGE_THRESHOLD, scaled back up to
+        # image coordinates
+        image_path = item.pyramid.image_path
+        if item.fallback_image is None:
+            print(f"Error loading floor plan image: {image_path}")
+            return
+        scale = item.fallback_scale
+        self.set_background_pixmap(image_path, QPixmap.fromImage(item.fallback_image))
+        if scale != 1.0:
+            self.background_item.setScale(scale)
+            self.scene.setSceneRect(self.background_item.sceneBoundingRect())
+            self.fitInView(self.background_item, Qt.AspectRatioMode.KeepAspectRatio)
+
+    def _set_background_item(self, item):
         # Remove old background if exists
         if self.background_item:
             self.scene.removeItem(self.background_item)
 
-        # Add new background
-        self.background_item = self.scene.addPixmap(pixmap)
+        self.background_item = item
         self.background_item.setZValue(-1)
 
         # Set scene rect to image size
-        self.scene.setSceneRect(QRectF(pixmap.rect()))
+        self.scene.setSceneRect(item.boundingRect())
 
         # Fit image in view
         self.fitInView(self.background_item, Qt.AspectRatioMode.KeepAspectRatio)
 
-        return True
-
     def set_tool(self, tool: str):
         """Set current drawing tool."""
         self.current_tool = tool
@@ -458,6 +687,7 @@ class FloorPlanCanvas(QGraphicsView):
             context = {
                 "previous_rooms": self.room_items,
                 "pattern_learner": self.pattern_learner,
+                "pattern_suggestions": self.pattern_suggestions,
                 "scene_width": self.scene.width(),
                 "scene_height": self.scene.height(),
             }
@@ -499,8 +729,10 @@ class FloorPlanCanvas(QGraphicsView):
             return
         if self.current_tool == "draw_pathway":
             pathway = PathwayItem(self.drawing_points.copy())
+            pathway.setVisible(not self._pathways_merged)
             self.scene.addItem(pathway)
             self.pathway_items.append(pathway)
+            self._pathways_changed()
             self.pathway_created.emit(pathway)
             self.cancel_drawing()
             return
@@ -511,6 +743,7 @@ class FloorPlanCanvas(QGraphicsView):
     def create_room_from_vertices(self, vertices: List[List[float]]):
         """Create a room item from vertices."""
         room_item = RoomItem(vertices, name=f"Room {len(self.room_items) + 1}")
+        self._apply_room_detail(room_item)
         self.scene.addItem(room_item)
         self.room_items.append(room_item)
 
@@ -552,10 +785,12 @@ class FloorPlanCanvas(QGraphicsView):
             self.selected_pathway.update_appearance(selected=False)
         self.selected_pathway = pathway_item
         pathway_item.update_appearance(selected=True)
+        pathway_item.setVisible(True)
 
     def deselect_pathway(self):
         if self.selected_pathway:
             self.selected_pathway.update_appearance(selected=False)
+            self.selected_pathway.setVisible(not self._pathways_merged)
             self.selected_pathway = None
 
     def delete_selected_pathway(self):
@@ -567,11 +802,40 @@ class FloorPlanCanvas(QGraphicsView):
             self.pathway_items.remove(item)
         self.scene.removeItem(item)
         self.selected_pathway = None
+        self._pathways_changed()
         if pathway_id is not None:
             self.pathway_deleted.emit(int(pathway_id))
 
+    @contextmanager
+    def bulk_update(self):
+        """Suspend repaints and BSP indexing while many items are added or removed."""
+        self._bulk_depth += 1
+        if self._bulk_depth == 1:
+            self.setUpdatesEnabled(False)
+            self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.NoIndex)
+        try:
+            yield
+        finally:
+            self._bulk_depth -= 1
+            if self._bulk_depth == 0:
+                if self._pathways_merged and self._pathway_layer_dirty:
+                    self._rebuild_pathway_layer()
+                # Re-enabling the index rebuilds the BSP tree once for all items
+                self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
+                self.setUpdatesEnabled(True)
+                self.viewport().update()
+
+    def add_room_items(self, room_items: Iterable[RoomItem]):
+        """Add many room items (e.g., a whole floor from database) in one scene update."""
+        with self.bulk_update():
+            for room_item in room_items:
+                self._apply_room_detail(room_item)
+                self.scene.addItem(room_item)
+                self.room_items.append(room_item)
+
     def add_room_item(self, room_item: RoomItem):
         """Add a room item to the canvas (e.g., from database)."""
+        self._apply_room_detail(room_item)
         self.scene.addItem(room_item)
         self.room_items.append(room_item)
 
@@ -588,33 +852,53 @@ class FloorPlanCanvas(QGraphicsView):
 
     def clear_rooms(self):
         """Clear all room items."""
-        for item in self.room_items:
-            self.scene.removeItem(item)
-        self.room_items.clear()
-        self.selected_room = None
-        self.clear_pattern_suggestions()
-        self.clear_navigation_path()  # Also clear navigation paths
-        self.clear_pathways()
-        self.clear_stairs()
+        with self.bulk_update():
+            for item in self.room_items:
+                self.scene.removeItem(item)
+            self.room_items.clear()
+            self.selected_room = None
+            self.suggestion_worker.cancel()
+            self.pattern_suggestions = None
+            self.clear_pattern_suggestions()
+            self.clear_navigation_path()  # Also clear navigation paths
+            self.clear_pathways()
+            self.clear_stairs()
 
     def clear_pathways(self):
         self.deselect_pathway()
-        for item in self.pathway_items:
-            self.scene.removeItem(item)
+        with self.bulk_update():
+            for item in self.pathway_items:
+                self.scene.removeItem(item)
         self.pathway_items.clear()
+        self._pathways_changed()
+
+    def add_pathway_items(self, pathways: Iterable[Tuple[List[Tuple[float, float]], Optional[int]]]):
+        """Add many (points, pathway_id) pathways in one scene update."""
+        with self.bulk_update():
+            for points, pathway_id in pathways:
+                self.add_pathway_item(points, pathway_id=pathway_id)
 
     def add_pathway_item(self, points: List[Tuple[float, float]], pathway_id: Optional[int] = None):
         qpoints = [QPointF(float(x), float(y)) for x, y in points]
         item = PathwayItem(qpoints, pathway_id=pathway_id)
+        item.setVisible(not self._pathways_merged)
         self.scene.addItem(item)
         self.pathway_items.append(item)
+        self._pathways_changed()
         return item
 
     def clear_stairs(self):
-        for item in self.stair_items:
-            self.scene.removeItem(item)
+        with self.bulk_update():
+            for item in self.stair_items:
+                self.scene.removeItem(item)
         self.stair_items.clear()
 
+    def add_stair_items(self, stairs: Iterable[Tuple[float, float, Optional[int], Optional[int]]]):
+        """Add many (x, y, stair_id, to_floor_id) stairs in one scene update."""
+        with self.bulk_update():
+            for x, y, stair_id, to_floor_id in stairs:
+                self.add_stair_item(x, y, stair_id=stair_id, to_floor_id=to_floor_id)
+
     def add_stair_item(self, x: float, y: float, stair_id: Optional[int] = None, to_floor_id: Optional[int] = None):
         item = StairItem(x, y, stair_id=stair_id, to_floor_id=to_floor_id)
         self.scene.addItem(item)
@@ -644,9 +928,7 @@ class FloorPlanCanvas(QGraphicsView):
     
     def clear_navigation_path(self):
         """Clear navigation path visualization."""
-        for item in self.navigation_path_items:
-            self.scene.removeItem(item)
-        self.navigation_path_items.clear()
+        self.navigation_path_item.clear_route()
     
     def handle_navigation_click(self, room_item: RoomItem):
         """Handle room click in navigation mode."""
@@ -710,48 +992,44 @@ class FloorPlanCanvas(QGraphicsView):
     def display_navigation_path(self, path_by_floor: dict, current_floor_id: Optional[int] = None):
         """Display navigation path visualization (only for the current floor)."""
         self.last_navigation_path_by_floor = path_by_floor or {}
-        self.clear_navigation_path()
-
-        if current_floor_id is None:
-            return
 
-        points = self.last_navigation_path_by_floor.get(current_floor_id, [])
+        points = self.last_navigation_path_by_floor.get(current_floor_id, []) if current_floor_id is not None else []
         if len(points) < 2:
+            self.clear_navigation_path()
             return
 
-        for i in range(len(points) - 1):
-            x1, y1 = points[i]
-            x2, y2 = points[i + 1]
-
-            line = self.scene.addLine(x1, y1, x2, y2)
-            line.setPen(QPen(QColor(255, 0, 0), 3))
-            line.setZValue(999)
-            self.navigation_path_items.append(line)
-
-            mid_x = (x1 + x2) / 2
-            mid_y = (y1 + y2) / 2
-            arrow = self.scene.addEllipse(mid_x - 3, mid_y - 3, 6, 6)
-            arrow.setBrush(QBrush(QColor(255, 0, 0)))
-            arrow.setPen(QPen(QColor(255, 0, 0), 2))
-            arrow.setZValue(1000)
-            self.navigation_path_items.append(arrow)
-    
+        # Floors are listed in route order; the route enters this floor unless it starts here
+        floor_order = list(self.last_navigation_path_by_floor.keys())
+        index = floor_order.index(current_floor_id)
+        self.navigation_path_item.set_route(
+            points,
+            enters_floor=index > 0,
+            leaves_floor=index < len(floor_order) - 1,
+        )
+
     def update_pattern_suggestions(self):
-        """Update pattern-based room position suggestions with enhanced markers."""
-        # Clear existing markers
-        self.clear_pattern_suggestions()
-        
+        """Request pattern-based room position suggestions; markers update when the worker finishes."""
         # Show suggestions if we have at least 1 room
         # (suggestions will work with 1+ rooms, but are best with 2+)
         if len(self.room_items) < 1:
+            self.suggestion_worker.cancel()
+            self.pattern_suggestions = None
+            self.clear_pattern_suggestions()
             return
-        
+
         # Get recent rooms for pattern matching (use last 2 if available)
         recent_rooms = [room.get_vertices() for room in self.room_items[-2:]]
-        
-        # Get suggestions with room types and confidence
-        suggestions = self.pattern_learner.suggest_positions(recent_rooms, num_suggestions=3)
-        
+        self.suggestion_worker.request(recent_rooms, num_suggestions=3)
+
+    def _on_training_finished(self):
+        self.learning_status_changed.emit(self.pattern_learner.get_status())
+        self.update_pattern_suggestions()
+
+    def show_pattern_suggestions(self, suggestions: list):
+        """Replace the suggestion markers with a finished worker result."""
+        self.pattern_suggestions = suggestions
+        self.clear_pattern_suggestions()
+
         # Create enhanced markers for suggestions
         for suggestion in suggestions:
             if len(suggestion) >= 5:  # (x, y, room_type, confidence, suggested_area)
@@ -776,6 +1054,90 @@ class FloorPlanCanvas(QGraphicsView):
                 self.scene.addItem(marker)
                 self.pattern_suggestion_markers.append(marker)
     
+    def set_frame_time_overlay(self, enabled: bool):
+        """Show rolling paint times in the corner of the view."""
+        if enabled and self.frame_timer is None:
+            self.frame_timer = FrameTimer()
+            # Repaint the whole viewport so every sample is a full frame and the overlay stays current
+            self._viewport_update_mode = self.viewportUpdateMode()
+            self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        elif not enabled and self.frame_timer is not None:
+            self.frame_timer = None
+            self.setViewportUpdateMode(self._viewport_update_mode)
+        self.viewport().update()
+
+    def _apply_room_detail(self, room_item: RoomItem):
+        room_item.set_detail_level(self._room_detail_bucket)
+
+    # Every zoom change goes through one of these (wheel, menu actions, fitting a new
+    # floor), so level of detail is updated here instead of on each paint
+    def scale(self, sx: float, sy: float):
+        super().scale(sx, sy)
+        self._update_level_of_detail()
+
+    def setTransform(self, matrix, combine: bool = False):
+        super().setTransform(matrix, combine)
+        self._update_level_of_detail()
+
+    def resetTransform(self):
+        super().resetTransform()
+        self._update_level_of_detail()
+
+    def fitInView(self, *args, **kwargs):
+        super().fitInView(*args, **kwargs)
+        self._update_level_of_detail()
+
+    def _update_level_of_detail(self):
+        lod = self.transform().m11()
+        bucket = lod_bucket(lod)
+        if bucket != self._room_detail_bucket:
+            self._room_detail_bucket = bucket
+            for item in self.room_items:
+                item.set_detail_level(bucket)
+
+        merge = lod < PathwayLayerItem.MERGE_BELOW_LOD
+        if merge != self._pathways_merged:
+            self._pathways_merged = merge
+            if merge and self._pathway_layer_dirty:
+                self._rebuild_pathway_layer()
+            for item in self.pathway_items:
+                item.setVisible(not merge or item is self.selected_pathway)
+            self.pathway_layer.setVisible(merge)
+
+    def _pathways_changed(self):
+        self._pathway_layer_dirty = True
+        # While merged the layer is what is shown; bulk updates rebuild it once at the end
+        if self._pathways_merged and not self._bulk_depth:
+            self._rebuild_pathway_layer()
+
+    def _rebuild_pathway_layer(self):
+        self.pathway_layer.rebuild(self.pathway_items)
+        self._pathway_layer_dirty = False
+
+    def paintEvent(self, event):
+        if self.frame_timer is None:
+            super().paintEvent(event)
+            return
+        start = time.perf_counter()
+        super().paintEvent(event)
+        self.frame_timer.record(time.perf_counter() - start)
+
+    def drawForeground(self, painter, rect):
+        super().drawForeground(painter, rect)
+        if self.frame_timer is not None:
+            self._draw_frame_times(painter)
+
+    def _draw_frame_times(self, painter):
+        painter.save()
+        painter.resetTransform()
+        painter.setFont(QFont("Monospace", 8))
+        text = self.frame_timer.summary()
+        box = QRectF(6, 6, painter.fontMetrics().horizontalAdvance(text) + 12, painter.fontMetrics().height() + 8)
+        painter.fillRect(box, QColor(0, 0, 0, 160))
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(box, Qt.AlignmentFlag.AlignCenter, text)
+        painter.restore()
+
     def wheelEvent(self, event):
         """Handle mouse wheel for zooming."""
         # Zoom with Ctrl+Wheel
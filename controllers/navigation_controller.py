@@ -1,5 +1,8 @@
 from typing import Optional, List, Tuple, Dict
+from domain.buildings.floor import Floor
 from domain.buildings.room import Room
+from domain.buildings.stair import Stair
+from domain.buildings.pathway import Pathway
 from domain.pathfinder.pathfinder import Pathfinder
 from domain.pathfinder.building_graph import BuildingGraph
 from data.repositories.map_repo import IMapRepository
@@ -19,6 +22,8 @@ class NavigationController:
         self.pathway_repo = pathway_repo
         self.start_room_id: Optional[int] = None
         self.end_room_id: Optional[int] = None
+        self._building_graph: Optional[BuildingGraph] = None
+        self._graph_stale = False
     
     def set_start_room(self, room_id: int) -> bool:
         room = self.room_repo.find_by_id(room_id)
@@ -58,6 +63,44 @@ class NavigationController:
         if not start_room or not end_room:
             return None
         
+        building_graph = self._get_building_graph()
+        
+        path = self.pathfinder.find_multi_floor_path(
+            self.start_room_id,
+            self.end_room_id,
+            building_graph
+        )
+        
+        return path
+    
+    def get_nearest_rooms(self, room_type: str, k: int = 1,
+                          from_room_id: Optional[int] = None) -> List[Tuple[Room, float, List[Tuple[int, float, float]]]]:
+        room_id = from_room_id or self.start_room_id
+        if not room_id:
+            return []
+        building_graph = self._get_building_graph()
+        if k == 1:
+            # Served from the graph's cached per-type table
+            nearest = building_graph.get_nearest_facility_from_room(room_id, room_type)
+            return [nearest] if nearest else []
+        return building_graph.find_nearest_rooms_from_room(room_id, room_type, k=k)
+
+    def invalidate_graph(self):
+        """Call after rooms, stairs, pathways or floors were edited; the next query reloads them."""
+        self._graph_stale = True
+
+    def _get_building_graph(self) -> BuildingGraph:
+        if self._building_graph is None:
+            self._building_graph = BuildingGraph(*self._load_building())
+            self._graph_stale = False
+        elif self._graph_stale:
+            graph = self._building_graph
+            graph.floors, graph.stairs, graph.pathways = self._load_building()
+            graph.refresh()
+            self._graph_stale = False
+        return self._building_graph
+
+    def _load_building(self) -> Tuple[List[Floor], List[Stair], List[Pathway]]:
         all_floors = self.map_repo.find_all()
         all_stairs = []
         for floor in all_floors:
@@ -75,15 +118,7 @@ class NavigationController:
         if self.pathway_repo is not None:
             all_pathways = self.pathway_repo.find_all()
 
-        building_graph = BuildingGraph(all_floors, all_stairs, pathways=all_pathways)
-        
-        path = self.pathfinder.find_multi_floor_path(
-            self.start_room_id,
-            self.end_room_id,
-            building_graph
-        )
-        
-        return path
+        return all_floors, all_stairs, all_pathways
     
     def get_path_by_floor(self) -> Dict[int, List[Tuple[float, float]]]:
         path = self.get_navigation_path()
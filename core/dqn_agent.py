@@ -1,13 +1,16 @@
+import os
 import random
-from collections import deque
 import torch
 import torch.nn as nn
 import torch.optim as optim
+from .model_export import export_optimized, load_optimized, optimized_path
 from .neural_q import NeuralQ
+from .replay_buffer import ReplayBuffer
 
 
 class DQNAgent:
-    def __init__(self, input_dim=8, lr=1e-3, gamma=0.95, buffer_size=2000, batch_size=32, demo_mode=True):
+    def __init__(self, input_dim=8, lr=1e-3, gamma=0.95, buffer_size=2000, batch_size=32, demo_mode=True,
+                 prioritized_replay=False):
         self.demo_mode = demo_mode
         self.input_dim = input_dim
         
@@ -26,12 +29,17 @@ class DQNAgent:
             self.target_net.load_state_dict(self.q_net.state_dict())
             self.opt = optim.Adam(self.q_net.parameters(), lr=lr)
             self.gamma = gamma
-            self.buffer = deque(maxlen=buffer_size)
+            self.buffer = ReplayBuffer(buffer_size, input_dim, 2, device=self.device, prioritized=prioritized_replay)
             self.batch_size = batch_size
             self.loss_fn = nn.MSELoss()
             self.epsilon = 0.2
             self.step_count = 0
             self.save_path = "model.pth"
+            self.replay_path = "replay.pt"  # saved and loaded together with save_path
+            self.optimized_path = optimized_path(self.save_path)
+            # TorchScript (int8 when accurate enough) copy of q_net used by act()/act_batch()
+            # until q_net is trained further
+            self.inference_net = None
             self.log_path = "training.log"
             self.autosave_every = 200
         except Exception as e:
@@ -41,7 +49,6 @@ class DQNAgent:
     def act(self, state):
         if self.demo_mode:
             # Demo mode: return plausible actions without neural network
-            import random
             if hasattr(state, 'cpu'):
                 state = state.cpu()
             
@@ -58,14 +65,30 @@ class DQNAgent:
             with torch.no_grad():
                 rand = torch.randn(2, device=self.device)
                 return rand
-        with torch.no_grad():
-            q = self.q_net(state.unsqueeze(0))
+        with torch.inference_mode():
+            q = self._policy()(state.unsqueeze(0))
         return q.squeeze(0)
 
+    def _policy(self):
+        return self.q_net if self.inference_net is None else self.inference_net
+
+    def act_batch(self, states):
+        """Actions for a (n, input_dim) batch of states in one forward pass; epsilon applies per row."""
+        if self.demo_mode:
+            return torch.stack([self.act(state) for state in states])
+        states = states.to(self.device)
+        with torch.inference_mode():
+            q = self._policy()(states)
+            explore = torch.rand(len(states), device=self.device) < self.epsilon
+            if explore.any():
+                q = torch.where(explore.unsqueeze(1), torch.randn_like(q), q)
+        return q
+
     def push(self, transition):
         if self.demo_mode:
             return  # Demo mode: no training
-        self.buffer.append(transition)
+        state, action, reward, next_state = transition
+        self.buffer.push(state, action, reward, next_state)
 
     def update(self):
         if self.demo_mode:
@@ -73,12 +96,7 @@ class DQNAgent:
         # Original training code
         if len(self.buffer) < self.batch_size:
             return None
-        batch = random.sample(self.buffer, self.batch_size)
-        states, actions, rewards, next_states = zip(*batch)
-        states = torch.stack(states).to(self.device)
-        actions = torch.stack(actions).to(self.device)
-        rewards = torch.tensor(rewards, dtype=torch.float32, device=self.device).unsqueeze(1)
-        next_states = torch.stack(next_states).to(self.device)
+        states, actions, rewards, next_states, indices, weights = self.buffer.sample(self.batch_size)
 
         q_values = self.q_net(states)
         q_value = (q_values * actions).sum(dim=1, keepdim=True)
@@ -88,16 +106,25 @@ class DQNAgent:
             next_best = next_q.norm(dim=1, keepdim=True)
             target = rewards + self.gamma * next_best
 
-        loss = self.loss_fn(q_value, target)
+        if self.buffer.prioritized:
+            # Importance-sampling weights correct for the non-uniform sampling
+            td_error = q_value - target
+            loss = (weights * td_error.pow(2)).mean()
+            self.buffer.update_priorities(indices, td_error.detach().cpu().numpy())
+        else:
+            loss = self.loss_fn(q_value, target)
         self.opt.zero_grad()
         loss.backward()
         self.opt.step()
+        # The exported copy no longer matches q_net
+        self.inference_net = None
 
         self.step_count += 1
         if self.step_count % 20 == 0:
             self.target_net.load_state_dict(self.q_net.state_dict())
         if self.step_count % self.autosave_every == 0:
-            torch.save(self.q_net.state_dict(), self.save_path)
+            # update() runs on the GUI thread; tracing and checking an export would stall it
+            self.save(export=False)
         self.log(loss.item(), rewards.mean().item())
         return loss.item()
 
@@ -110,6 +137,34 @@ class DQNAgent:
         except Exception:
             pass
 
+    def save(self, export=True):
+        """Save q_net and the replay buffer, and with `export` the TorchScript copy load() prefers."""
+        if self.demo_mode:
+            return  # Demo mode: no model saving
+        try:
+            torch.save(self.q_net.state_dict(), self.save_path)
+            self.buffer.save(self.replay_path)
+        except Exception as e:
+            print(f"Error saving DQN: {e}")
+        if export:
+            self.export_optimized()
+
+    def export_optimized(self, tolerance=0.05):
+        """
+        Write the TorchScript copy of q_net that load() prefers on CPU. It is quantized to
+        int8 only if that stays within `tolerance` of q_net on the states in the replay buffer.
+        """
+        if self.demo_mode:
+            return None
+        try:
+            _, precision, error = export_optimized(
+                self.q_net, torch.zeros(1, self.input_dim), self.optimized_path,
+                check_inputs=self.buffer.states[:len(self.buffer)], tolerance=tolerance)
+            return precision, error
+        except Exception as e:
+            print(f"Error exporting optimized DQN: {e}")
+            return None
+
     def load(self):
         if self.demo_mode:
             return  # Demo mode: no model loading
@@ -118,4 +173,14 @@ class DQNAgent:
             self.target_net.load_state_dict(self.q_net.state_dict())
         except Exception:
             pass
+        if self.device.type == "cpu":
+            try:
+                self.inference_net = load_optimized(self.optimized_path, newer_than=self.save_path)
+            except Exception as e:
+                print(f"Error loading optimized DQN: {e}")
+        if os.path.exists(self.replay_path):
+            try:
+                self.buffer.load(self.replay_path)
+            except Exception as e:
+                print(f"Error loading replay buffer: {e}")
 
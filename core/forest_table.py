@@ -0,0 +1,43 @@
+import numpy as np
+
+
+class ForestTable:
+    """
+    Flattened copy of a fitted forest's trees so every tree is evaluated for a
+    batch of rows in one vectorized traversal instead of one predict() per tree.
+    """
+
+    def __init__(self, forest):
+        trees = [est.tree_ for est in forest.estimators_]
+        offsets = np.cumsum([0] + [t.node_count for t in trees[:-1]])
+
+        left, right, feature, threshold, value = [], [], [], [], []
+        for offset, t in zip(offsets, trees):
+            is_leaf = t.children_left == -1
+            own = np.arange(t.node_count) + offset
+            # Leaves point at themselves so a fixed number of steps is enough
+            left.append(np.where(is_leaf, own, t.children_left + offset))
+            right.append(np.where(is_leaf, own, t.children_right + offset))
+            feature.append(np.where(is_leaf, 0, t.feature))
+            threshold.append(t.threshold)
+            value.append(t.value[:, 0, 0])
+
+        self.roots = offsets.astype(np.intp)
+        self.left = np.concatenate(left).astype(np.intp)
+        self.right = np.concatenate(right).astype(np.intp)
+        self.feature = np.concatenate(feature).astype(np.intp)
+        self.threshold = np.concatenate(threshold)
+        self.value = np.concatenate(value)
+        self.depth = max(t.max_depth for t in trees)
+        self.n_trees = len(trees)
+
+    def predict_trees(self, X: np.ndarray) -> np.ndarray:
+        """Per-tree predictions, shape (n_trees, n_rows)."""
+        # Trees split on float32 features, exactly as DecisionTreeRegressor.predict does
+        X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.depth):
+            go_left = X[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node].T
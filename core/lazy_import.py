@@ -0,0 +1,55 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Callable, Iterable, Optional
+
+
+class LazyModule:
+    """
+    Stand-in for a module that is imported on first attribute access. Its own members are
+    private so they never shadow attributes of the wrapped module (e.g. joblib.load).
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def _load(self) -> ModuleType:
+        if self._module is None:
+            # import_module holds the per-module import lock, so concurrent first uses are safe
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if is_loaded(self) else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    return LazyModule(name)
+
+
+def is_loaded(module: LazyModule) -> bool:
+    return module._module is not None
+
+
+def warm_up(modules: Iterable[LazyModule], callback: Optional[Callable[[], None]] = None,
+            name: str = "import-warm-up") -> threading.Thread:
+    """Import the given modules on a background thread, then call callback there."""
+    modules = list(modules)
+
+    def run():
+        for module in modules:
+            try:
+                module._load()
+            except Exception as e:
+                print(f"Error importing {module._name}: {e}")
+        if callback is not None:
+            callback()
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
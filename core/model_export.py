@@ -0,0 +1,104 @@
+import contextlib
+import copy
+import os
+import time
+import warnings
+from typing import Optional, Tuple
+import torch
+import torch.nn as nn
+
+OPTIMIZED_SUFFIX = ".ts.pt"
+
+
+def optimized_path(path: str) -> str:
+    """Where the TorchScript export of a weights file lives, e.g. model.pth -> model.ts.pt."""
+    return os.path.splitext(path)[0] + OPTIMIZED_SUFFIX
+
+
+@contextlib.contextmanager
+def _quiet():
+    # torch.ao.quantization and torch.jit warn that they are deprecated, but they remain the
+    # CPU inference path that needs no extra packages
+    with warnings.catch_warnings():
+        for category in (DeprecationWarning, FutureWarning, UserWarning):
+            warnings.simplefilter("ignore", category)
+        yield
+
+
+def to_torchscript(model: nn.Module, example: torch.Tensor, quantize: bool = True) -> torch.jit.ScriptModule:
+    """
+    Copy of the model traced with `example` and frozen for CPU inference, with its Linear
+    layers dynamically quantized to int8 when `quantize`. The original model is left untouched.
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    with _quiet(), torch.no_grad():
+        if quantize:
+            model = torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8)
+        traced = torch.jit.trace(model, example.cpu())
+        return torch.jit.freeze(traced.eval())
+
+
+def export_optimized(model: nn.Module, example: torch.Tensor, path: str,
+                     check_inputs: Optional[torch.Tensor] = None,
+                     tolerance: float = 0.05) -> Tuple[torch.jit.ScriptModule, str, float]:
+    """
+    Write a TorchScript export of the model to path, atomically replacing any previous one.
+    The int8 version is kept only if its outputs on `check_inputs` stay within `tolerance`
+    of the float32 model; int8 activations lose small features next to large unnormalised
+    ones, so without check inputs, or when the check fails, a float32 export is written.
+    Returns (module, "int8" or "float32", max output error on check_inputs).
+    """
+    model = copy.deepcopy(model).cpu().eval()
+    checked = check_inputs is not None and len(check_inputs) > 0
+    if checked:
+        check_inputs = check_inputs.cpu()
+    scripted = None
+    if checked:
+        candidate = to_torchscript(model, example, quantize=True)
+        error = max_output_error(model, candidate, check_inputs)
+        if error <= tolerance:
+            scripted, precision = candidate, "int8"
+    if scripted is None:
+        scripted, precision = to_torchscript(model, example, quantize=False), "float32"
+        error = max_output_error(model, scripted, check_inputs) if checked else 0.0
+    tmp_path = path + ".tmp"
+    with _quiet():
+        torch.jit.save(scripted, tmp_path)
+    os.replace(tmp_path, path)
+    return scripted, precision, error
+
+
+def load_optimized(path: str, newer_than: Optional[str] = None) -> Optional[torch.jit.ScriptModule]:
+    """
+    Load an exported model, or None when it is missing or older than the `newer_than` file,
+    i.e. the float weights were saved again after the export was made.
+    """
+    if not os.path.exists(path):
+        return None
+    if newer_than and os.path.exists(newer_than) and os.path.getmtime(path) < os.path.getmtime(newer_than):
+        return None
+    with _quiet():
+        return torch.jit.load(path, map_location="cpu").eval()
+
+
+def _outputs(model, inputs: torch.Tensor):
+    with torch.inference_mode():
+        out = model(inputs)
+    return out if isinstance(out, (tuple, list)) else (out,)
+
+
+def max_output_error(reference, candidate, inputs: torch.Tensor) -> float:
+    """Largest absolute difference between two models' outputs over a batch of inputs."""
+    return max(float((a - b).abs().max())
+               for a, b in zip(_outputs(reference, inputs), _outputs(candidate, inputs)))
+
+
+def time_forward(model, inputs: torch.Tensor, repeats: int = 1000, warmup: int = 50) -> float:
+    """Mean seconds per forward pass."""
+    with torch.inference_mode():
+        for _ in range(warmup):
+            model(inputs)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model(inputs)
+    return (time.perf_counter() - start) / repeats
@@ -0,0 +1,54 @@
+import hashlib
+import os
+from typing import Optional
+import numpy as np
+
+from core.lazy_import import lazy_import
+from core.pattern_log import FIELDS
+
+# Only needed when an artifact is read or written, which happens on the training thread
+joblib = lazy_import("joblib")
+sklearn = lazy_import("sklearn")
+
+# Bump when the payload layout changes; older artifacts are then ignored and the models refit
+ARTIFACT_VERSION = 1
+FEATURE_SCHEMA = FIELDS[:3]
+
+
+def records_fingerprint(records: np.ndarray) -> str:
+    """Digest of the pattern records a model was trained on."""
+    data = np.ascontiguousarray(np.asarray(records, dtype=np.float64).reshape(-1, len(FIELDS)))
+    return hashlib.sha1(data.tobytes()).hexdigest()
+
+
+def save_artifact(path: str, payload: dict):
+    """Write the payload with version and schema headers, atomically replacing any previous artifact."""
+    payload = dict(payload)
+    payload.update({
+        "version": ARTIFACT_VERSION,
+        "feature_schema": FEATURE_SCHEMA,
+        "sklearn_version": sklearn.__version__,
+    })
+    tmp_path = path + ".tmp"
+    # Uncompressed so the numpy arrays inside can be memory-mapped on load
+    joblib.dump(payload, tmp_path)
+    os.replace(tmp_path, path)
+
+
+def load_artifact(path: str, fingerprint: str, backend: str) -> Optional[dict]:
+    """
+    Memory-map the artifact and return its payload, or None when it is missing, was written
+    by another version or backend, or was trained on different patterns than `fingerprint`.
+    """
+    if not os.path.exists(path):
+        return None
+    payload = joblib.load(path, mmap_mode="r")
+    if not isinstance(payload, dict):
+        return None
+    if (payload.get("version") != ARTIFACT_VERSION
+            or tuple(payload.get("feature_schema", ())) != FEATURE_SCHEMA
+            or payload.get("sklearn_version") != sklearn.__version__
+            or payload.get("backend") != backend
+            or payload.get("fingerprint") != fingerprint):
+        return None
+    return payload
@@ -0,0 +1,121 @@
+import math
+from typing import Dict, Sequence
+import numpy as np
+
+from core.training_stats import _as_row
+
+
+class StreamingKNN:
+    """
+    k-nearest-neighbour regressor over a bounded reservoir of patterns. Each update is
+    O(1) and a query scans at most `capacity` rows, however many patterns have been seen.
+    Targets are [distance, direction, size], as in PatternLearner's forests.
+    """
+
+    def __init__(self, capacity: int = 2048, k: int = 8, seed: int = 0):
+        self.capacity = capacity
+        self.k = k
+        self._rng = np.random.default_rng(seed)
+        self._features = np.zeros((capacity, 3))
+        self._targets = np.zeros((capacity, 3))
+        self.size = 0  # rows in the reservoir
+        self.seen = 0  # patterns ever added
+        self.has_size_targets = False
+        # Running feature mean/variance, used to scale features for the distance metric
+        self._mean = np.zeros(3)
+        self._m2 = np.zeros(3)
+        # Prequential (predict-then-learn) errors, the online stand-in for a held-out test set
+        self.evaluated = 0
+        self._sse = np.zeros(2)
+        self._target_mean = np.zeros(2)
+        self._target_m2 = np.zeros(2)
+
+    def __setstate__(self, state):
+        # Arrays may be loaded memory-mapped read-only, but add() writes into them
+        self.__dict__.update({key: np.array(value) if isinstance(value, np.ndarray) else value
+                              for key, value in state.items()})
+
+    def add(self, features: Sequence[float], targets: Sequence[float], evaluate: bool = True):
+        row = _as_row(features)
+        target = np.array([float(t or 0.0) for t in targets])
+        if evaluate and self.size >= self.k:
+            self._record_error(row, target)
+
+        self.seen += 1
+        delta = row - self._mean
+        self._mean += delta / self.seen
+        self._m2 += delta * (row - self._mean)
+        if target[2] > 0:
+            self.has_size_targets = True
+
+        # Reservoir sampling (Algorithm R): every pattern seen stays with equal probability
+        if self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(self._rng.integers(self.seen))
+            if slot >= self.capacity:
+                return
+        self._features[slot] = row
+        self._targets[slot] = target
+
+    def _record_error(self, row: np.ndarray, target: np.ndarray):
+        neighbours = self.neighbour_targets(row[None, :])
+        error_distance = neighbours["distance"][:, 0].mean() - target[0]
+        # Angular error wrapped into [-180, 180)
+        error_direction = (neighbours["direction"][:, 0].mean() - target[1] + 180.0) % 360.0 - 180.0
+        self.evaluated += 1
+        self._sse += np.array([error_distance, error_direction]) ** 2
+        delta = target[:2] - self._target_mean
+        self._target_mean += delta / self.evaluated
+        self._target_m2 += delta * (target[:2] - self._target_mean)
+
+    def neighbour_targets(self, X: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Targets of the k nearest reservoir rows for each query row, shape (k, n_rows) per
+        target, laid out like ForestTable.predict_trees so spread across neighbours can be
+        read the same way as spread across trees.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        k = min(self.k, self.size)
+        std = np.sqrt(self._m2 / max(self.seen, 1))
+        scale = np.where(std > 1e-12, std, 1.0)
+        points = self._features[:self.size] / scale
+        query = X[:, :3] / scale
+        sq = ((query[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+        if k < self.size:
+            nearest = np.argpartition(sq, k - 1, axis=1)[:, :k]
+        else:
+            nearest = np.broadcast_to(np.arange(self.size), (len(X), self.size))
+        targets = self._targets[nearest]  # (n_rows, k, 3)
+
+        # Unwrap directions around their circular mean so a plain mean/std behaves
+        radians = np.radians(targets[:, :, 1])
+        centre = np.degrees(np.arctan2(np.sin(radians).mean(axis=1), np.cos(radians).mean(axis=1)))
+        direction = centre[:, None] + (targets[:, :, 1] - centre[:, None] + 180.0) % 360.0 - 180.0
+
+        result = {"distance": targets[:, :, 0].T, "direction": direction.T}
+        if self.has_size_targets:
+            result["size"] = targets[:, :, 2].T
+        return result
+
+    def metrics(self) -> dict:
+        """Prequential metrics in the shape of PatternLearner.performance_metrics."""
+        if self.evaluated < 10:
+            return {
+                "training_samples": self.seen,
+                "reliable_metrics": False,
+                "note": "Insufficient data for reliable metrics (need 10+ patterns)",
+            }
+        mse = self._sse / self.evaluated
+        variance = self._target_m2 / self.evaluated
+        r2 = np.where(variance > 1e-12, 1.0 - mse / np.where(variance > 1e-12, variance, 1.0), 0.0)
+        return {
+            "distance_r2": float(r2[0]),
+            "direction_r2": float(r2[1]),
+            "distance_rmse": math.sqrt(mse[0]),
+            "direction_rmse": math.sqrt(mse[1]),
+            "training_samples": self.seen,
+            "test_samples": self.evaluated,
+            "reliable_metrics": True,
+        }
@@ -0,0 +1,156 @@
+import json
+import math
+import os
+import time
+from typing import List, Optional, Sequence
+import numpy as np
+
+# Column order of one record: features A->B, then targets B->C
+FIELDS = (
+    "feature_distance",
+    "feature_direction",
+    "feature_size",
+    "target_distance",
+    "target_direction",
+    "target_size",
+)
+
+
+def pattern_to_record(pattern: dict) -> List[float]:
+    feats = list(pattern["features"]) + [0.0] * (3 - len(pattern["features"]))
+    return [
+        float(feats[0]), float(feats[1]), float(feats[2] or 0.0),
+        float(pattern["target_distance"]),
+        float(pattern["target_direction"]),
+        float(pattern.get("target_size") or 0.0),
+    ]
+
+
+def records_to_patterns(records: np.ndarray) -> List[dict]:
+    return [
+        {
+            "features": [fd, fdir, fs],
+            "target_distance": td,
+            "target_direction": tdir,
+            "target_size": ts if ts > 0 else None,  # 0 is stored for "size unknown"
+        }
+        for fd, fdir, fs, td, tdir, ts in records.tolist()
+    ]
+
+
+class PatternLog:
+    """
+    Append-only JSON Lines log of pattern records, one JSON array of FIELDS per line.
+    Appends are fsynced in batches; compaction rewrites the file atomically.
+    """
+
+    def __init__(self, path: str, fsync_every: int = 16, fsync_interval: float = 2.0):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.record_count = 0  # records currently in the file
+        self.needs_rewrite = False  # set by load() when the file has torn or invalid lines
+        self._file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def load(self) -> np.ndarray:
+        """Read every valid record as an (n, 6) float array, dropping a torn final line."""
+        if not self.exists():
+            self.record_count = 0
+            return np.empty((0, len(FIELDS)))
+        with open(self.path, "r") as f:
+            text = f.read()
+        lines = text.split("\n")
+        # A crash mid-append leaves a final line without its newline
+        complete = lines[:-1] if not text.endswith("\n") else lines
+        lines = [line for line in complete if line.strip()]
+        # Appending after a torn line would corrupt the next record
+        self.needs_rewrite = not text.endswith("\n") and bool(text)
+        if not lines:
+            self.record_count = 0
+            return np.empty((0, len(FIELDS)))
+
+        try:
+            # One parse for the whole file; fall back to per-line only when something is malformed
+            rows = np.array(json.loads("[" + ",".join(lines) + "]"), dtype=np.float64)
+            if rows.ndim != 2 or rows.shape[1] != len(FIELDS):
+                raise ValueError("unexpected record shape")
+        except (ValueError, TypeError):
+            rows = np.array(self._parse_lines(lines), dtype=np.float64).reshape(-1, len(FIELDS))
+
+        valid = np.isfinite(rows).all(axis=1)
+        self.record_count = len(lines)
+        if not valid.all() or len(rows) != len(lines):
+            self.needs_rewrite = True
+        return rows[valid]
+
+    def _parse_lines(self, lines: List[str]) -> List[List[float]]:
+        rows = []
+        for line in lines:
+            try:
+                row = json.loads(line)
+                if isinstance(row, list) and len(row) == len(FIELDS):
+                    rows.append([float(v) for v in row])
+            except (ValueError, TypeError):
+                continue
+        return rows
+
+    def append(self, record: Sequence[float]):
+        if self._file is None:
+            self._file = open(self.path, "a")
+        self._file.write(json.dumps([float(v) for v in record]) + "\n")
+        self._file.flush()
+        self.record_count += 1
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        """Force appended records to disk."""
+        if self._file is not None and self._unsynced:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def compact(self, records: np.ndarray):
+        """Atomically replace the log with exactly these records."""
+        self.close()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            f.writelines(json.dumps(row) + "\n" for row in np.asarray(records, dtype=np.float64).tolist())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._sync_directory()
+        self.record_count = len(records)
+        self.needs_rewrite = False
+
+    def _sync_directory(self):
+        # Makes the rename itself durable; not supported on every platform
+        try:
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+
+    def close(self):
+        if self._file is not None:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def needs_compaction(self, max_records: Optional[int]) -> bool:
+        """True once the file holds a quarter more records than the retention limit."""
+        if max_records is None:
+            return False
+        return self.record_count > max(max_records + 64, math.ceil(max_records * 1.25))
@@ -0,0 +1,187 @@
+from typing import Optional, Tuple
+import numpy as np
+import torch
+
+
+def _as_row(value):
+    # Tensor rows assign directly; converting them again would cost more than the copy
+    return value if isinstance(value, torch.Tensor) else torch.as_tensor(value, dtype=torch.float32)
+
+
+class SumTree:
+    """
+    Binary tree over per-slot priorities where each node holds the sum of its children,
+    so sampling proportional to priority and updating a priority are both O(log n).
+    """
+
+    def __init__(self, capacity: int):
+        self.leaves = 1
+        while self.leaves < capacity:
+            self.leaves *= 2
+        self.tree = np.zeros(2 * self.leaves)
+        self.depth = int(np.log2(self.leaves))
+
+    @property
+    def total(self) -> float:
+        return float(self.tree[1])
+
+    def update(self, indices: np.ndarray, priorities: np.ndarray):
+        nodes = np.asarray(indices, dtype=np.int64) + self.leaves
+        self.tree[nodes] = priorities
+        # Recompute the affected parents level by level; duplicates collapse to one write
+        for _ in range(self.depth):
+            nodes = np.unique(nodes // 2)
+            self.tree[nodes] = self.tree[2 * nodes] + self.tree[2 * nodes + 1]
+
+    def update_one(self, index: int, priority: float):
+        # Scalar walk to the root; cheaper than update() for a single slot
+        node = index + self.leaves
+        tree = self.tree
+        tree[node] = priority
+        node //= 2
+        while node:
+            tree[node] = tree[2 * node] + tree[2 * node + 1]
+            node //= 2
+
+    def get(self, indices: np.ndarray) -> np.ndarray:
+        return self.tree[np.asarray(indices, dtype=np.int64) + self.leaves]
+
+    def find(self, values: np.ndarray) -> np.ndarray:
+        """Slot index whose cumulative priority range contains each value, for a batch of values."""
+        values = np.array(values, dtype=np.float64)
+        nodes = np.ones(len(values), dtype=np.int64)
+        for _ in range(self.depth):
+            left = 2 * nodes
+            go_right = values > self.tree[left]
+            values = np.where(go_right, values - self.tree[left], values)
+            nodes = np.where(go_right, left + 1, left)
+        return nodes - self.leaves
+
+
+class ReplayBuffer:
+    """
+    Fixed-size ring buffer of transitions held in contiguous tensors on the agent's device.
+    Batches are gathered with index tensors; with prioritized=True, transitions are drawn in
+    proportion to priority**alpha from a SumTree and come with importance-sampling weights.
+    """
+
+    def __init__(self, capacity: int, state_dim: int, action_dim: int, device="cpu",
+                 prioritized: bool = False, alpha: float = 0.6, beta: float = 0.4, eps: float = 1e-3):
+        self.capacity = capacity
+        self.device = torch.device(device)
+        self.prioritized = prioritized
+        self.alpha = alpha
+        self.beta = beta
+        self.eps = eps
+        self.states = torch.zeros((capacity, state_dim), dtype=torch.float32, device=self.device)
+        self.actions = torch.zeros((capacity, action_dim), dtype=torch.float32, device=self.device)
+        self.rewards = torch.zeros((capacity, 1), dtype=torch.float32, device=self.device)
+        self.next_states = torch.zeros((capacity, state_dim), dtype=torch.float32, device=self.device)
+        self.position = 0  # next slot to write
+        self.size = 0
+        self.tree = SumTree(capacity) if prioritized else None
+        self.max_priority = 1.0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def push(self, state, action, reward, next_state):
+        i = self.position
+        self.states[i] = _as_row(state)
+        self.actions[i] = _as_row(action)
+        self.rewards[i, 0] = float(reward)
+        self.next_states[i] = _as_row(next_state)
+        if self.tree is not None:
+            self.tree.update_one(i, self.max_priority ** self.alpha)
+        self.position = (i + 1) % self.capacity
+        self.size = min(self.capacity, self.size + 1)
+
+    def push_batch(self, states, actions, rewards, next_states):
+        """Write many transitions at once, wrapping around the ring (oldest are overwritten)."""
+        states = torch.as_tensor(states, dtype=torch.float32, device=self.device)
+        n = len(states)
+        if n == 0:
+            return
+        if n > self.capacity:
+            # Only the newest `capacity` transitions would survive anyway
+            skip = n - self.capacity
+            states, actions, rewards, next_states = states[skip:], actions[skip:], rewards[skip:], next_states[skip:]
+            n = self.capacity
+        slots = (self.position + np.arange(n)) % self.capacity
+        index = torch.as_tensor(slots, device=self.device)
+        self.states[index] = states
+        self.actions[index] = torch.as_tensor(actions, dtype=torch.float32, device=self.device)
+        self.rewards[index] = torch.as_tensor(rewards, dtype=torch.float32, device=self.device).reshape(-1, 1)
+        self.next_states[index] = torch.as_tensor(next_states, dtype=torch.float32, device=self.device)
+        self._advance(slots)
+
+    def _advance(self, slots: np.ndarray):
+        if self.tree is not None:
+            # New transitions get the highest priority seen so they are replayed at least once
+            self.tree.update(slots, np.full(len(slots), self.max_priority ** self.alpha))
+        self.position = int(slots[-1] + 1) % self.capacity
+        self.size = min(self.capacity, self.size + len(slots))
+
+    def sample(self, batch_size: int) -> Tuple[torch.Tensor, torch.Tensor, torch.Tensor, torch.Tensor,
+                                                np.ndarray, torch.Tensor]:
+        """
+        Returns (states, actions, rewards, next_states, indices, weights); indices are needed by
+        update_priorities() and weights are all ones unless prioritized.
+        """
+        if self.tree is None:
+            indices = np.random.randint(0, self.size, size=batch_size)
+            weights = torch.ones((batch_size, 1), dtype=torch.float32, device=self.device)
+        else:
+            # Stratified: one draw from each of batch_size equal slices of the total priority
+            total = self.tree.total
+            bounds = (np.arange(batch_size) + np.random.random(batch_size)) * (total / batch_size)
+            indices = np.minimum(self.tree.find(bounds), self.size - 1)
+            probabilities = self.tree.get(indices) / total
+            weights = (self.size * probabilities) ** -self.beta
+            weights = torch.as_tensor(weights / weights.max(), dtype=torch.float32, device=self.device).reshape(-1, 1)
+        index = torch.as_tensor(indices, device=self.device)
+        return (self.states[index], self.actions[index], self.rewards[index],
+                self.next_states[index], indices, weights)
+
+    def update_priorities(self, indices: np.ndarray, td_errors):
+        if self.tree is None:
+            return
+        priorities = np.abs(np.asarray(td_errors, dtype=np.float64).reshape(-1)) + self.eps
+        self.max_priority = max(self.max_priority, float(priorities.max()))
+        self.tree.update(indices, priorities ** self.alpha)
+
+    def state_dict(self) -> dict:
+        n = self.size
+        return {
+            "capacity": self.capacity,
+            "position": self.position,
+            "size": n,
+            "states": self.states[:n].cpu(),
+            "actions": self.actions[:n].cpu(),
+            "rewards": self.rewards[:n].cpu(),
+            "next_states": self.next_states[:n].cpu(),
+            "priorities": None if self.tree is None else self.tree.get(np.arange(n)),
+            "max_priority": self.max_priority,
+        }
+
+    def load_state_dict(self, state: dict):
+        n = min(int(state["size"]), self.capacity)
+        self.states[:n] = state["states"][:n].to(self.device)
+        self.actions[:n] = state["actions"][:n].to(self.device)
+        self.rewards[:n] = state["rewards"][:n].to(self.device)
+        self.next_states[:n] = state["next_states"][:n].to(self.device)
+        self.size = n
+        self.position = int(state["position"]) % self.capacity if n == self.capacity else n
+        self.max_priority = float(state.get("max_priority", 1.0))
+        if self.tree is not None:
+            priorities: Optional[np.ndarray] = state.get("priorities")
+            if priorities is None:
+                priorities = np.full(n, self.max_priority ** self.alpha)
+            self.tree = SumTree(self.capacity)
+            self.tree.update(np.arange(n), np.asarray(priorities)[:n])
+
+    def save(self, path: str):
+        torch.save(self.state_dict(), path)
+
+    def load(self, path: str):
+        self.load_state_dict(torch.load(path, map_location="cpu", weights_only=False))
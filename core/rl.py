@@ -1,5 +1,6 @@
 from core.dqn_agent import DQNAgent
-from core.state_encoder import encode_state
+from core.state_encoder import encode_history, encode_states
+import torch
 
 
 class RLPipeline:
@@ -7,12 +8,21 @@ class RLPipeline:
         self.agent = agent
 
     def step(self, last_center, prev_center, reward, next_center, avg_angle=0.0, pattern_count=0, grid_w=1.0, grid_h=1.0):
-        state = encode_state(last_center, prev_center, avg_angle=avg_angle, pattern_count=pattern_count,
-                             grid_w=grid_w, grid_h=grid_h, device=self.agent.device)
-        next_state = encode_state(next_center, last_center, avg_angle=avg_angle, pattern_count=pattern_count,
-                                  grid_w=grid_w, grid_h=grid_h, device=self.agent.device)
+        # State and next state in one encode
+        states = torch.from_numpy(encode_states([last_center, next_center], [prev_center, last_center],
+                                                avg_angle=avg_angle, pattern_count=pattern_count,
+                                                grid_w=grid_w, grid_h=grid_h)).to(self.agent.device)
+        state, next_state = states[0], states[1]
         action_vec = (next_state[:2] - state[:2]).detach()
         self.agent.push((state.detach(), action_vec.detach(), reward, next_state.detach()))
         loss = self.agent.update()
         return loss
 
+    def push_history(self, centers, reward=1.0, avg_angle=0.0, pattern_count=0, grid_w=1.0, grid_h=1.0):
+        """Push a transition for every consecutive room triple of a history, encoded in one call."""
+        states = torch.from_numpy(encode_history(centers, avg_angle=avg_angle, pattern_count=pattern_count,
+                                                 grid_w=grid_w, grid_h=grid_h)).to(self.agent.device)
+        actions = states[1:, :2] - states[:-1, :2]
+        for state, action_vec, next_state in zip(states[:-1], actions, states[1:]):
+            self.agent.push((state, action_vec, reward, next_state))
+        return len(actions)
@@ -1,6 +1,11 @@
 import math
+from typing import Sequence, Union
+import numpy as np
 import torch
 
+STATE_DIM = 8
+Scalar = Union[float, np.ndarray]
+
 
 def normalize_coord(x, y, width=1.0, height=1.0):
     if width == 0:
@@ -16,12 +21,7 @@ def angle_between(p1, p2):
     return math.degrees(math.atan2(dy, dx)) % 360.0
 
 
-def encode_state(last_room, prev_room, avg_angle=0.0, pattern_count=0, grid_w=1.0, grid_h=1.0, device="cpu"):
-    """
-    last_room: (x,y)
-    prev_room: (x,y)
-    Returns tensor shape (8,)
-    """
+def _state_row(last_room, prev_room, avg_angle, pattern_count, grid_w, grid_h):
     lx, ly = last_room
     px, py = prev_room
     dx = lx - px
@@ -29,13 +29,104 @@ def encode_state(last_room, prev_room, avg_angle=0.0, pattern_count=0, grid_w=1.
     ang = angle_between((px, py), (lx, ly))
     nx, ny = normalize_coord(lx, ly, grid_w, grid_h)
     ndx, ndy = normalize_coord(dx, dy, grid_w, grid_h)
-    state = torch.tensor([
+    return (
         nx, ny,
         ndx, ndy,
         ang / 360.0,
         avg_angle / 360.0,
         float(pattern_count),
         grid_w if grid_w <= 1 else 1.0,
-    ], dtype=torch.float32, device=device)
-    return state
+    )
+
+
+def encode_state(last_room, prev_room, avg_angle=0.0, pattern_count=0, grid_w=1.0, grid_h=1.0, device="cpu"):
+    """
+    last_room: (x,y)
+    prev_room: (x,y)
+    Returns tensor shape (8,)
+    """
+    state = np.array(_state_row(last_room, prev_room, avg_angle, pattern_count, grid_w, grid_h), dtype=np.float32)
+    return torch.from_numpy(state).to(device)
+
+
+def encode_states(last_rooms, prev_rooms, avg_angle: Scalar = 0.0, pattern_count: Scalar = 0,
+                  grid_w=1.0, grid_h=1.0, out=None) -> np.ndarray:
+    """
+    Encode many (last, prev) centre pairs at once, matching encode_state row for row.
+    last_rooms, prev_rooms: (n, 2) centres; avg_angle and pattern_count are scalars or (n,)
+    out: optional float32 array of at least n rows to write into
+    Returns float32 array shape (n, 8)
+    """
+    last = np.asarray(last_rooms, dtype=np.float64).reshape(-1, 2)
+    prev = np.asarray(prev_rooms, dtype=np.float64).reshape(-1, 2)
+    n = len(last)
+    states = np.empty((n, STATE_DIM), dtype=np.float32) if out is None else out[:n]
+    width = grid_w if grid_w != 0 else 1.0
+    height = grid_h if grid_h != 0 else 1.0
+    delta = last - prev
+    states[:, 0] = last[:, 0] / width
+    states[:, 1] = last[:, 1] / height
+    states[:, 2] = delta[:, 0] / width
+    states[:, 3] = delta[:, 1] / height
+    states[:, 4] = np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360.0 / 360.0
+    states[:, 5] = np.asarray(avg_angle, dtype=np.float64) / 360.0
+    states[:, 6] = pattern_count
+    states[:, 7] = grid_w if grid_w <= 1 else 1.0
+    return states
+
+
+def encode_history(centers: Sequence[Sequence[float]], avg_angle: Scalar = 0.0, pattern_count: Scalar = 0,
+                   grid_w=1.0, grid_h=1.0, out=None) -> np.ndarray:
+    """
+    Encode every consecutive pair of a room history: row i is (centers[i+1], centers[i]),
+    so row i+1 is the next state of row i. Returns float32 array shape (len(centers) - 1, 8).
+    """
+    points = np.asarray(centers, dtype=np.float64).reshape(-1, 2)
+    if len(points) < 2:
+        return np.empty((0, STATE_DIM), dtype=np.float32)
+    return encode_states(points[1:], points[:-1], avg_angle, pattern_count, grid_w, grid_h, out)
+
+
+class StateEncoder:
+    """
+    Encodes states into preallocated buffers for inference hot paths. Tensors returned by
+    encode() and encode_batch() are views of those buffers and are overwritten by the next
+    call; use encode_state()/encode_states() for states that are kept, e.g. in a replay buffer.
+    """
+
+    def __init__(self, capacity: int = 1, device="cpu"):
+        self.device = torch.device(device)
+        self._reserve(max(1, capacity))
+
+    def _reserve(self, capacity: int):
+        self._array = np.zeros((capacity, STATE_DIM), dtype=np.float32)
+        # Shares memory with the array, so writing the array updates the tensor
+        self._host = torch.from_numpy(self._array)
+        # Other devices get a persistent buffer that the host rows are copied into
+        self._tensor = self._host if self.device.type == "cpu" else torch.empty(
+            (capacity, STATE_DIM), dtype=torch.float32, device=self.device)
+        # Slicing a tensor costs more than encoding one state, so keep row 0's views
+        self._row_array = self._array[0]
+        self._host_row = self._host[0]
+        self._row = self._tensor[0]
+
+    def _publish(self, n: int) -> torch.Tensor:
+        if self._tensor is not self._host:
+            self._tensor[:n].copy_(self._host[:n])
+        return self._tensor[:n]
+
+    def encode(self, last_room, prev_room, avg_angle=0.0, pattern_count=0, grid_w=1.0, grid_h=1.0) -> torch.Tensor:
+        """Single state, shape (8,)."""
+        self._row_array[:] = _state_row(last_room, prev_room, avg_angle, pattern_count, grid_w, grid_h)
+        if self._row is not self._host_row:
+            self._row.copy_(self._host_row)
+        return self._row
 
+    def encode_batch(self, last_rooms, prev_rooms, avg_angle: Scalar = 0.0, pattern_count: Scalar = 0,
+                     grid_w=1.0, grid_h=1.0) -> torch.Tensor:
+        """States for many pairs, shape (n, 8); the buffers grow to fit."""
+        n = len(last_rooms)
+        if n > len(self._array):
+            self._reserve(max(n, 2 * len(self._array)))
+        encode_states(last_rooms, prev_rooms, avg_angle, pattern_count, grid_w, grid_h, out=self._array)
+        return self._publish(n)
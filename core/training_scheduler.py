@@ -0,0 +1,82 @@
+import threading
+import time
+from typing import Callable, List, Optional
+
+
+class TrainingScheduler:
+    """
+    Runs a training function on a background thread. Requests made while a run is in
+    progress are coalesced into a single follow-up run.
+    """
+
+    def __init__(self, train_fn: Callable[[], None], name: str = "pattern-training"):
+        self.train_fn = train_fn
+        self.name = name
+        self.callbacks: List[Callable[[], None]] = []  # called on the worker thread after each run
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._pending = False
+        self._idle = threading.Event()
+        self._idle.set()
+        self.runs = 0
+        self.coalesced_requests = 0
+        self.last_duration: Optional[float] = None
+        self.last_finished_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def request(self):
+        with self._lock:
+            if self._thread is not None:
+                self.coalesced_requests += 1
+                self._pending = True
+                return
+            self._idle.clear()
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            start = time.perf_counter()
+            error = None
+            try:
+                self.train_fn()
+            except Exception as e:
+                error = str(e)
+                print(f"Error training pattern models: {e}")
+            with self._lock:
+                self.runs += 1
+                self.last_duration = time.perf_counter() - start
+                self.last_finished_at = time.time()
+                self.last_error = error
+                rerun = self._pending
+                self._pending = False
+                if not rerun:
+                    self._thread = None
+                    self._idle.set()
+            for callback in list(self.callbacks):
+                try:
+                    callback()
+                except Exception as e:
+                    print(f"Error in training callback: {e}")
+            if not rerun:
+                return
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until no training is running or queued."""
+        return self._idle.wait(timeout)
+
+    def status(self) -> dict:
+        with self._lock:
+            if self._thread is None:
+                state = "idle"
+            elif self._pending:
+                state = "training (rerun queued)"
+            else:
+                state = "training"
+            return {
+                "training_state": state,
+                "training_runs": self.runs,
+                "coalesced_requests": self.coalesced_requests,
+                "last_training_seconds": round(self.last_duration, 3) if self.last_duration is not None else None,
+                "last_training_error": self.last_error,
+            }
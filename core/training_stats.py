@@ -0,0 +1,220 @@
+import math
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+
+# 99th percentile of the chi-square distribution with 3 degrees of freedom
+MAHALANOBIS_THRESHOLD = 11.345
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+# Cap on rows used to calibrate the kNN reference distance (pairwise cost is quadratic)
+KNN_CALIBRATION_ROWS = 2000
+# Rows kept for kNN queries; beyond this a uniform reservoir sample of all rows is kept
+KNN_MAX_ROWS = 5000
+# Features whose std is below this fraction of their magnitude are treated as constant
+KNN_RELATIVE_STD_FLOOR = 1e-9
+
+
+def _as_row(features: Sequence[float]) -> np.ndarray:
+    """[distance, direction, size] as floats; two-feature rows get size 0."""
+    row = np.zeros(3)
+    values = list(features)[:3]
+    row[:len(values)] = values
+    return row
+
+
+class RunningStats:
+    """Count, min, max, mean and variance of one feature, updated one value at a time."""
+
+    def __init__(self, positive_only: bool = False):
+        self.positive_only = positive_only
+        self.reset()
+
+    def reset(self):
+        self.count = 0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.quantiles: Dict[float, float] = {}  # exact as of the last rebuild()
+
+    def add(self, value: float):
+        if self.positive_only and value <= 0:
+            return
+        self.count += 1
+        self.minimum = min(self.minimum, value)
+        self.maximum = max(self.maximum, value)
+        # Welford's update keeps the variance numerically stable
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def rebuild(self, values: Iterable[float]):
+        self.reset()
+        values = [v for v in values if not self.positive_only or v > 0]
+        for v in values:
+            self.add(v)
+        if values:
+            qs = np.quantile(np.asarray(values, dtype=np.float64), QUANTILES)
+            self.quantiles = {q: float(v) for q, v in zip(QUANTILES, qs)}
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.count if self.count > 1 else 0.0
+
+    def in_range(self, value: float, margin_factor: float) -> bool:
+        margin = (self.maximum - self.minimum) * margin_factor
+        return self.minimum - margin <= value <= self.maximum + margin
+
+    def summary(self) -> dict:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min": float(self.minimum),
+            "max": float(self.maximum),
+            "mean": float(self.mean),
+            "std": math.sqrt(self.variance),
+            "quantiles": dict(self.quantiles),
+        }
+
+
+class TrainingStats:
+    """
+    Summary of the [distance, direction, size] training features kept up to date as
+    patterns arrive, so out-of-distribution checks do not rescan every pattern.
+    """
+
+    def __init__(self):
+        self.distance = RunningStats()
+        self.direction = RunningStats()
+        self.size = RunningStats(positive_only=True)  # 0 means "size unknown" in older patterns
+        self.reset()
+
+    def reset(self):
+        self.distance.reset()
+        self.direction.reset()
+        self.size.reset()
+        self.count = 0
+        self.mean = np.zeros(3)
+        self._m2 = np.zeros((3, 3))
+        self._inv_cov: Optional[np.ndarray] = None
+        self._rows: List[np.ndarray] = []  # kNN reference rows, at most KNN_MAX_ROWS
+        self._rng = np.random.default_rng(0)
+        self._knn_points: Optional[np.ndarray] = None
+        self._knn_scale = np.ones(3)
+        self._knn_reference = 0.0
+
+    def __getstate__(self):
+        # One (n, 3) array instead of n small ones keeps pickling fast
+        state = self.__dict__.copy()
+        state["_rows"] = np.asarray(self._rows, dtype=np.float64).reshape(-1, 3)
+        return state
+
+    def __setstate__(self, state):
+        # Arrays may be loaded memory-mapped read-only, but add() updates them in place
+        self.__dict__.update({key: np.array(value) if isinstance(value, np.ndarray) else value
+                              for key, value in state.items()})
+        self._rows = list(self._rows)
+        self.__dict__.setdefault("_rng", np.random.default_rng(0))
+
+    def add(self, features: Sequence[float]):
+        row = _as_row(features)
+        self.distance.add(row[0])
+        self.direction.add(row[1])
+        self.size.add(row[2])
+        self.count += 1
+        delta = row - self.mean
+        self.mean += delta / self.count
+        self._m2 += np.outer(delta, row - self.mean)
+        self._inv_cov = None
+        # Joins the kNN set on the next query; the reference distance is recalibrated on rebuild()
+        if len(self._rows) < KNN_MAX_ROWS:
+            self._rows.append(row)
+            return
+        # Reservoir sampling: every row seen so far is kept with equal probability
+        slot = int(self._rng.integers(self.count))
+        if slot < KNN_MAX_ROWS:
+            self._rows[slot] = row
+            if self._knn_points is not None and slot < len(self._knn_points):
+                self._knn_points[slot] = row / self._knn_scale
+
+    def rebuild(self, feature_rows: Iterable[Sequence[float]]):
+        rows = [_as_row(r) for r in feature_rows]
+        self.reset()
+        for row in rows:
+            self.add(row)
+        self.distance.rebuild(r[0] for r in rows)
+        self.direction.rebuild(r[1] for r in rows)
+        self.size.rebuild(r[2] for r in rows)
+
+    def in_training_range(self, features: Sequence[float], margin_factor: float = 0.1) -> bool:
+        """Box check against the observed min/max of each feature, widened by margin_factor."""
+        if self.count == 0:
+            return False
+        feat_distance, feat_direction, feat_size = _as_row(features)
+        if not self.distance.in_range(feat_distance, margin_factor):
+            return False
+        if not self.direction.in_range(feat_direction, margin_factor):
+            return False
+        if self.size.count > 0 and feat_size > 0:
+            return self.size.in_range(feat_size, margin_factor)
+        return True
+
+    def mahalanobis(self, features: Sequence[float]) -> float:
+        """Squared Mahalanobis distance of a feature row from the training mean."""
+        if self.count < 2:
+            return math.inf
+        if self._inv_cov is None:
+            # pinv tolerates constant features such as all-zero sizes
+            self._inv_cov = np.linalg.pinv(self._m2 / (self.count - 1))
+        delta = _as_row(features) - self.mean
+        return float(delta @ self._inv_cov @ delta)
+
+    def knn_novelty(self, features: Sequence[float], k: int = 5) -> float:
+        """
+        Mean distance to the k nearest training rows (features scaled by their std), relative
+        to the 95th percentile of the same quantity within the training set. Above 1.0 is novel.
+        Uses a sample of at most KNN_MAX_ROWS rows.
+        """
+        if len(self._rows) <= k:
+            return math.inf
+        if self._knn_points is None:
+            self._calibrate_knn(k)
+        elif len(self._knn_points) < len(self._rows):
+            added = np.asarray(self._rows[len(self._knn_points):], dtype=np.float64) / self._knn_scale
+            self._knn_points = np.vstack([self._knn_points, added])
+        query = _as_row(features) / self._knn_scale
+        dists = np.sqrt(((self._knn_points - query) ** 2).sum(axis=1))
+        nearest = np.partition(dists, k - 1)[:k]
+        if self._knn_reference <= 0:
+            return 0.0 if nearest.mean() == 0 else math.inf
+        return float(nearest.mean() / self._knn_reference)
+
+    def _calibrate_knn(self, k: int):
+        points = np.asarray(self._rows, dtype=np.float64)
+        scale = points.std(axis=0)
+        # Relative floor: float noise on an otherwise constant feature (e.g. 1600.0000000000002)
+        # must not be blown up into the dominant distance; constant features keep their units
+        floor = KNN_RELATIVE_STD_FLOOR * np.maximum(np.abs(points.mean(axis=0)), 1.0)
+        self._knn_scale = np.where(scale > floor, scale, 1.0)
+        self._knn_points = points / self._knn_scale
+        sample = self._knn_points[:KNN_CALIBRATION_ROWS]
+        means = []
+        for start in range(0, len(sample), 256):
+            chunk = sample[start:start + 256]
+            # Squared differences summed per feature, not |a|^2 + |b|^2 - 2ab, which cancels
+            # to garbage when rows are nearly identical
+            sq = np.zeros((len(chunk), len(self._knn_points)))
+            for column in range(chunk.shape[1]):
+                sq += (chunk[:, column, None] - self._knn_points[None, :, column]) ** 2
+            # Column 0 after partitioning is each row's zero distance to itself
+            nearest = np.sqrt(np.partition(sq, k, axis=1)[:, 1:k + 1])
+            means.append(nearest.mean(axis=1))
+        self._knn_reference = float(np.quantile(np.concatenate(means), 0.95))
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "distance": self.distance.summary(),
+            "direction": self.direction.summary(),
+            "size": self.size.summary(),
+        }
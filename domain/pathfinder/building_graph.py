@@ -1,4 +1,5 @@
-from typing import List, Tuple, Optional, Dict, Set
+from typing import List, Tuple, Optional, Dict, Set, Callable, Union
+import heapq
 import math
 from domain.buildings.floor import Floor
 from domain.buildings.room import Room
@@ -15,6 +16,10 @@ class BuildingGraph:
         self._stair_index: Dict[Tuple[int, int], List[Stair]] = {}
         self._pathways_by_floor: Dict[int, List[Pathway]] = {}
         self._adj: Dict[Tuple[int, float, float], List[Tuple[int, float, float]]] = {}
+        self._rooms_by_node: Dict[Tuple[int, float, float], List[Room]] = {}
+        self._room_nodes: Dict[int, Tuple[Room, Tuple[int, float, float]]] = {}
+        # room_type -> node -> (cost, room node, next hop towards that room)
+        self._facility_tables: Dict[str, Dict[Tuple[int, float, float], Tuple[float, Tuple[int, float, float], Optional[Tuple[int, float, float]]]]] = {}
         self._build_stair_index()
         self._build_pathway_index()
         self._build_adjacency()
@@ -100,6 +105,9 @@ class BuildingGraph:
 
     def _build_adjacency(self):
         self._adj = {}
+        self._rooms_by_node = {}
+        self._room_nodes = {}
+        self._facility_tables = {}
 
         # Pathway edges (per floor)
         for p in self.pathways:
@@ -121,6 +129,9 @@ class BuildingGraph:
                 cx, cy = room.get_center()
                 room_node = self._node_key(floor_id, cx, cy)
                 self._adj.setdefault(room_node, [])
+                self._rooms_by_node.setdefault(room_node, []).append(room)
+                if room.room_id is not None:
+                    self._room_nodes[room.room_id] = (room, room_node)
                 if pathway_nodes:
                     attach = self._nearest_pathway_attachment(floor_id, float(cx), float(cy))
                     if attach:
@@ -160,6 +171,14 @@ class BuildingGraph:
             a = self._node_key(stair.from_floor_id, stair.position[0], stair.position[1])
             b = self._node_key(stair.to_floor_id, stair.position[0], stair.position[1])
             self._add_edge(a, b)
+
+    def refresh(self):
+        """Rebuild indexes after floors, rooms, stairs or pathways were mutated."""
+        self._floor_index = {floor.floor_id: floor for floor in self.floors if floor.floor_id}
+        self._stair_index = {}
+        self._build_stair_index()
+        self._build_pathway_index()
+        self._build_adjacency()
     
     def get_floor(self, floor_id: int) -> Optional[Floor]:
         return self._floor_index.get(floor_id)
@@ -201,14 +220,8 @@ class BuildingGraph:
         return self._adj.get(key, [])
     
     def get_room_node(self, room_id: int) -> Optional[Tuple[int, float, float]]:
-        for floor in self.floors:
-            if not floor.floor_id:
-                continue
-            for room in floor.get_all_rooms():
-                if room.room_id == room_id:
-                    center = room.get_center()
-                    return self._node_key(floor.floor_id, center[0], center[1])
-        return None
+        entry = self._room_nodes.get(room_id)
+        return entry[1] if entry else None
     
     def get_stair_cost(self, from_node: Tuple[int, float, float], 
                       to_node: Tuple[int, float, float]) -> float:
@@ -224,3 +237,145 @@ class BuildingGraph:
         
         return float('inf')
 
+    def get_edge_cost(self, from_node: Tuple[int, float, float],
+                      to_node: Tuple[int, float, float]) -> float:
+        if from_node[0] == to_node[0]:
+            return self._distance(from_node, to_node)
+        return self.get_stair_cost(from_node, to_node)
+
+    def get_rooms_at_node(self, node: Tuple[int, float, float]) -> List[Room]:
+        return self._rooms_by_node.get(self._node_key(node[0], node[1], node[2]), [])
+
+    def find_nearest_rooms(self, start_node: Tuple[int, float, float],
+                           room_type: Union[str, Callable[[Room], bool]],
+                           k: int = 1,
+                           exclude_room_ids: Optional[Set[int]] = None) -> List[Tuple[Room, float, List[Tuple[int, float, float]]]]:
+        """
+        Single-source Dijkstra that settles nodes in cost order and stops as soon
+        as k rooms matching room_type (a type name or a predicate) were reached.
+        Returns (room, cost, path) tuples, nearest first.
+        """
+        if k <= 0:
+            return []
+        matches = self._room_matcher(room_type)
+        exclude = exclude_room_ids or set()
+        start = self._node_key(start_node[0], start_node[1], start_node[2])
+
+        distances: Dict[Tuple[int, float, float], float] = {start: 0.0}
+        previous: Dict[Tuple[int, float, float], Optional[Tuple[int, float, float]]] = {start: None}
+        visited: Set[Tuple[int, float, float]] = set()
+        heap: List[Tuple[float, Tuple[int, float, float]]] = [(0.0, start)]
+        results: List[Tuple[Room, float, List[Tuple[int, float, float]]]] = []
+
+        while heap and len(results) < k:
+            cost, current = heapq.heappop(heap)
+            if current in visited:
+                continue
+            visited.add(current)
+
+            for room in self._rooms_by_node.get(current, []):
+                if room.room_id in exclude or not matches(room):
+                    continue
+                results.append((room, cost, self._walk_back(current, previous)))
+                if len(results) >= k:
+                    break
+
+            for neighbor in self._adj.get(current, []):
+                if neighbor in visited:
+                    continue
+                alt = cost + self.get_edge_cost(current, neighbor)
+                if alt < distances.get(neighbor, float('inf')):
+                    distances[neighbor] = alt
+                    previous[neighbor] = current
+                    heapq.heappush(heap, (alt, neighbor))
+
+        return results
+
+    def find_nearest_rooms_from_room(self, room_id: int,
+                                     room_type: Union[str, Callable[[Room], bool]],
+                                     k: int = 1) -> List[Tuple[Room, float, List[Tuple[int, float, float]]]]:
+        start_node = self.get_room_node(room_id)
+        if not start_node:
+            return []
+        return self.find_nearest_rooms(start_node, room_type, k=k, exclude_room_ids={room_id})
+
+    def get_nearest_facility_from_room(self, room_id: int,
+                                       room_type: str) -> Optional[Tuple[Room, float, List[Tuple[int, float, float]]]]:
+        """
+        Closest room of room_type other than room_id itself, like find_nearest_rooms_from_room
+        with k=1. The facility table would answer with the room itself when it matches, so
+        that case falls back to the search that excludes it.
+        """
+        entry = self._room_nodes.get(room_id)
+        if entry is None:
+            return None
+        _, room_node = entry
+        if any(r.room_type == room_type for r in self._rooms_by_node.get(room_node, [])):
+            results = self.find_nearest_rooms(room_node, room_type, k=1, exclude_room_ids={room_id})
+            return results[0] if results else None
+        return self.get_nearest_facility(room_node, room_type)
+
+    def get_nearest_facility(self, node: Tuple[int, float, float],
+                             room_type: str) -> Optional[Tuple[Room, float, List[Tuple[int, float, float]]]]:
+        """
+        O(path length) lookup of the closest room of room_type using a per-type
+        table built by one multi-source Dijkstra from every matching room.
+        Tables are built on first use and dropped whenever the graph is refreshed.
+        """
+        table = self._facility_tables.get(room_type)
+        if table is None:
+            table = self._build_facility_table(room_type)
+            self._facility_tables[room_type] = table
+
+        key = self._node_key(node[0], node[1], node[2])
+        entry = table.get(key)
+        if entry is None:
+            return None
+        cost, room_node, _ = entry
+
+        path = [key]
+        current = key
+        while current != room_node:
+            current = table[current][2]
+            path.append(current)
+
+        room = next(r for r in self._rooms_by_node[room_node] if r.room_type == room_type)
+        return room, cost, path
+
+    def _build_facility_table(self, room_type: str) -> Dict[Tuple[int, float, float], Tuple[float, Tuple[int, float, float], Optional[Tuple[int, float, float]]]]:
+        table: Dict[Tuple[int, float, float], Tuple[float, Tuple[int, float, float], Optional[Tuple[int, float, float]]]] = {}
+        heap: List[Tuple[float, int, Tuple[int, float, float], Tuple[int, float, float], Optional[Tuple[int, float, float]]]] = []
+        for node, rooms in self._rooms_by_node.items():
+            if any(r.room_type == room_type for r in rooms):
+                heap.append((0.0, len(heap), node, node, None))
+        heapq.heapify(heap)
+        counter = len(heap)
+
+        # Edge costs are symmetric, so growing outwards from all facilities at
+        # once gives every node its nearest facility and the next hop towards it.
+        while heap:
+            cost, _, current, source, next_hop = heapq.heappop(heap)
+            if current in table:
+                continue
+            table[current] = (cost, source, next_hop)
+            for neighbor in self._adj.get(current, []):
+                if neighbor in table:
+                    continue
+                counter += 1
+                heapq.heappush(heap, (cost + self.get_edge_cost(current, neighbor), counter, neighbor, source, current))
+
+        return table
+
+    def _room_matcher(self, room_type: Union[str, Callable[[Room], bool]]) -> Callable[[Room], bool]:
+        if callable(room_type):
+            return room_type
+        return lambda room: room.room_type == room_type
+
+    def _walk_back(self, node: Tuple[int, float, float],
+                   previous: Dict[Tuple[int, float, float], Optional[Tuple[int, float, float]]]) -> List[Tuple[int, float, float]]:
+        path = []
+        current: Optional[Tuple[int, float, float]] = node
+        while current is not None:
+            path.append(current)
+            current = previous.get(current)
+        return list(reversed(path))
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Export the DQN policy network as TorchScript for CPU-only machines.
+The export is int8 when that stays within --tolerance of the float32 model on realistic
+states (float32 TorchScript otherwise). The reloaded export is checked against the eager
+model, failing when they differ by more than --tolerance, and latency is compared.
+tests/test_model_export.py runs the same check.
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+
+import numpy as np
+import torch
+
+from core.model_export import export_optimized, load_optimized, max_output_error, optimized_path, time_forward
+from core.neural_q import NeuralQ
+from core.state_encoder import STATE_DIM, encode_history
+
+
+def sample_states(count, seed=0):
+    """States along a corridor-style room walk, encoded the way PatternLearner encodes them."""
+    rng = random.Random(seed)
+    x, y, heading = 0.0, 0.0, 0.0
+    centres = []
+    for _ in range(count + 1):
+        if rng.random() < 0.15:
+            heading = (heading + rng.choice([90, -90])) % 360
+        step = rng.choice([50, 70, 90]) + rng.gauss(0, 4)
+        x += step * math.cos(math.radians(heading))
+        y += step * math.sin(math.radians(heading))
+        centres.append((x, y))
+    pattern_counts = np.arange(count)
+    avg_angles = np.array([rng.uniform(0, 360) for _ in range(count)])
+    return torch.from_numpy(encode_history(centres, avg_angles, pattern_counts))
+
+
+def export_and_check(net, out, tolerance=0.05, states=4096):
+    """
+    Export net to out (checked against states from one walk) and compare the reloaded export
+    with the eager model on states from another. Returns (export, precision, max error on the
+    check states, max error on the held-out states, held-out states).
+    """
+    _, precision, check_error = export_optimized(net, torch.zeros(1, STATE_DIM), out,
+                                                 check_inputs=sample_states(states, seed=1),
+                                                 tolerance=tolerance)
+    exported = load_optimized(out)
+    held_out = sample_states(states)
+    return exported, precision, check_error, max_output_error(net, exported, held_out), held_out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--weights", default="model.pth", help="q_net state dict saved by DQNAgent")
+    parser.add_argument("--out", help="export path (default: next to --weights)")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="max absolute output difference")
+    parser.add_argument("--states", type=int, default=4096)
+    parser.add_argument("--repeats", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+    torch.set_num_threads(args.threads)
+
+    net = NeuralQ(input_dim=STATE_DIM)
+    if os.path.exists(args.weights):
+        net.load_state_dict(torch.load(args.weights, map_location="cpu"))
+    else:
+        print(f"{args.weights} not found, exporting a freshly initialised network")
+    net.eval()
+
+    out = args.out or optimized_path(args.weights)
+    exported, precision, check_error, error, states = export_and_check(net, out, args.tolerance, args.states)
+    print(f"Wrote {precision} export to {out} (max error {check_error:.5f} on the check states)")
+    print(f"max |export - eager float32| over {len(states)} held-out states: {error:.5f} "
+          f"(tolerance {args.tolerance})")
+    if error > args.tolerance:
+        print("Equivalence check failed")
+        sys.exit(1)
+
+    print(f"{'batch':>6} {'eager float32 us':>17} {precision + ' TorchScript us':>21} {'speedup':>8}")
+    for batch in (1, 32, 256):
+        inputs = states[:batch]
+        eager = time_forward(net, inputs, args.repeats)
+        optimized = time_forward(exported, inputs, args.repeats)
+        print(f"{batch:>6} {eager * 1e6:>17.1f} {optimized * 1e6:>21.1f} {eager / optimized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""
+Asynchronous floor loading with an LRU of decoded images and floor geometry.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+from sqlalchemy.orm import sessionmaker
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+from adapters.adapter_registry import ImageAdapterRegistry, create_default_registry
+from adapters.png_adapter import read_raster
+from data.repositories.room_repo import RoomRepository
+from data.repositories.stair_repo import StairRepository
+from data.repositories.pathway_repo import PathwayRepository
+from domain.buildings.room import Room
+from domain.buildings.stair import Stair
+from domain.buildings.pathway import Pathway
+
+
+class FloorData:
+    """Everything needed to show one floor on the canvas."""
+
+    def __init__(self, floor_id: int, image_path: str):
+        self.floor_id = floor_id
+        self.image_path = image_path
+        self.image: Optional[QImage] = None  # decoded off-thread, converted on arrival
+        self.pixmap: Optional[QPixmap] = None
+        self.image_ready = False  # decode attempted; pixmap stays None for tiled or unreadable images
+        self.rooms: Optional[List[Room]] = None
+        self.stairs: Optional[List[Stair]] = None
+        self.pathways: Optional[List[Pathway]] = None
+
+    def has_geometry(self) -> bool:
+        return self.rooms is not None and self.stairs is not None and self.pathways is not None
+
+
+class _FloorLoadSignals(QObject):
+    loaded = pyqtSignal(object, int)  # FloorData holding what was loaded, floor generation
+
+
+class _FloorLoadTask(QRunnable):
+    def __init__(self, floor_id: int, image_path: str, generation: int, session_factory,
+                 load_image: bool, load_geometry: bool, max_decode_dimension: int,
+                 image_adapters: ImageAdapterRegistry, signals: _FloorLoadSignals):
+        super().__init__()
+        # Results go into a fresh FloorData, merged into the cache on the GUI thread
+        self.data = FloorData(floor_id, image_path)
+        self.generation = generation
+        self.session_factory = session_factory
+        self.load_image = load_image
+        self.load_geometry = load_geometry
+        self.max_decode_dimension = max_decode_dimension
+        self.image_adapters = image_adapters
+        self.signals = signals
+
+    def run(self):
+        if self.load_image:
+            try:
+                self.data.image = self._decode_image(self.data.image_path)
+            except Exception as e:
+                print(f"Error decoding floor image: {e}")
+            self.data.image_ready = True
+
+        if self.load_geometry:
+            # Sessions are not thread-safe; each task uses its own
+            session = self.session_factory()
+            try:
+                self.data.rooms = RoomRepository(session).find_by_floor_id(self.data.floor_id)
+                self.data.stairs = StairRepository(session).find_by_floor(self.data.floor_id)
+                self.data.pathways = PathwayRepository(session).find_by_floor(self.data.floor_id)
+            except Exception as e:
+                print(f"Error loading floor geometry: {e}")
+            finally:
+                session.close()
+
+        self.signals.loaded.emit(self.data, self.generation)
+
+    def _decode_image(self, image_path: str) -> Optional[QImage]:
+        # Each format goes through its adapter, as on the canvas and in the previews
+        adapter = self.image_adapters.get_adapter(image_path)
+        if adapter is not None and adapter.get_format() == "SVG":
+            # Vector plans are rasterized at their own resolution, never through the tile pyramid
+            image, ok = adapter.load(image_path)
+            return image if ok else None
+        size = QImageReader(image_path).size()
+        # Oversized images are left to the canvas tile pyramid
+        if size.isValid() and max(size.width(), size.height()) > self.max_decode_dimension:
+            return None
+        image, ok = adapter.load(image_path) if adapter is not None else read_raster(image_path)
+        return image if ok else None
+
+
+class FloorLoader(QObject):
+    """Loads floors on a QThreadPool and keeps the most recently used ones ready to show."""
+
+    floor_loaded = pyqtSignal(object)  # FloorData
+
+    def __init__(self, db_engine, max_cached_floors: int = 5, max_decode_dimension: int = 4096,
+                 thread_pool: Optional[QThreadPool] = None, image_adapters: Optional[ImageAdapterRegistry] = None,
+                 parent=None):
+        super().__init__(parent)
+        self.session_factory = sessionmaker(bind=db_engine)
+        self.max_cached_floors = max_cached_floors
+        self.max_decode_dimension = max_decode_dimension
+        self.image_adapters = image_adapters or create_default_registry()
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._cache: "OrderedDict[int, FloorData]" = OrderedDict()
+        self._pending: Set[int] = set()
+        # Bumped whenever a floor is edited or removed; loads started under an older one are stale
+        self._generations: Dict[int, int] = {}
+        self._reload: Set[int] = set()  # edited while loading; requested again once the load returns
+        self._signals = _FloorLoadSignals()
+        self._signals.loaded.connect(self._on_loaded)
+
+    def get_cached(self, floor_id: int, image_path: str) -> Optional[FloorData]:
+        """Return the floor if both its image and geometry are cached, marking it recently used."""
+        data = self._cache.get(floor_id)
+        if data is None or data.image_path != image_path or not data.image_ready or not data.has_geometry():
+            return None
+        self._cache.move_to_end(floor_id)
+        return data
+
+    def request(self, floor_id: int, image_path: str):
+        """Load whatever is missing for a floor; floor_loaded fires when it is complete."""
+        if floor_id in self._pending:
+            return
+        data = self._cache.get(floor_id)
+        if data is None or data.image_path != image_path:
+            data = FloorData(floor_id, image_path)
+            load_image = True
+        else:
+            load_image = not data.image_ready
+        load_geometry = not data.has_geometry()
+        if not load_image and not load_geometry:
+            self.floor_loaded.emit(data)
+            return
+
+        self._pending.add(floor_id)
+        self.thread_pool.start(_FloorLoadTask(
+            floor_id, image_path, self._generations.get(floor_id, 0), self.session_factory,
+            load_image, load_geometry, self.max_decode_dimension, self.image_adapters, self._signals,
+        ))
+
+    def prefetch_neighbors(self, floor_id: int, floors):
+        """Warm the cache with the floors listed directly before and after floor_id."""
+        floors = [f for f in floors if f.floor_id]
+        index = next((i for i, f in enumerate(floors) if f.floor_id == floor_id), None)
+        if index is None:
+            return
+        for neighbor in floors[max(0, index - 1):index] + floors[index + 1:index + 2]:
+            if self.get_cached(neighbor.floor_id, neighbor.image_path) is None:
+                self.request(neighbor.floor_id, neighbor.image_path)
+
+    def invalidate(self, floor_id: Optional[int]):
+        """Drop cached geometry for a floor after it was edited; the image stays cached."""
+        self._generations[floor_id] = self._generations.get(floor_id, 0) + 1
+        if floor_id in self._pending:
+            self._reload.add(floor_id)
+        data = self._cache.get(floor_id)
+        if data is not None:
+            data.rooms = None
+            data.stairs = None
+            data.pathways = None
+
+    def clear(self, floor_id: Optional[int] = None):
+        if floor_id is None:
+            for pending_id in self._pending:
+                self._generations[pending_id] = self._generations.get(pending_id, 0) + 1
+            self._reload.clear()
+            self._cache.clear()
+        else:
+            self._generations[floor_id] = self._generations.get(floor_id, 0) + 1
+            self._reload.discard(floor_id)
+            self._cache.pop(floor_id, None)
+
+    def _on_loaded(self, result: FloorData, generation: int):
+        floor_id = result.floor_id
+        self._pending.discard(floor_id)
+        stale = generation != self._generations.get(floor_id, 0)
+        reload = floor_id in self._reload
+        self._reload.discard(floor_id)
+        if stale and not reload:
+            # The floor was removed while loading
+            return
+        if stale:
+            # Geometry read before the edit; the image is still good
+            result.rooms = None
+            result.stairs = None
+            result.pathways = None
+        if result.image is not None:
+            # QPixmap must be created on the GUI thread
+            result.pixmap = QPixmap.fromImage(result.image)
+            result.image = None
+
+        data = self._cache.get(floor_id)
+        if data is None or data.image_path != result.image_path:
+            data = result
+        else:
+            if result.image_ready:
+                data.pixmap = result.pixmap
+                data.image_ready = True
+            if result.has_geometry():
+                data.rooms = result.rooms
+                data.stairs = result.stairs
+                data.pathways = result.pathways
+        self._cache[floor_id] = data
+        self._cache.move_to_end(floor_id)
+        while len(self._cache) > self.max_cached_floors:
+            self._cache.popitem(last=False)
+
+        if stale:
+            self.request(floor_id, data.image_path)
+        else:
+            self.floor_loaded.emit(data)
@@ -3,8 +3,10 @@ Floor management panel for handling multiple floors.
 """
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QListWidget, 
                              QPushButton, QLabel, QInputDialog, QMessageBox)
-from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSignal, QSize
+from PyQt6.QtGui import QIcon, QPixmap
 from models import FloorPlan, Room
+from preview_loader import PreviewLoader
 
 
 class FloorManager(QWidget):
@@ -19,6 +21,8 @@ class FloorManager(QWidget):
         super().__init__(parent)
         self.db_session = db_session
         self.current_floor_id = None
+        self.preview_loader = PreviewLoader(level="thumbnail", parent=self)
+        self.preview_loader.preview_ready.connect(self.on_preview_ready)
         self.init_ui()
         self.refresh_floors()
     
@@ -34,6 +38,7 @@ class FloorManager(QWidget):
         
         # Floor list
         self.floor_list = QListWidget()
+        self.floor_list.setIconSize(QSize(48, 48))
         self.floor_list.itemClicked.connect(self.on_floor_selected)
         layout.addWidget(self.floor_list)
         
@@ -78,6 +83,8 @@ class FloorManager(QWidget):
                 # Store floor_id in item data
                 item = self.floor_list.item(self.floor_list.count() - 1)
                 item.setData(256, floor.id)  # Qt.ItemDataRole.UserRole = 256
+                item.setData(257, floor.image_path)
+                self.preview_loader.request(floor.image_path)
             
             if floors:
                 self.info_label.setText(f"Total floors: {len(floors)}")
@@ -86,6 +93,14 @@ class FloorManager(QWidget):
         except Exception as e:
             self.info_label.setText(f"Error loading floors: {str(e)}")
     
+    def on_preview_ready(self, image_path: str, pixmap: QPixmap):
+        """Show a floor's thumbnail once it has been generated."""
+        icon = QIcon(pixmap)
+        for i in range(self.floor_list.count()):
+            item = self.floor_list.item(i)
+            if item.data(257) == image_path:
+                item.setIcon(icon)
+    
     def on_floor_selected(self, item):
         """Handle floor selection."""
         floor_id = item.data(256)  # Qt.ItemDataRole.UserRole
@@ -10,6 +10,9 @@ let tool = "room";
 let drawing = false;
 let points = [];
 let actions = [];
+// Keeps this tab's history and predictions separate from other sessions on the backend
+const sessionId = (window.crypto && crypto.randomUUID) ? crypto.randomUUID() : String(Math.random()).slice(2);
+const sessionQuery = "?session_id=" + encodeURIComponent(sessionId);
 
 toolRoom.onclick = () => { tool = "room"; toolRoom.classList.add("active"); toolPath.classList.remove("active"); };
 toolPath.onclick = () => { tool = "path"; toolPath.classList.add("active"); toolRoom.classList.remove("active"); };
@@ -28,17 +31,74 @@ function resizeCanvases() {
   [drawCanvas, ghostCanvas].forEach(c => { c.width = w; c.height = h; });
 }
 
-function sendEvent(action, coords) {
-  const body = { action, coords, timestamp: Date.now() / 1000 };
-  actions.push(body);
-  fetch("http://localhost:8000/api/event", {
+// Events, feedback and prediction requests go over one WebSocket when it is open, with
+// predictions pushed back; plain HTTP is the fallback while it is (re)connecting
+let stream = null;
+let outgoing = [];
+
+function connectStream() {
+  const socket = new WebSocket("ws://localhost:8000/api/stream" + sessionQuery);
+  socket.onopen = () => { stream = socket; };
+  socket.onmessage = e => {
+    const data = JSON.parse(e.data);
+    (Array.isArray(data) ? data : [data]).forEach(handleStreamMessage);
+  };
+  socket.onclose = () => {
+    stream = null;
+    setTimeout(connectStream, 2000);
+  };
+}
+
+function handleStreamMessage(message) {
+  if (message.type === "prediction") drawGhost(message);
+  else if (message.type === "error") console.warn("stream error:", message.detail);
+}
+
+function streamSend(message) {
+  if (!stream || stream.readyState !== WebSocket.OPEN) {
+    httpSend(message);
+    return;
+  }
+  // Messages sent in the same task (e.g. an event and the prediction request after it) share a frame
+  outgoing.push(message);
+  if (outgoing.length === 1) {
+    queueMicrotask(() => {
+      const batch = outgoing;
+      outgoing = [];
+      // The socket may have closed since the messages were queued
+      if (stream && stream.readyState === WebSocket.OPEN) {
+        stream.send(JSON.stringify(batch.length === 1 ? batch[0] : batch));
+      } else {
+        batch.forEach(httpSend);
+      }
+    });
+  }
+}
+
+function httpSend(message) {
+  const { type, ...body } = message;
+  if (type === "predict") {
+    fetch("http://localhost:8000/api/predict" + sessionQuery).then(r => r.json()).then(drawGhost);
+    return;
+  }
+  fetch("http://localhost:8000/api/" + type + sessionQuery, {
     method: "POST", headers: { "Content-Type": "application/json" },
     body: JSON.stringify(body)
   });
 }
 
+function sendEvent(action, coords) {
+  const body = { action, coords, timestamp: Date.now() / 1000 };
+  actions.push(body);
+  streamSend({ type: "event", ...body });
+}
+
 function requestPrediction() {
-  fetch("http://localhost:8000/api/predict").then(r => r.json()).then(drawGhost);
+  streamSend({ type: "predict" });
+}
+
+function sendFeedback(predictionId, reward) {
+  streamSend({ type: "feedback", prediction_id: predictionId, reward });
 }
 
 function drawGhost(pred) {
@@ -120,17 +180,14 @@ function finalize() {
 ghostCanvas.onclick = () => {
   const predId = ghostCanvas.dataset.predictionId;
   if (!predId) return;
-  fetch("http://localhost:8000/api/feedback", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ prediction_id: predId, reward: 1 })
-  });
+  sendFeedback(predId, 1);
   ghostCanvas.getContext("2d").clearRect(0, 0, ghostCanvas.width, ghostCanvas.height);
   requestPrediction();
 };
 
 window.onload = () => {
   toolRoom.classList.add("active");
+  connectStream();
   requestPrediction();
 };
 
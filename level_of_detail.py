@@ -0,0 +1,128 @@
+"""
+Level-of-detail helpers for drawing floor plans at low zoom.
+"""
+from PyQt6.QtCore import QPointF
+from collections import deque
+from typing import Dict, List, Optional
+import math
+
+# Geometry closer than this many screen pixels to the simplified outline is dropped
+SIMPLIFY_TOLERANCE_PIXELS = 1.5
+
+
+def lod_bucket(lod: float) -> int:
+    """Zoom bucket for caching simplified geometry; each bucket halves the zoom."""
+    if lod >= 1.0 or lod <= 0:
+        return 0
+    return int(math.ceil(math.log2(1.0 / lod)))
+
+
+def tolerance_for_bucket(bucket: int) -> float:
+    """Scene-space simplification tolerance for a zoom bucket."""
+    return SIMPLIFY_TOLERANCE_PIXELS * (2 ** bucket)
+
+
+def vertex_significance(points: List[QPointF]) -> List[float]:
+    """Douglas-Peucker significance of each vertex of an open polyline.
+
+    A vertex survives simplification at tolerance t exactly when its significance exceeds t,
+    so one pass serves every zoom level.
+    """
+    n = len(points)
+    if n <= 2:
+        return [math.inf] * n
+
+    xs = [p.x() for p in points]
+    ys = [p.y() for p in points]
+    significance = [0.0] * n
+    significance[0] = significance[-1] = math.inf
+    # Explicit stack instead of recursion so long pathways cannot hit the recursion limit
+    stack = [(0, n - 1, math.inf)]
+    while stack:
+        first, last, ceiling = stack.pop()
+        if last - first < 2:
+            continue
+        ax, ay = xs[first], ys[first]
+        dx, dy = xs[last] - ax, ys[last] - ay
+        length_sq = dx * dx + dy * dy
+        max_dist = -1.0
+        index = first + 1
+        # Squared distances avoid a sqrt per vertex; the segment test is inlined for speed
+        for i in range(first + 1, last):
+            px, py = xs[i] - ax, ys[i] - ay
+            if length_sq:
+                t = (px * dx + py * dy) / length_sq
+                if t < 0.0:
+                    t = 0.0
+                elif t > 1.0:
+                    t = 1.0
+                px -= t * dx
+                py -= t * dy
+            dist = px * px + py * py
+            if dist > max_dist:
+                max_dist = dist
+                index = i
+        max_dist = math.sqrt(max_dist)
+        # A split only happens if every enclosing split happened too
+        value = min(max_dist, ceiling)
+        significance[index] = value
+        stack.append((first, index, value))
+        stack.append((index, last, value))
+    return significance
+
+
+def simplify_polyline(points: List[QPointF], tolerance: float) -> List[QPointF]:
+    """Douglas-Peucker simplification of an open polyline."""
+    if len(points) <= 2 or tolerance <= 0:
+        return list(points)
+    return [p for p, w in zip(points, vertex_significance(points)) if w > tolerance]
+
+
+def ring_significance(points: List[QPointF]) -> List[float]:
+    """Vertex significance of a closed ring, split at the first vertex."""
+    if len(points) <= 4:
+        return [math.inf] * len(points)
+    ring = list(points)
+    if ring[0] != ring[-1]:
+        ring.append(ring[0])
+        return vertex_significance(ring)[:-1]
+    return vertex_significance(ring)
+
+
+def simplify_polygon(points: List[QPointF], tolerance: float,
+                     significance: Optional[List[float]] = None) -> List[QPointF]:
+    """Douglas-Peucker simplification of a closed ring; returns the input if it would collapse."""
+    if len(points) <= 4:
+        return list(points)
+    if significance is None:
+        significance = ring_significance(points)
+    simplified = [p for p, w in zip(points, significance) if w > tolerance]
+    return simplified if len(simplified) >= 3 else list(points)
+
+
+class FrameTimer:
+    """Rolling paint-time statistics for the frame-time overlay."""
+
+    def __init__(self, window: int = 60):
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def reset(self):
+        self.samples.clear()
+
+    def stats(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"frames": 0, "avg_ms": 0.0, "max_ms": 0.0, "fps": 0.0}
+        avg = sum(self.samples) / len(self.samples)
+        return {
+            "frames": len(self.samples),
+            "avg_ms": avg * 1000.0,
+            "max_ms": max(self.samples) * 1000.0,
+            "fps": 1.0 / avg if avg > 0 else 0.0,
+        }
+
+    def summary(self) -> str:
+        s = self.stats()
+        return f"paint {s['avg_ms']:.1f} ms avg / {s['max_ms']:.1f} ms max ({s['fps']:.0f} fps, {s['frames']} frames)"
@@ -4,26 +4,60 @@ Fixed architecture: Features = previous pattern, Target = next pattern.
 """
 import json
 import os
+import copy
 import math
-from typing import List, Tuple, Optional, Dict
+import threading
+from typing import List, Tuple, Optional, Dict, TYPE_CHECKING
 import numpy as np
-import torch
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import r2_score, mean_squared_error
-from core.dqn_agent import DQNAgent
-from core.state_encoder import encode_state
+from core.lazy_import import lazy_import, warm_up
+from core.forest_table import ForestTable
+from core.training_stats import TrainingStats, MAHALANOBIS_THRESHOLD
+from core.training_scheduler import TrainingScheduler
+from core.pattern_log import PatternLog, pattern_to_record, records_to_patterns
+from core.online_learner import StreamingKNN
+from core.model_store import load_artifact, records_fingerprint, save_artifact
+
+if TYPE_CHECKING:
+    from sklearn.ensemble import RandomForestRegressor
+
+# torch and sklearn take seconds to import; they load on first use or in warm_up()
+torch = lazy_import("torch")
+ensemble = lazy_import("sklearn.ensemble")
+model_selection = lazy_import("sklearn.model_selection")
+sk_metrics = lazy_import("sklearn.metrics")
+dqn_agent = lazy_import("core.dqn_agent")
+state_encoder = lazy_import("core.state_encoder")
+ML_MODULES = (torch, ensemble, model_selection, sk_metrics, dqn_agent, state_encoder)
 
 
 class PatternLearner:
     """Learns patterns from room placement sequences and suggests next positions."""
     
-    def __init__(self, patterns_file: str = "patterns.json", demo_mode: bool = True):
+    def __init__(self, patterns_file: str = "patterns.json", demo_mode: bool = True, novelty_method: str = "box",
+                 max_patterns: Optional[int] = 20000, learner_backend: str = "forest"):
         self.patterns_file = patterns_file
         self.patterns = []  # List of training examples
+        # Patterns persist to an append-only log next to the legacy JSON file (e.g. patterns.jsonl)
+        root, ext = os.path.splitext(patterns_file)
+        self.pattern_log = PatternLog(patterns_file if ext == ".jsonl" else root + ".jsonl")
+        self.max_patterns = max_patterns  # oldest patterns beyond this are dropped at compaction
+        # Fitted models are kept next to the log and reused at startup while the log is unchanged
+        self.model_file = os.path.splitext(self.pattern_log.path)[0] + ".model"
+        self._saved_fingerprint: Optional[str] = None
+        self._patterns_epoch = 0  # bumped whenever self.patterns is replaced or trimmed
+        # Running feature summary for out-of-distribution checks: "box", "mahalanobis" or "knn"
+        self.training_stats = TrainingStats()
+        self.novelty_method = novelty_method
         self.model_distance = None
         self.model_direction = None
         self.model_size = None
+        # "forest" refits RandomForests in the background; "online" updates a StreamingKNN per pattern
+        self.learner_backend = learner_backend
+        self.online_model: Optional[StreamingKNN] = StreamingKNN() if learner_backend == "online" else None
+        # Guards publishing of trained models, which happens on the training thread
+        self._model_lock = threading.Lock()
+        self.trainer = TrainingScheduler(self.train_model)
+        self._forest_tables: Dict[str, Tuple["RandomForestRegressor", ForestTable]] = {}
         self.is_trained = False
         self.demo_mode = demo_mode
         self.performance_metrics = {
@@ -35,20 +69,25 @@ class PatternLearner:
         }
         
         # In demo mode, skip heavy ML initialization
+        self.dqn = None
+        # Set by load_patterns; the training thread tries the saved models before refitting
+        self._warm_start_records: Optional[np.ndarray] = None
         if not demo_mode:
-            try:
-                self.dqn = DQNAgent(input_dim=8)
-                print("[DEMO] ML components initialized with GPU acceleration")
-            except Exception as e:
-                print(f"[DEMO] ML initialization failed: {e}")
-                self.dqn = None
+            # The DQN is created once its imports finish off the GUI thread; RL steps are skipped until then
+            warm_up(ML_MODULES, self._init_dqn)
         else:
-            self.dqn = None
             print("[DEMO] PatternLearner running in demo mode - using stub predictions")
         
         # Load existing patterns
         self.load_patterns()
     
+    def _init_dqn(self):
+        try:
+            self.dqn = dqn_agent.DQNAgent(input_dim=8)
+            print("[DEMO] ML components initialized with GPU acceleration")
+        except Exception as e:
+            print(f"[DEMO] ML initialization failed: {e}")
+
     def get_room_center(self, vertices: List[List[float]]) -> Tuple[float, float]:
         """Calculate the center point of a room from its vertices."""
         if not vertices:
@@ -136,24 +175,35 @@ class PatternLearner:
             "target_size": target_size,
         }
         
-        self.patterns.append(pattern)
+        with self._model_lock:
+            self.patterns.append(pattern)
+            self.training_stats.add(pattern["features"])
+            if self.online_model is not None:
+                self.online_model.add(pattern["features"], self._pattern_targets(pattern))
+                self._publish_online()
         
         # Save after each pattern
-        self.save_patterns()
+        self._append_pattern(pattern)
         
+        if self.online_model is not None:
+            # Already learned above; no refit needed
+            pass
         # Efficient retraining: batch retraining every 3 patterns after threshold
-        if len(self.patterns) >= 5 and len(self.patterns) % 3 == 0:
-            self.train_model()
+        elif len(self.patterns) >= 5 and len(self.patterns) % 3 == 0:
+            self.request_training()
         elif len(self.patterns) == 5:
             # Initial training at threshold
-            self.train_model()
+            self.request_training()
 
         # RL: build transition (state -> next_state) with positive reward
+        if self.dqn is None:
+            # Demo mode, or torch is still loading
+            return
         try:
             last_center = center_c
             prev_center = center_b
-            state = encode_state(last_center, prev_center, avg_angle=target_direction,
-                                 pattern_count=len(self.patterns), device=self.dqn.device)
+            state = state_encoder.encode_state(last_center, prev_center, avg_angle=target_direction,
+                                               pattern_count=len(self.patterns), device=self.dqn.device)
             # action vector is observed delta normalized
             dx = target_distance * math.cos(math.radians(target_direction))
             dy = target_distance * math.sin(math.radians(target_direction))
@@ -167,10 +217,29 @@ class PatternLearner:
         except Exception:
             pass
     
+    def request_training(self):
+        """Retrain in the background; requests made while training is running are coalesced."""
+        self.trainer.request()
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> bool:
+        return self.trainer.wait(timeout)
+
     def train_model(self):
         """Train regression models on collected patterns with train/test split."""
-        if len(self.patterns) < 5:
-            self.is_trained = False
+        if self._warm_start_records is not None:
+            records, self._warm_start_records = self._warm_start_records, None
+            if self._load_models(records):
+                return
+        if self.online_model is not None:
+            self._train_online()
+            return
+        # Snapshot: record_pattern may append while this runs on the training thread
+        epoch = self._patterns_epoch
+        patterns = list(self.patterns)
+        # Exact recompute (including quantiles) to correct any drift from incremental updates
+        stats = self._compute_training_stats(patterns)
+        if len(patterns) < 5:
+            self._publish_training(epoch, patterns, stats)
             return
         
         # Prepare features and targets
@@ -180,7 +249,7 @@ class PatternLearner:
         y_size = []
         has_any_size_target = False
         
-        for pattern in self.patterns:
+        for pattern in patterns:
             feats = pattern.get("features")
             if not isinstance(feats, list):
                 continue
@@ -207,13 +276,13 @@ class PatternLearner:
         y_size = np.array(y_size)
 
         if len(X) < 5:
-            self.is_trained = False
+            self._publish_training(epoch, patterns, stats)
             return
         
         # Train/test split for performance evaluation
         # Use proper split only when we have enough data for reliable metrics
         if len(X) >= 10:
-            X_train, X_test, y_dist_train, y_dist_test, y_dir_train, y_dir_test, y_size_train, y_size_test = train_test_split(
+            X_train, X_test, y_dist_train, y_dist_test, y_dir_train, y_dir_test, y_size_train, y_size_test = model_selection.train_test_split(
                 X, y_distance, y_direction, y_size, test_size=0.2, random_state=42
             )
             can_evaluate = True
@@ -227,58 +296,119 @@ class PatternLearner:
             can_evaluate = False
         
         # Train regression models (not classification!)
-        self.model_distance = RandomForestRegressor(
+        # Fitted into locals and published together: suggestions are computed on other threads
+        model_distance = ensemble.RandomForestRegressor(
             n_estimators=10,
             max_depth=5,
             random_state=42,
             min_samples_split=2
         )
-        self.model_distance.fit(X_train, y_dist_train)
+        model_distance.fit(X_train, y_dist_train)
         
-        self.model_direction = RandomForestRegressor(
+        model_direction = ensemble.RandomForestRegressor(
             n_estimators=10,
             max_depth=5,
             random_state=42,
             min_samples_split=2
         )
-        self.model_direction.fit(X_train, y_dir_train)
+        model_direction.fit(X_train, y_dir_train)
 
-        self.model_size = None
+        model_size = None
         if has_any_size_target:
             size_mask = np.array(y_size_train) > 0
             if np.any(size_mask):
-                self.model_size = RandomForestRegressor(
+                model_size = ensemble.RandomForestRegressor(
                     n_estimators=10,
                     max_depth=5,
                     random_state=42,
                     min_samples_split=2,
                 )
-                self.model_size.fit(X_train[size_mask], np.array(y_size_train)[size_mask])
-        
+                model_size.fit(X_train[size_mask], np.array(y_size_train)[size_mask])
+
         # Calculate performance metrics (only if we have proper test set)
         if can_evaluate:
-            y_dist_pred = self.model_distance.predict(X_test)
-            y_dir_pred = self.model_direction.predict(X_test)
+            y_dist_pred = model_distance.predict(X_test)
+            y_dir_pred = model_direction.predict(X_test)
             
-            self.performance_metrics = {
-                "distance_r2": float(r2_score(y_dist_test, y_dist_pred)),
-                "direction_r2": float(r2_score(y_dir_test, y_dir_pred)),
-                "distance_rmse": float(np.sqrt(mean_squared_error(y_dist_test, y_dist_pred))),
-                "direction_rmse": float(np.sqrt(mean_squared_error(y_dir_test, y_dir_pred))),
+            performance_metrics = {
+                "distance_r2": float(sk_metrics.r2_score(y_dist_test, y_dist_pred)),
+                "direction_r2": float(sk_metrics.r2_score(y_dir_test, y_dir_pred)),
+                "distance_rmse": float(np.sqrt(sk_metrics.mean_squared_error(y_dist_test, y_dist_pred))),
+                "direction_rmse": float(np.sqrt(sk_metrics.mean_squared_error(y_dir_test, y_dir_pred))),
                 "training_samples": len(X_train),
                 "test_samples": len(X_test),
                 "reliable_metrics": True,
             }
         else:
             # Insufficient data for reliable metrics
-            self.performance_metrics = {
+            performance_metrics = {
                 "training_samples": len(X_train),
                 "reliable_metrics": False,
                 "note": "Insufficient data for reliable metrics (need 10+ patterns)",
             }
-        
-        self.is_trained = True
+
+        self._publish_training(epoch, patterns, stats, (model_distance, model_direction, model_size), performance_metrics)
+        self.save_models(patterns)
+
+    def _publish_training(self, epoch: int, patterns: List[dict], stats: TrainingStats,
+                          models: Optional[Tuple] = None, performance_metrics: Optional[dict] = None):
+        """Swap in the results of a training run computed from the given pattern snapshot."""
+        with self._model_lock:
+            if epoch != self._patterns_epoch:
+                # The list was trimmed or reloaded meanwhile; the snapshot is no prefix of it
+                stats = self._compute_training_stats(self.patterns)
+            else:
+                # Patterns recorded while training was running
+                for pattern in self.patterns[len(patterns):]:
+                    stats.add(pattern["features"])
+            self.training_stats = stats
+            if models is None:
+                self.is_trained = False
+                return
+            self.model_distance, self.model_direction, self.model_size = models
+            self.performance_metrics = performance_metrics
+            self.is_trained = True
     
+    def _pattern_targets(self, pattern: dict) -> Tuple[float, float, float]:
+        return (pattern["target_distance"], pattern["target_direction"], pattern.get("target_size") or 0.0)
+
+    def _train_online(self, evaluate_last: int = 500):
+        """
+        Rebuild the online learner from all patterns, e.g. after loading them.
+        
+        Args:
+            evaluate_last: Only the newest patterns are scored before being learned, which bounds
+                the rebuild cost while still giving prequential metrics for the status panel
+        """
+        epoch = self._patterns_epoch
+        patterns = list(self.patterns)
+        stats = self._compute_training_stats(patterns)
+        model = StreamingKNN(self.online_model.capacity, self.online_model.k)
+        first_evaluated = len(patterns) - evaluate_last
+        for i, pattern in enumerate(patterns):
+            model.add(pattern["features"], self._pattern_targets(pattern), evaluate=i >= first_evaluated)
+
+        with self._model_lock:
+            if epoch != self._patterns_epoch:
+                # The list was trimmed or reloaded meanwhile; learn it again without scoring
+                stats = self._compute_training_stats(self.patterns)
+                model = StreamingKNN(model.capacity, model.k)
+                late = self.patterns
+            else:
+                # Patterns recorded while the rebuild was running
+                late = self.patterns[len(patterns):]
+            for pattern in late:
+                stats.add(pattern["features"])
+                model.add(pattern["features"], self._pattern_targets(pattern), evaluate=False)
+            self.training_stats = stats
+            self.online_model = model
+            self._publish_online()
+
+    def _publish_online(self):
+        # Caller holds _model_lock
+        self.is_trained = self.online_model.size >= 5
+        self.performance_metrics = self.online_model.metrics()
+
     def suggest_positions(self, previous_rooms: List[List[List[float]]], num_suggestions: int = 3) -> List[Tuple[float, float, str, float]]:
         """
         Suggest next room positions based on learned patterns.
@@ -375,16 +505,21 @@ class PatternLearner:
             # USE THE ACTUAL MODEL FOR PREDICTIONS
             features = np.array([[input_distance, input_direction, input_size]])
             
+            # Tree outputs are computed once and shared by the checks and predictions below
+            memo: Dict[bytes, Dict[str, np.ndarray]] = {}
+
             # Validate if model predictions are reliable
-            if self.should_use_model(features):
-                pred_distance = self.model_distance.predict(features)[0]
-                pred_direction = self.model_direction.predict(features)[0]
-                if self.model_size is not None:
-                    pred_size = float(self.model_size.predict(features)[0])
+            if self.should_use_model(features, memo):
+                # Forest prediction is the mean over its trees
+                trees = self.get_tree_predictions(features, memo)
+                pred_distance = float(trees["distance"][:, 0].mean())
+                pred_direction = float(trees["direction"][:, 0].mean())
+                if "size" in trees:
+                    pred_size = float(trees["size"][:, 0].mean())
                 else:
                     pred_size = float(input_size) if input_size > 0 else 0.0
 
-                confidence = self.get_prediction_confidence(features)
+                confidence = self.get_prediction_confidence(features, memo)
                 
                 # Generate suggestions from model predictions
                 suggestions = []
@@ -492,51 +627,159 @@ class PatternLearner:
         
         return []
     
+    def _append_pattern(self, pattern: dict):
+        try:
+            self.pattern_log.append(pattern_to_record(pattern))
+            if self.pattern_log.needs_compaction(self.max_patterns):
+                with self._model_lock:
+                    self.patterns = self.patterns[-self.max_patterns:]
+                    self._patterns_epoch += 1
+                    self.training_stats = self._compute_training_stats(self.patterns)
+                self.save_patterns()
+        except Exception as e:
+            print(f"Error saving patterns: {e}")
+
     def save_patterns(self):
-        """Save patterns to JSON file."""
+        """Rewrite the pattern log with exactly the current patterns (compaction)."""
         try:
-            with open(self.patterns_file, 'w') as f:
-                json.dump(self.patterns, f, indent=2)
+            self.pattern_log.compact(np.array([pattern_to_record(p) for p in self.patterns]).reshape(-1, 6))
         except Exception as e:
             print(f"Error saving patterns: {e}")
+
+    def close(self):
+        """Flush appended patterns to disk and save the current models."""
+        self.pattern_log.close()
+        self.save_models()
+        if self.dqn is not None:
+            # Autosaves skip the TorchScript export; write it once here
+            self.dqn.save()
+
+    def save_models(self, patterns: Optional[List[dict]] = None):
+        """
+        Write the fitted models, feature schema and training statistics to the model artifact.
+        
+        Args:
+            patterns: The patterns the forests were fitted on; defaults to all current patterns
+        """
+        if not self.is_trained:
+            return
+        try:
+            with self._model_lock:
+                if patterns is None:
+                    patterns = list(self.patterns)
+                payload = {
+                    "backend": self.learner_backend,
+                    "training_stats": self.training_stats,
+                    "performance_metrics": dict(self.performance_metrics),
+                }
+                if self.online_model is not None:
+                    # Updated in place by record_pattern, so copy it while holding the lock
+                    payload["online_model"] = copy.deepcopy(self.online_model)
+                else:
+                    payload["models"] = (self.model_distance, self.model_direction, self.model_size)
+            fingerprint = records_fingerprint(np.array([pattern_to_record(p) for p in patterns]))
+            if fingerprint == self._saved_fingerprint:
+                return
+            payload["fingerprint"] = fingerprint
+            save_artifact(self.model_file, payload)
+            self._saved_fingerprint = fingerprint
+        except Exception as e:
+            print(f"Error saving models: {e}")
+
+    def _load_models(self, records: np.ndarray) -> bool:
+        """Warm start from the model artifact; False if it is missing or stale for these records."""
+        try:
+            fingerprint = records_fingerprint(records)
+            payload = load_artifact(self.model_file, fingerprint, self.learner_backend)
+            if payload is None:
+                return False
+            with self._model_lock:
+                if len(self.patterns) != len(records):
+                    # Patterns were recorded while the artifact loaded; it no longer matches
+                    return False
+                self.training_stats = payload["training_stats"]
+                self.performance_metrics = dict(payload["performance_metrics"])
+                if self.online_model is not None:
+                    self.online_model = payload["online_model"]
+                    self._publish_online()
+                else:
+                    self.model_distance, self.model_direction, self.model_size = payload["models"]
+                    self.is_trained = True
+            self._saved_fingerprint = fingerprint
+            return True
+        except Exception as e:
+            print(f"Error loading models: {e}")
+            return False
     
     def load_patterns(self):
-        """Load patterns from JSON file."""
-        if os.path.exists(self.patterns_file):
-            try:
-                with open(self.patterns_file, 'r') as f:
-                    loaded = json.load(f)
-                    
-                # Validate and convert old format if needed
-                self.patterns = []
-                for pattern in loaded:
-                    if isinstance(pattern, dict):
-                        # Check if old format (with nested features dict)
-                        if "features" in pattern:
-                            if isinstance(pattern["features"], dict):
-                                # Old format - skip invalid patterns
-                                continue
-                            elif isinstance(pattern["features"], list) and len(pattern["features"]) in (2, 3):
-                                feats = pattern["features"]
-                                if len(feats) == 2:
-                                    pattern["features"] = [feats[0], feats[1], 0.0]
-                                self.patterns.append(pattern)
-                
-                # Retrain model if we have enough patterns
-                if len(self.patterns) >= 5:
-                    self.train_model()
-            except Exception as e:
-                print(f"Error loading patterns: {e}")
-                self.patterns = []
-        else:
+        """Load patterns from the pattern log, migrating the legacy JSON file on first use."""
+        try:
+            if self.pattern_log.exists():
+                records = self.pattern_log.load()
+                rewrite = self.pattern_log.needs_rewrite
+            elif os.path.exists(self.patterns_file) and self.patterns_file != self.pattern_log.path:
+                records = self._load_legacy_patterns()
+                rewrite = True
+            else:
+                records = np.empty((0, 6))
+                rewrite = False
+
+            if self.max_patterns is not None and len(records) > self.max_patterns:
+                records = records[-self.max_patterns:]
+                rewrite = True
+            with self._model_lock:
+                self.patterns = records_to_patterns(records)
+                self._patterns_epoch += 1
+            if rewrite:
+                self.pattern_log.compact(records)
+
+            # Warm start from saved models, or retrain if we have enough patterns (the online
+            # learner is rebuilt from any number). Both run on the training thread, keeping
+            # sklearn out of startup; suggestions fall back to pattern continuation meanwhile.
+            if len(self.patterns) >= 5 or self.online_model is not None:
+                self._warm_start_records = records
+                self.request_training()
+                return
+        except Exception as e:
+            print(f"Error loading patterns: {e}")
             self.patterns = []
+        self._rebuild_training_stats()
+
+    def _load_legacy_patterns(self) -> np.ndarray:
+        """Read the old indented JSON array format, skipping entries with nested feature dicts."""
+        with open(self.patterns_file, 'r') as f:
+            loaded = json.load(f)
+        records = []
+        for pattern in loaded:
+            if (isinstance(pattern, dict) and isinstance(pattern.get("features"), list)
+                    and len(pattern["features"]) in (2, 3)):
+                try:
+                    records.append(pattern_to_record(pattern))
+                except (KeyError, TypeError, ValueError):
+                    continue
+        return np.array(records, dtype=np.float64).reshape(-1, 6)
+
+    def _rebuild_training_stats(self):
+        self.training_stats = self._compute_training_stats(self.patterns)
+
+    def _compute_training_stats(self, patterns: List[dict]) -> TrainingStats:
+        stats = TrainingStats()
+        stats.rebuild(
+            p["features"] for p in patterns
+            if isinstance(p.get("features"), list) and len(p["features"]) in (2, 3)
+        )
+        return stats
     
     def get_status(self) -> dict:
         """Get learning status information with performance metrics."""
         status = {
             "patterns_collected": len(self.patterns),
             "model_trained": self.is_trained,
+            "learner_backend": self.learner_backend,
         }
+        if self.online_model is not None:
+            status["reservoir_size"] = self.online_model.size
+        status.update(self.trainer.status())
         
         # Add performance metrics if available and reliable
         if self.is_trained:
@@ -559,7 +802,7 @@ class PatternLearner:
     
     def get_feature_importance(self) -> Optional[Dict[str, float]]:
         """Get feature importance from trained models (for interpretability)."""
-        if not self.is_trained:
+        if not self.is_trained or self.online_model is not None:
             return None
 
         importance = {
@@ -588,49 +831,92 @@ class PatternLearner:
     def _to_tensor(self, arr):
         return torch.tensor(arr, dtype=torch.float32, device=self.dqn.device)
     
-    def get_prediction_confidence(self, features: np.ndarray) -> float:
+    def _forest_table(self, name: str, model: "RandomForestRegressor") -> ForestTable:
+        cached = self._forest_tables.get(name)
+        if cached is None or cached[0] is not model:
+            cached = (model, ForestTable(model))
+            self._forest_tables[name] = cached
+        return cached[1]
+
+    def get_tree_predictions(self, features: np.ndarray,
+                             memo: Optional[Dict[bytes, Dict[str, np.ndarray]]] = None) -> Dict[str, np.ndarray]:
         """
-        Get confidence measure from RandomForest using tree variance.
-        Returns confidence score between 0.0 (low) and 1.0 (high).
+        Get every tree's prediction from each trained forest in one vectorized pass.
+        With the online backend, the k nearest neighbours' targets stand in for the trees.
+        
+        Args:
+            features: Feature rows, shape (n_rows, n_features)
+            memo: Optional per-request cache keyed by feature row; rows already in it are not recomputed
+            
+        Returns:
+            Dict of forest name ("distance", "direction", optionally "size") to array (n_trees, n_rows)
+        """
+        features = np.atleast_2d(np.asarray(features, dtype=np.float64))
+        # Read the models once; training may publish new ones from another thread
+        with self._model_lock:
+            forests = [("distance", self.model_distance), ("direction", self.model_direction)]
+            if self.model_size is not None:
+                forests.append(("size", self.model_size))
+
+        keys = [row.tobytes() for row in features]
+        rows = [None if memo is None else memo.get(key) for key in keys]
+        missing = [i for i, row in enumerate(rows) if row is None]
+        if missing:
+            if self.online_model is not None:
+                # The reservoir is updated in place by record_pattern
+                with self._model_lock:
+                    computed = self.online_model.neighbour_targets(features[missing])
+            else:
+                computed = {name: self._forest_table(name, model).predict_trees(features[missing])
+                            for name, model in forests}
+            for j, i in enumerate(missing):
+                rows[i] = {name: preds[:, j] for name, preds in computed.items()}
+                if memo is not None:
+                    memo[keys[i]] = rows[i]
+
+        return {name: np.stack([row[name] for row in rows], axis=1) for name in rows[0]}
+
+    def get_prediction_confidences(self, features: np.ndarray,
+                                   memo: Optional[Dict[bytes, Dict[str, np.ndarray]]] = None) -> np.ndarray:
+        """
+        Get confidence for a batch of feature rows from RandomForest tree variance.
+        Returns array of scores between 0.0 (low) and 1.0 (high), one per row.
         """
+        features = np.atleast_2d(features)
         if not self.is_trained:
-            return 0.0
-        
-        # Get predictions from all trees in the forest
-        trees_dist = [tree.predict(features)[0] for tree in self.model_distance.estimators_]
-        trees_dir = [tree.predict(features)[0] for tree in self.model_direction.estimators_]
-        trees_size = None
-        if self.model_size is not None:
-            trees_size = [tree.predict(features)[0] for tree in self.model_size.estimators_]
-        
-        # Calculate variance as uncertainty measure
-        mean_dist = np.mean(trees_dist)
-        mean_dir = np.mean(trees_dir)
-        std_dist = np.std(trees_dist)
-        std_dir = np.std(trees_dir)
-        std_size = np.std(trees_size) if trees_size is not None else None
-        
-        # Normalize confidence: lower std = higher confidence
+            return np.zeros(len(features))
+
+        trees = self.get_tree_predictions(features, memo)
+
+        # Variance across trees as uncertainty measure
         # For distance: normalize by mean (coefficient of variation)
-        if mean_dist > 1e-8:
-            conf_distance = 1.0 - min(1.0, std_dist / mean_dist)
-        else:
-            conf_distance = 0.5
-        
+        conf_distance = self._relative_confidence(trees["distance"])
+
         # For direction: normalize by 180 (max reasonable std for angles)
-        conf_direction = 1.0 - min(1.0, std_dir / 180.0)
-        
+        conf_direction = 1.0 - np.minimum(1.0, trees["direction"].std(axis=0) / 180.0)
+
         # Average confidence
-        if std_size is not None and trees_size is not None:
-            mean_size = np.mean(trees_size)
-            if mean_size > 1e-8:
-                conf_size = 1.0 - min(1.0, std_size / mean_size)
-            else:
-                conf_size = 0.5
+        if "size" in trees:
+            conf_size = self._relative_confidence(trees["size"])
             return (conf_distance + conf_direction + conf_size) / 3.0
         return (conf_distance + conf_direction) / 2.0
+
+    def _relative_confidence(self, tree_preds: np.ndarray) -> np.ndarray:
+        mean = tree_preds.mean(axis=0)
+        std = tree_preds.std(axis=0)
+        safe_mean = np.where(mean > 1e-8, mean, 1.0)
+        return np.where(mean > 1e-8, 1.0 - np.minimum(1.0, std / safe_mean), 0.5)
+
+    def get_prediction_confidence(self, features: np.ndarray,
+                                  memo: Optional[Dict[bytes, Dict[str, np.ndarray]]] = None) -> float:
+        """
+        Get confidence measure from RandomForest using tree variance.
+        Returns confidence score between 0.0 (low) and 1.0 (high).
+        """
+        return float(self.get_prediction_confidences(features, memo)[0])
     
-    def should_use_model(self, features: np.ndarray) -> bool:
+    def should_use_model(self, features: np.ndarray,
+                         memo: Optional[Dict[bytes, Dict[str, np.ndarray]]] = None) -> bool:
         """
         Check if model predictions are reliable for given features.
         Returns True if features are within training range and model is trained.
@@ -638,45 +924,18 @@ class PatternLearner:
         if not self.is_trained or len(self.patterns) == 0:
             return False
         
-        # Check if input features are within training range
-        training_distances = [p["features"][0] for p in self.patterns]
-        training_directions = [p["features"][1] for p in self.patterns]
-        training_sizes = [p["features"][2] for p in self.patterns if isinstance(p.get("features"), list) and len(p["features"]) >= 3 and p["features"][2] > 0]
-        
-        training_ranges = {
-            'distance': (min(training_distances), max(training_distances)),
-            'direction': (min(training_directions), max(training_directions))
-        }
-        if training_sizes:
-            training_ranges['size'] = (min(training_sizes), max(training_sizes))
-        
-        if features.shape[1] >= 3:
-            feat_distance, feat_direction, feat_size = features[0]
+        # Check if input features are within training range (with small margin for generalization)
+        if self.novelty_method == "mahalanobis":
+            in_distribution = self.training_stats.mahalanobis(features[0]) <= MAHALANOBIS_THRESHOLD
+        elif self.novelty_method == "knn":
+            in_distribution = self.training_stats.knn_novelty(features[0]) <= 1.0
         else:
-            feat_distance, feat_direction = features[0]
-            feat_size = 0.0
-        
-        # Check if within training range (with small margin for generalization)
-        margin_factor = 0.1  # 10% margin
-        dist_range = training_ranges['distance']
-        dir_range = training_ranges['direction']
-        
-        dist_margin = (dist_range[1] - dist_range[0]) * margin_factor
-        dir_margin = (dir_range[1] - dir_range[0]) * margin_factor
-        
-        in_distance_range = (dist_range[0] - dist_margin <= feat_distance <= 
-                            dist_range[1] + dist_margin)
-        in_direction_range = (dir_range[0] - dir_margin <= feat_direction <= 
-                             dir_range[1] + dir_margin)
-
-        in_size_range = True
-        if 'size' in training_ranges and feat_size > 0:
-            size_range = training_ranges['size']
-            size_margin = (size_range[1] - size_range[0]) * margin_factor
-            in_size_range = (size_range[0] - size_margin <= feat_size <= size_range[1] + size_margin)
+            in_distribution = self.training_stats.in_training_range(features[0], margin_factor=0.1)
+        if not in_distribution:
+            return False
         
         # Also check confidence
-        confidence = self.get_prediction_confidence(features)
+        confidence = self.get_prediction_confidence(features, memo)
         min_confidence = 0.3  # Minimum confidence threshold
         
-        return in_distance_range and in_direction_range and in_size_range and confidence >= min_confidence
+        return confidence >= min_confidence
@@ -0,0 +1,70 @@
+"""
+Background loading of cached floor plan previews for list and tree views.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QPixmap
+from adapters.preview_cache import PreviewCache
+from typing import Dict, Optional, Set
+
+
+class _PreviewSignals(QObject):
+    loaded = pyqtSignal(str, object)  # file_path, QImage or None
+
+
+class _PreviewTask(QRunnable):
+    def __init__(self, cache: PreviewCache, file_path: str, level: str, signals: _PreviewSignals):
+        super().__init__()
+        self.cache = cache
+        self.file_path = file_path
+        self.level = level
+        self.signals = signals
+
+    def run(self):
+        try:
+            image, ok = self.cache.get_preview(self.file_path, self.level)
+        except Exception as e:
+            print(f"Error generating preview: {e}")
+            image, ok = None, False
+        self.signals.loaded.emit(self.file_path, image if ok else None)
+
+
+class PreviewLoader(QObject):
+    """Generates previews on a QThreadPool and keeps the resulting pixmaps in memory."""
+
+    preview_ready = pyqtSignal(str, QPixmap)  # file_path, pixmap
+
+    def __init__(self, level: str = "thumbnail", cache: Optional[PreviewCache] = None,
+                 thread_pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.level = level
+        self.cache = cache or PreviewCache()
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._pixmaps: Dict[str, QPixmap] = {}
+        self._pending: Set[str] = set()
+        self._signals = _PreviewSignals()
+        self._signals.loaded.connect(self._on_loaded)
+
+    def get_cached(self, file_path: str) -> Optional[QPixmap]:
+        return self._pixmaps.get(file_path)
+
+    def request(self, file_path: str):
+        """Emit preview_ready for file_path, immediately if the pixmap is already in memory."""
+        if not file_path:
+            return
+        pixmap = self._pixmaps.get(file_path)
+        if pixmap is not None:
+            self.preview_ready.emit(file_path, pixmap)
+            return
+        if file_path in self._pending:
+            return
+        self._pending.add(file_path)
+        self.thread_pool.start(_PreviewTask(self.cache, file_path, self.level, self._signals))
+
+    def _on_loaded(self, file_path: str, image: Optional[QImage]):
+        self._pending.discard(file_path)
+        if image is None:
+            return
+        # QPixmap must be created on the GUI thread
+        pixmap = QPixmap.fromImage(image)
+        self._pixmaps[file_path] = pixmap
+        self.preview_ready.emit(file_path, pixmap)
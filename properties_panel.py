@@ -142,3 +142,11 @@ class PropertiesPanel(QWidget):
             self.model_status_label.setStyleSheet("color: orange;")
             self.performance_label.setText("Need 5+ patterns to train")
 
+        # Background retraining
+        if status.get("training_state", "idle") != "idle":
+            self.model_status_label.setText(self.model_status_label.text() + " (training...)")
+        elif status.get("last_training_seconds") is not None and status.get("model_trained", False):
+            self.performance_label.setText(
+                self.performance_label.text() + f"\nLast fit: {status['last_training_seconds']:.2f}s"
+            )
+
@@ -0,0 +1,91 @@
+"""
+Background pattern suggestions with debouncing and stale-request cancellation.
+"""
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+from typing import Callable, List, Optional
+
+
+class _SuggestionSignals(QObject):
+    finished = pyqtSignal(int, object)  # generation, suggestions
+
+
+class _SuggestionTask(QRunnable):
+    def __init__(self, pattern_learner, generation: int, recent_rooms: List[List[List[float]]],
+                 num_suggestions: int, is_stale: Callable[[int], bool], signals: _SuggestionSignals):
+        super().__init__()
+        self.pattern_learner = pattern_learner
+        self.generation = generation
+        self.recent_rooms = recent_rooms
+        self.num_suggestions = num_suggestions
+        self.is_stale = is_stale
+        self.signals = signals
+
+    def run(self):
+        suggestions = []
+        # A newer edit arrived while this task was queued; skip the model entirely
+        if not self.is_stale(self.generation):
+            try:
+                suggestions = self.pattern_learner.suggest_positions(self.recent_rooms, num_suggestions=self.num_suggestions)
+            except Exception as e:
+                print(f"Error computing pattern suggestions: {e}")
+        self.signals.finished.emit(self.generation, suggestions)
+
+
+class SuggestionWorker(QObject):
+    """Runs PatternLearner.suggest_positions off the GUI thread, coalescing rapid edits."""
+
+    suggestions_ready = pyqtSignal(list)
+
+    def __init__(self, pattern_learner, debounce_ms: int = 150, thread_pool: Optional[QThreadPool] = None, parent=None):
+        super().__init__(parent)
+        self.pattern_learner = pattern_learner
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._generation = 0
+        self._recent_rooms: List[List[List[float]]] = []
+        self._num_suggestions = 3
+        self._running = False
+        self._dispatch_pending = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._signals = _SuggestionSignals()
+        self._signals.finished.connect(self._on_finished)
+
+    def request(self, recent_rooms: List[List[List[float]]], num_suggestions: int = 3):
+        """Schedule suggestions for these rooms; earlier requests still waiting are superseded."""
+        self._generation += 1
+        self._recent_rooms = recent_rooms
+        self._num_suggestions = num_suggestions
+        self._timer.start()
+
+    def cancel(self):
+        """Drop any queued or in-flight request; its result will not be published."""
+        self._generation += 1
+        self._timer.stop()
+        self._dispatch_pending = False
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _dispatch(self):
+        # One prediction at a time; a request made meanwhile runs when it finishes
+        if self._running:
+            self._dispatch_pending = True
+            return
+        self._running = True
+        self.thread_pool.start(_SuggestionTask(
+            self.pattern_learner, self._generation, self._recent_rooms,
+            self._num_suggestions, self._is_stale, self._signals,
+        ))
+
+    def _on_finished(self, generation: int, suggestions):
+        self._running = False
+        if generation == self._generation:
+            self.suggestions_ready.emit(list(suggestions))
+        if self._dispatch_pending:
+            self._dispatch_pending = False
+            if not self._timer.isActive():
+                self._dispatch()
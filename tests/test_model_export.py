@@ -0,0 +1,46 @@
+"""
+The TorchScript exports must give the same outputs as the eager float32 models (int8 only
+when that stays within tolerance), on inputs other than the ones the export was checked on.
+"""
+import os
+import sys
+
+import torch
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+from core.model_export import optimized_path  # noqa: E402
+from core.neural_q import NeuralQ  # noqa: E402
+from core.state_encoder import STATE_DIM  # noqa: E402
+from export_model import export_and_check as export_predictor  # noqa: E402
+from export_optimized import export_and_check as export_dqn  # noqa: E402
+from model.network import Predictor  # noqa: E402
+
+TOLERANCE = 0.05
+
+
+def test_dqn_export_matches_eager_model(tmp_path):
+    torch.manual_seed(0)
+    net = NeuralQ(input_dim=STATE_DIM).eval()
+    out = optimized_path(str(tmp_path / "model.pth"))
+    exported, precision, check_error, error, states = export_dqn(net, out, TOLERANCE, states=1024)
+    assert precision in ("int8", "float32")
+    assert check_error <= TOLERANCE
+    assert error <= TOLERANCE
+    with torch.inference_mode():
+        assert exported(states).shape == net(states).shape
+
+
+def test_predictor_export_matches_eager_net(tmp_path):
+    torch.manual_seed(0)
+    predictor = Predictor(weights_path=str(tmp_path / "net.pt"))
+    exported, precision, check_error, error, agreement, _ = export_predictor(predictor, histories=500)
+    assert precision in ("int8", "float32")
+    assert check_error <= TOLERANCE
+    assert error <= TOLERANCE
+    assert agreement >= 0.99
+    # A reloaded predictor serves the export, since it is newer than the weights
+    reloaded = Predictor(weights_path=predictor.weights_path)
+    assert reloaded.serving is reloaded.optimized is not None
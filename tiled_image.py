@@ -0,0 +1,312 @@
+"""
+Tiled image pyramid for displaying very large floor plan images.
+"""
+from PyQt6.QtWidgets import QGraphicsObject, QGraphicsItem
+from PyQt6.QtCore import Qt, QObject, QRectF, QRunnable, QSize, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader, QPixmap
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+import hashlib
+import json
+import math
+import os
+
+TILE_SIZE = 512
+CACHE_DIR = ".tile_cache"
+# Worst case bytes per decoded pixel (16-bit RGBA PNGs)
+MAX_BYTES_PER_PIXEL = 8
+
+
+def allow_full_decode(reader: QImageReader):
+    """
+    Raise Qt's decode allocation limit (256 MB by default, about 8k x 8k) to what this
+    image needs, so large floor plans decode instead of coming back null.
+    """
+    size = reader.size()
+    if not size.isValid():
+        return
+    needed_mb = math.ceil(size.width() * size.height() * MAX_BYTES_PER_PIXEL / (1 << 20)) + 1
+    if reader.allocationLimit() and needed_mb > reader.allocationLimit():
+        reader.setAllocationLimit(needed_mb)
+
+
+class TilePyramid:
+    """On-disk pyramid of fixed-size tiles; level 0 is full resolution, each level halves it."""
+
+    def __init__(self, image_path: str, cache_root: str = CACHE_DIR, tile_size: int = TILE_SIZE):
+        self.image_path = image_path
+        self.tile_size = tile_size
+        self.cache_dir = os.path.join(cache_root, self._cache_key(image_path))
+        self.meta_path = os.path.join(self.cache_dir, "meta.json")
+
+        self.width = 0
+        self.height = 0
+        if not self._read_meta():
+            reader = QImageReader(image_path)
+            size = reader.size()
+            if size.isValid():
+                self.width, self.height = size.width(), size.height()
+        self.levels = self._count_levels()
+
+    def _cache_key(self, image_path: str) -> str:
+        path = os.path.abspath(image_path)
+        try:
+            st = os.stat(path)
+            ident = f"{path}|{st.st_size}|{st.st_mtime_ns}|{self.tile_size}"
+        except OSError:
+            ident = f"{path}|{self.tile_size}"
+        return hashlib.sha1(ident.encode("utf-8")).hexdigest()
+
+    def _read_meta(self) -> bool:
+        if not os.path.exists(self.meta_path):
+            return False
+        try:
+            with open(self.meta_path, "r") as f:
+                meta = json.load(f)
+            self.width = int(meta["width"])
+            self.height = int(meta["height"])
+            return True
+        except Exception:
+            return False
+
+    def _count_levels(self) -> int:
+        levels = 1
+        longest = max(self.width, self.height)
+        while longest > self.tile_size:
+            longest = math.ceil(longest / 2)
+            levels += 1
+        return levels
+
+    def is_valid(self) -> bool:
+        return self.width > 0 and self.height > 0
+
+    def is_built(self) -> bool:
+        return os.path.exists(self.meta_path)
+
+    def level_scale(self, level: int) -> float:
+        return float(2 ** level)
+
+    def level_size(self, level: int) -> Tuple[int, int]:
+        scale = 2 ** level
+        return max(1, math.ceil(self.width / scale)), max(1, math.ceil(self.height / scale))
+
+    def tile_grid(self, level: int) -> Tuple[int, int]:
+        w, h = self.level_size(level)
+        return math.ceil(w / self.tile_size), math.ceil(h / self.tile_size)
+
+    def level_for_scale(self, view_scale: float) -> int:
+        """Pick the coarsest level that still has at least one image pixel per screen pixel."""
+        if view_scale <= 0:
+            return self.levels - 1
+        level = int(math.floor(math.log2(1.0 / view_scale))) if view_scale < 1.0 else 0
+        return max(0, min(self.levels - 1, level))
+
+    def tile_path(self, level: int, col: int, row: int) -> str:
+        return os.path.join(self.cache_dir, str(level), f"{col}_{row}.png")
+
+    def tile_scene_rect(self, level: int, col: int, row: int) -> QRectF:
+        scale = self.level_scale(level)
+        w, h = self.level_size(level)
+        x = col * self.tile_size
+        y = row * self.tile_size
+        tw = min(self.tile_size, w - x)
+        th = min(self.tile_size, h - y)
+        return QRectF(x * scale, y * scale, tw * scale, th * scale).intersected(
+            QRectF(0, 0, self.width, self.height)
+        )
+
+    def build(self) -> bool:
+        """Decode the source once and write every tile of every level. Runs off the GUI thread."""
+        reader = QImageReader(self.image_path)
+        reader.setAutoTransform(True)
+        allow_full_decode(reader)
+        image = reader.read()
+        if image.isNull():
+            return False
+
+        self.width, self.height = image.width(), image.height()
+        self.levels = self._count_levels()
+
+        level_image = image
+        for level in range(self.levels):
+            if level > 0:
+                w, h = self.level_size(level)
+                level_image = level_image.scaled(
+                    w, h,
+                    Qt.AspectRatioMode.IgnoreAspectRatio,
+                    Qt.TransformationMode.SmoothTransformation,
+                )
+            os.makedirs(os.path.join(self.cache_dir, str(level)), exist_ok=True)
+            cols, rows = self.tile_grid(level)
+            for row in range(rows):
+                for col in range(cols):
+                    x = col * self.tile_size
+                    y = row * self.tile_size
+                    tw = min(self.tile_size, level_image.width() - x)
+                    th = min(self.tile_size, level_image.height() - y)
+                    tile = level_image.copy(x, y, tw, th)
+                    tile.save(self.tile_path(level, col, row), "PNG")
+
+        # Written last so an interrupted build is detected and redone
+        with open(self.meta_path, "w") as f:
+            json.dump({"width": self.width, "height": self.height,
+                       "tile_size": self.tile_size, "levels": self.levels}, f)
+        return True
+
+    def decode_reduced(self, max_dimension: int) -> Tuple[QImage, float]:
+        """
+        Decode the source with its longest side at most max_dimension, for when the pyramid
+        cannot be built. Returns the image (null on failure) and the factor that scales it
+        back up to image coordinates.
+        """
+        reader = QImageReader(self.image_path)
+        reader.setAutoTransform(True)
+        size = reader.size()
+        scale = 1.0
+        if size.isValid() and max(size.width(), size.height()) > max_dimension:
+            scale = max(size.width(), size.height()) / max_dimension
+            reader.setScaledSize(QSize(max(1, round(size.width() / scale)), max(1, round(size.height() / scale))))
+        # Formats without scaled decoding (e.g. PNG) still decode at full size first
+        allow_full_decode(reader)
+        return reader.read(), scale
+
+
+class _TileSignals(QObject):
+    tile_loaded = pyqtSignal(int, int, int, QImage)  # level, col, row, image
+    pyramid_ready = pyqtSignal(bool, QImage, float)  # built, reduced fallback image and its scale
+
+
+class _PyramidBuildTask(QRunnable):
+    def __init__(self, pyramid: TilePyramid, fallback_dimension: int, signals: _TileSignals):
+        super().__init__()
+        self.pyramid = pyramid
+        self.fallback_dimension = fallback_dimension
+        self.signals = signals
+
+    def run(self):
+        try:
+            ok = self.pyramid.build()
+        except Exception as e:
+            print(f"Error building tile pyramid: {e}")
+            ok = False
+        fallback, scale = QImage(), 1.0
+        if not ok:
+            # Unwritable cache or a failed full-size decode; the canvas shows this reduced copy
+            try:
+                fallback, scale = self.pyramid.decode_reduced(self.fallback_dimension)
+            except Exception as e:
+                print(f"Error decoding reduced floor plan image: {e}")
+        self.signals.pyramid_ready.emit(ok, fallback, scale)
+
+
+class _TileLoadTask(QRunnable):
+    def __init__(self, pyramid: TilePyramid, level: int, col: int, row: int, signals: _TileSignals):
+        super().__init__()
+        self.pyramid = pyramid
+        self.key = (level, col, row)
+        self.signals = signals
+
+    def run(self):
+        level, col, row = self.key
+        image = QImage(self.pyramid.tile_path(level, col, row))
+        self.signals.tile_loaded.emit(level, col, row, image)
+
+
+class TiledImageItem(QGraphicsObject):
+    """Graphics item that draws only the visible tiles of a TilePyramid at the current zoom."""
+
+    pyramid_ready = pyqtSignal(bool)
+
+    def __init__(self, pyramid: TilePyramid, max_cached_tiles: int = 192, thread_pool: Optional[QThreadPool] = None,
+                 fallback_dimension: int = 4096):
+        super().__init__()
+        self.pyramid = pyramid
+        self.max_cached_tiles = max_cached_tiles
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self.ready = False
+        self._tiles: "OrderedDict[Tuple[int, int, int], QPixmap]" = OrderedDict()
+        self._pending: Set[Tuple[int, int, int]] = set()
+        self._failed: Set[Tuple[int, int, int]] = set()  # tiles that did not decode; not requested again
+        self._rect = QRectF(0, 0, pyramid.width, pyramid.height)
+        # Set when the build fails: a reduced decode and the factor back to image coordinates
+        self.fallback_image: Optional[QImage] = None
+        self.fallback_scale = 1.0
+
+        self._signals = _TileSignals()
+        self._signals.tile_loaded.connect(self._on_tile_loaded)
+        self._signals.pyramid_ready.connect(self._on_pyramid_ready)
+
+        self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemUsesExtendedStyleOption, True)
+
+        if pyramid.is_built():
+            self.ready = True
+        else:
+            self.thread_pool.start(_PyramidBuildTask(pyramid, fallback_dimension, self._signals))
+
+    def boundingRect(self) -> QRectF:
+        return self._rect
+
+    def paint(self, painter, option, widget=None):
+        if not self.ready:
+            return
+        view_scale = option.levelOfDetailFromTransform(painter.worldTransform())
+        level = self.pyramid.level_for_scale(view_scale)
+        exposed = option.exposedRect if not option.exposedRect.isEmpty() else self._rect
+
+        top = self.pyramid.levels - 1
+        overview = self._get_tile(top, 0, 0)
+
+        scale = self.pyramid.level_scale(level)
+        step = self.pyramid.tile_size * scale
+        cols, rows = self.pyramid.tile_grid(level)
+        first_col = max(0, int(exposed.left() // step))
+        last_col = min(cols - 1, int(exposed.right() // step))
+        first_row = max(0, int(exposed.top() // step))
+        last_row = min(rows - 1, int(exposed.bottom() // step))
+
+        for row in range(first_row, last_row + 1):
+            for col in range(first_col, last_col + 1):
+                target = self.pyramid.tile_scene_rect(level, col, row)
+                pixmap = self._get_tile(level, col, row)
+                if pixmap is not None:
+                    painter.drawPixmap(target, pixmap, QRectF(pixmap.rect()))
+                elif overview is not None:
+                    # Stretch the matching part of the overview until the real tile arrives
+                    top_scale = self.pyramid.level_scale(top)
+                    source = QRectF(target.left() / top_scale, target.top() / top_scale,
+                                    target.width() / top_scale, target.height() / top_scale)
+                    painter.drawPixmap(target, overview, source)
+
+    def _get_tile(self, level: int, col: int, row: int) -> Optional[QPixmap]:
+        key = (level, col, row)
+        pixmap = self._tiles.get(key)
+        if pixmap is not None:
+            self._tiles.move_to_end(key)
+            return pixmap
+        if key not in self._pending and key not in self._failed:
+            self._pending.add(key)
+            self.thread_pool.start(_TileLoadTask(self.pyramid, level, col, row, self._signals))
+        return None
+
+    def _on_tile_loaded(self, level: int, col: int, row: int, image: QImage):
+        key = (level, col, row)
+        self._pending.discard(key)
+        if image.isNull():
+            self._failed.add(key)
+            return
+        # QPixmap must be created on the GUI thread
+        self._tiles[key] = QPixmap.fromImage(image)
+        while len(self._tiles) > self.max_cached_tiles:
+            self._tiles.popitem(last=False)
+        self.update(self.pyramid.tile_scene_rect(level, col, row))
+
+    def _on_pyramid_ready(self, ok: bool, fallback: QImage, scale: float):
+        if not ok and not fallback.isNull():
+            self.fallback_image = fallback
+            self.fallback_scale = scale
+        if ok:
+            self.prepareGeometryChange()
+            self._rect = QRectF(0, 0, self.pyramid.width, self.pyramid.height)
+            self.ready = True
+            self.update()
+        self.pyramid_ready.emit(ok)
@@ -6,6 +6,7 @@ from PyQt6.QtGui import QAction, QIcon, QKeySequence
 from canvas_widget import FloorPlanCanvas, RoomItem
 from properties_panel import PropertiesPanel
 from floor_manager import FloorManager
+from floor_loader import FloorLoader
 from domain.buildings.room import Room as DomainRoom
 from domain.buildings.floor import Floor as DomainFloor
 from domain.buildings.stair import Stair
@@ -44,9 +45,11 @@ class MainWindow(QMainWindow):
         self.db_session = db_session
         self.db_engine = db_engine
         self.current_floor_id: Optional[int] = None
+        self.current_floor_name: Optional[str] = None
         self.navigation_mode = False
         self.nav_start_room_id: Optional[int] = None
         self.nav_end_room_id: Optional[int] = None
+        self.floor_loader: Optional[FloorLoader] = None
         
         self.init_ui()
         self.setup_menus()
@@ -61,6 +64,13 @@ class MainWindow(QMainWindow):
     def init_ui(self):
         self.canvas = FloorPlanCanvas(self)
         self.setCentralWidget(self.canvas)
+        if self.db_engine is not None:
+            self.floor_loader = FloorLoader(
+                self.db_engine,
+                max_decode_dimension=FloorPlanCanvas.TILED_IMAGE_THRESHOLD,
+                image_adapters=self.canvas.image_adapters,
+                parent=self,
+            )
     
     def setup_menus(self):
         menubar = self.menuBar()
@@ -135,6 +145,13 @@ class MainWindow(QMainWindow):
         fit_action.setShortcut(QKeySequence("Ctrl+0"))
         fit_action.triggered.connect(self.fit_to_window)
         view_menu.addAction(fit_action)
+
+        view_menu.addSeparator()
+        frame_time_action = QAction("Show Frame &Times", self)
+        frame_time_action.setCheckable(True)
+        frame_time_action.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        frame_time_action.toggled.connect(self.toggle_frame_time_overlay)
+        view_menu.addAction(frame_time_action)
         
         help_menu = menubar.addMenu("&Help")
         about_action = QAction("&About", self)
@@ -208,6 +225,7 @@ class MainWindow(QMainWindow):
 
         self.nav_tree = QTreeWidget(self.navigation_panel)
         self.nav_tree.setHeaderHidden(True)
+        self.nav_tree.setIconSize(QSize(32, 32))
         nav_layout.addWidget(self.nav_tree)
 
         self.navigation_dock.setWidget(self.navigation_panel)
@@ -229,6 +247,11 @@ class MainWindow(QMainWindow):
         self.floor_manager.floor_added.connect(self.on_floor_added)
         self.floor_manager.floor_deleted.connect(self.on_floor_deleted)
 
+        if self.floor_loader is not None:
+            self.floor_loader.floor_loaded.connect(self.on_floor_loaded)
+
+        self.floor_manager.preview_loader.preview_ready.connect(self.on_floor_preview_ready)
+
         self.nav_search.textChanged.connect(self.on_nav_search_changed)
         self.nav_tree.itemDoubleClicked.connect(self.on_nav_tree_item_double_clicked)
         
@@ -319,12 +342,14 @@ class MainWindow(QMainWindow):
         stair = stair_repo.save(stair)
 
         self.canvas.add_stair_item(float(x), float(y), stair_id=stair.stair_id, to_floor_id=to_floor_id)
+        self.invalidate_floor_cache(self.current_floor_id)
+        self.invalidate_floor_cache(to_floor_id)
         self.status_bar.showMessage(f"Placed stair to floor {to_floor_id}")
     
     def open_image(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Open Floor Plan Image", "",
-            "Image Files (*.png *.jpg *.jpeg *.bmp);;All Files (*)"
+            "Image Files (*.png *.jpg *.jpeg *.bmp *.svg);;All Files (*)"
         )
         if file_path:
             if self.canvas.load_image(file_path):
@@ -335,7 +360,7 @@ class MainWindow(QMainWindow):
     def new_floor(self):
         file_path, _ = QFileDialog.getOpenFileName(
             self, "Select Floor Plan Image", "",
-            "Image Files (*.png *.jpg *.jpeg *.bmp);;All Files (*)"
+            "Image Files (*.png *.jpg *.jpeg *.bmp *.svg);;All Files (*)"
         )
         if not file_path:
             return
@@ -351,6 +376,7 @@ class MainWindow(QMainWindow):
         saved_floor = self.map_controller.submit_map(floor)
         
         if saved_floor:
+            self.navigation_controller.invalidate_graph()
             self.current_floor_id = saved_floor.floor_id
             self.canvas.load_image(file_path)
             self.floor_manager.refresh_floors()
@@ -361,36 +387,75 @@ class MainWindow(QMainWindow):
         floor = self.map_controller.load_map(floor_id)
         if floor:
             self.current_floor_id = floor_id
-            self.canvas.load_image(floor.image_path)
-            self.load_rooms_for_floor(floor_id)
-            self.load_stairs_for_floor(floor_id)
-            self.load_pathways_for_floor(floor_id)
-            if self.navigation_mode:
-                self.canvas.display_navigation_path(self.canvas.last_navigation_path_by_floor, current_floor_id=floor_id)
-            self.status_bar.showMessage(f"Loaded floor: {floor.name}")
+            self.current_floor_name = floor.name
+            if self.floor_loader is None:
+                self.canvas.load_image(floor.image_path)
+                self.load_rooms_for_floor(floor_id)
+                self.load_stairs_for_floor(floor_id)
+                self.load_pathways_for_floor(floor_id)
+                self.on_floor_shown(floor_id, floor.name)
+                return
+
+            data = self.floor_loader.get_cached(floor_id, floor.image_path)
+            if data is not None:
+                self.show_floor_data(data)
+            else:
+                self.floor_loader.request(floor_id, floor.image_path)
+                self.status_bar.showMessage(f"Loading floor: {floor.name}...")
+            self.floor_loader.prefetch_neighbors(floor_id, self.map_controller.map_repo.find_all())
+
+    def on_floor_loaded(self, data):
+        # Prefetched floors and loads overtaken by another selection just stay cached
+        if data.floor_id == self.current_floor_id:
+            self.show_floor_data(data)
+
+    def show_floor_data(self, data):
+        if data.pixmap is not None:
+            self.canvas.set_background_pixmap(data.image_path, data.pixmap)
+        else:
+            self.canvas.load_image(data.image_path)
+        with self.canvas.bulk_update():
+            self.populate_rooms(data.rooms or [])
+            self.populate_stairs(data.floor_id, data.stairs or [])
+            self.populate_pathways(data.pathways or [])
+        # Only the current floor is shown, and its name was read when it was selected
+        self.on_floor_shown(data.floor_id, self.current_floor_name or str(data.floor_id))
+
+    def on_floor_shown(self, floor_id: int, floor_name: str):
+        if self.navigation_mode:
+            self.canvas.display_navigation_path(self.canvas.last_navigation_path_by_floor, current_floor_id=floor_id)
+        self.status_bar.showMessage(f"Loaded floor: {floor_name}")
+
+    def invalidate_floor_cache(self, floor_id: Optional[int]):
+        self.navigation_controller.invalidate_graph()
+        if self.floor_loader is not None and floor_id:
+            self.floor_loader.invalidate(floor_id)
 
     def load_pathways_for_floor(self, floor_id: int):
         pathway_repo = PathwayRepository(self.db_session, self.db_engine)
-        pathways = pathway_repo.find_by_floor(floor_id)
+        self.populate_pathways(pathway_repo.find_by_floor(floor_id))
+
+    def populate_pathways(self, pathways):
         self.canvas.clear_pathways()
-        for p in pathways:
-            self.canvas.add_pathway_item(p.points, pathway_id=p.pathway_id)
+        self.canvas.add_pathway_items((p.points, p.pathway_id) for p in pathways)
 
     def load_stairs_for_floor(self, floor_id: int):
         stair_repo = StairRepository(self.db_session, self.db_engine)
-        stairs = stair_repo.find_by_floor(floor_id)
+        self.populate_stairs(floor_id, stair_repo.find_by_floor(floor_id))
+
+    def populate_stairs(self, floor_id: int, stairs):
         # Clear and re-add (stairs are per-floor view)
         self.canvas.clear_stairs()
-        for stair in stairs:
-            x, y = stair.position
-            to_floor_id = stair.get_other_floor(floor_id)
-            self.canvas.add_stair_item(float(x), float(y), stair_id=stair.stair_id, to_floor_id=to_floor_id)
+        self.canvas.add_stair_items(
+            (float(stair.position[0]), float(stair.position[1]), stair.stair_id, stair.get_other_floor(floor_id))
+            for stair in stairs
+        )
     
     def on_floor_added(self, name: str, image_path: str):
         if not image_path:
             file_path, _ = QFileDialog.getOpenFileName(
                 self, "Select Floor Plan Image", "",
-                "Image Files (*.png *.jpg *.jpeg *.bmp);;All Files (*)"
+                "Image Files (*.png *.jpg *.jpeg *.bmp *.svg);;All Files (*)"
             )
             if not file_path:
                 return
@@ -399,12 +464,16 @@ class MainWindow(QMainWindow):
         floor = DomainFloor(None, name, image_path)
         saved_floor = self.map_controller.submit_map(floor)
         if saved_floor:
+            self.navigation_controller.invalidate_graph()
             self.floor_manager.refresh_floors()
             self.on_floor_selected(saved_floor.floor_id)
     
     def on_floor_deleted(self, floor_id: int):
         floor = self.map_controller.map_repo.find_by_id(floor_id)
         if floor and self.map_controller.map_repo.delete(floor_id):
+            self.navigation_controller.invalidate_graph()
+            if self.floor_loader is not None:
+                self.floor_loader.clear(floor_id)
             if self.current_floor_id == floor_id:
                 self.current_floor_id = None
                 self.canvas.clear_rooms()
@@ -433,6 +502,7 @@ class MainWindow(QMainWindow):
                 room_item.get_vertices()
             )
             room_item.room_id = saved_room.room_id
+            self.invalidate_floor_cache(self.current_floor_id)
             self.status_bar.showMessage(f"Created room: {room_item.name}")
     
     def on_room_updated(self, room_item: RoomItem):
@@ -445,6 +515,7 @@ class MainWindow(QMainWindow):
                 self.current_floor_id or 0
             )
             self.room_repo.save(domain_room)
+            self.invalidate_floor_cache(self.current_floor_id)
             self.status_bar.showMessage(f"Updated room: {room_item.name}")
         else:
             self.on_room_created(room_item)
@@ -454,6 +525,7 @@ class MainWindow(QMainWindow):
             return
         if room_item.room_id:
             self.map_controller.delete_room(room_item.room_id)
+            self.invalidate_floor_cache(self.current_floor_id)
         self.canvas.remove_room_item(room_item)
         self.status_bar.showMessage(f"Deleted room: {room_item.name}")
         self.update_learning_status()
@@ -466,16 +538,14 @@ class MainWindow(QMainWindow):
         self.properties_panel.update_learning_status(status)
     
     def load_rooms_for_floor(self, floor_id: int):
+        self.populate_rooms(self.room_repo.find_by_floor_id(floor_id))
+
+    def populate_rooms(self, rooms):
         self.canvas.clear_rooms()
-        rooms = self.room_repo.find_by_floor_id(floor_id)
-        for room in rooms:
-            room_item = RoomItem(
-                room.vertices,
-                room_id=room.room_id,
-                name=room.name,
-                room_type=room.room_type
-            )
-            self.canvas.add_room_item(room_item)
+        self.canvas.add_room_items(
+            RoomItem(room.vertices, room_id=room.room_id, name=room.name, room_type=room.room_type)
+            for room in rooms
+        )
         self.canvas.update_pattern_suggestions()
         self.update_learning_status()
 
@@ -490,10 +560,12 @@ class MainWindow(QMainWindow):
         pathway_repo = PathwayRepository(self.db_session, self.db_engine)
         saved = pathway_repo.save(Pathway(None, self.current_floor_id, points))
         pathway_item.pathway_id = saved.pathway_id
+        self.invalidate_floor_cache(self.current_floor_id)
 
     def on_pathway_deleted(self, pathway_id: int):
         pathway_repo = PathwayRepository(self.db_session, self.db_engine)
         pathway_repo.delete(int(pathway_id))
+        self.invalidate_floor_cache(self.current_floor_id)
 
     def refresh_navigation_room_list(self):
         self.nav_tree.clear()
@@ -503,6 +575,8 @@ class MainWindow(QMainWindow):
                 continue
             top = QTreeWidgetItem([f"{floor.name} (ID: {floor.floor_id})"])
             top.setData(0, 256, ("floor", floor.floor_id))
+            top.setData(0, 257, floor.image_path)
+            self.floor_manager.preview_loader.request(floor.image_path)
             self.nav_tree.addTopLevelItem(top)
             rooms = self.room_repo.find_by_floor_id(floor.floor_id)
             rooms_sorted = sorted(rooms, key=lambda r: (r.name or ""))
@@ -514,6 +588,13 @@ class MainWindow(QMainWindow):
 
         self.on_nav_search_changed(self.nav_search.text())
 
+    def on_floor_preview_ready(self, image_path: str, pixmap):
+        icon = QIcon(pixmap)
+        for i in range(self.nav_tree.topLevelItemCount()):
+            item = self.nav_tree.topLevelItem(i)
+            if item.data(0, 257) == image_path:
+                item.setIcon(0, icon)
+
     def on_nav_search_changed(self, text: str):
         query = (text or "").strip().lower()
         for i in range(self.nav_tree.topLevelItemCount()):
@@ -569,6 +650,9 @@ class MainWindow(QMainWindow):
     def zoom_out(self):
         self.canvas.scale(1.0 / 1.2, 1.0 / 1.2)
     
+    def toggle_frame_time_overlay(self, enabled: bool):
+        self.canvas.set_frame_time_overlay(enabled)
+
     def fit_to_window(self):
         if self.canvas.background_item:
             self.canvas.fitInView(self.canvas.background_item, Qt.AspectRatioMode.KeepAspectRatio)
@@ -588,6 +672,7 @@ class MainWindow(QMainWindow):
                 if getattr(learner, "demo_mode", False) is False and getattr(learner, "patterns", None) is not None:
                     if len(learner.patterns) >= 5:
                         learner.train_model()
+                learner.close()
         except Exception:
             pass
 